@@ -31,20 +31,30 @@ import socket
 import sys			# required for .stdout.write()
 import urllib.error # used in 'download_EOP' function
 from urllib.request import urlopen
-from collections import deque
 
 ###### Third party imports ######
-from skyfield import VERSION
 from skyfield.api import Loader
 from skyfield.api import Topos, Star, wgs84, N, S, E, W     # Topos is deprecated in Skyfield v1.35!
 from skyfield import almanac
 from skyfield.nutationlib import iau2000b
-from skyfield.data import hipparcos
 from skyfield.magnitudelib import planetary_magnitude
+from skyfield.constants import AU_KM
 import numpy as np
 
 ###### Local application imports ######
 import config
+import eopcache
+import eoprefresh
+import ephexcerpt
+import eventcache
+import eventstore
+import gridcache
+import multilat
+import observers
+import precision
+import starcat
+import tablefmt
+import transits
 
 #---------------------------
 #   Module initialization
@@ -58,15 +68,6 @@ hour_of_day = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18,
 next_hour_of_day = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24]
 degree_sign= u'\N{DEGREE SIGN}'
 
-def SkyfieldVersion(version2):      # compare Skyfield version to version2
-    versions2 = [int(v) for v in version2.split(".")]
-    for i in range(max(len(VERSION),len(versions2))):
-        v1 = VERSION[i]   if i < len(VERSION)   else 0
-        v2 = versions2[i] if i < len(versions2) else 0
-        if   v1 > v2: return 1
-        elif v1 < v2: return -1
-    return 0
-
 # def compareVersion(version1, version2):     # compare two versions
     # versions1 = [int(v) for v in version1.split(".")]
     # versions2 = [int(v) for v in version2.split(".")]
@@ -168,17 +169,26 @@ def download_EOP(path, filename, url, loc):
     sys.stdout.write("done.\n")
     sys.stdout.flush()
 
-def init_sf(spad):
-    global ts, eph, earth, moon, sun, venus, mars, jupiter, saturn, df
+def init_sf(spad, first_day=None, last_day=None):
+    global ts, eph, earth, moon, sun, venus, mars, jupiter, saturn, bodies, grid, navstars, registry
     load = Loader(spad)         # spad = folder to store the downloaded files
     EOPdf  = "finals2000A.all"  # Earth Orientation Parameters data file
     dfIERS = spad + EOPdf
     config.useIERSEOP = False
     config.txtIERSEOP = ""
+    refreshEOP = False          # True to download a new data file in the background (offline-first)
 
     if config.useIERS:
-        if SkyfieldVersion("1.31") >= 0:
-            if os.path.isfile(dfIERS):
+        if observers.loaderok:
+            if config.offlineEOP:   # no network access before the calculations (see eoprefresh.py)
+                if os.path.isfile(dfIERS):
+                    ts = eopcache.timescale(load, dfIERS)	# timescale object
+                    config.useIERSEOP = True
+                    refreshEOP = load.days_old(EOPdf) > float(config.ageIERS)
+                else:
+                    ts = load.timescale()	# timescale object with built-in UT1-tables
+                    refreshEOP = True
+            elif os.path.isfile(dfIERS):
                 if load.days_old(EOPdf) > float(config.ageIERS):
                     if isConnected():
                         if testServer(EOPdf, urlIERS):  # first try downloading via FTP
@@ -188,7 +198,7 @@ def init_sf(spad):
                         else:   # finally try the IERS datacenter (available in more countries)
                             download_EOP(spad,EOPdf,urlDCIERS,"IERS datacenter")
                     else: print("NOTE: no Internet connection... using existing '{}'".format(EOPdf))
-                ts = load.timescale(builtin=False)	# timescale object
+                ts = eopcache.timescale(load, dfIERS)	# timescale object
                 config.useIERSEOP = True
             else:
                 if isConnected():
@@ -198,7 +208,7 @@ def init_sf(spad):
                         download_EOP(spad,EOPdf,urlUSNO,"USNO")
                     else:   # finally try the IERS datacenter (available in more countries)
                         download_EOP(spad,EOPdf,urlDCIERS,"IERS datacenter")
-                    ts = load.timescale(builtin=False)	# timescale object
+                    ts = eopcache.timescale(load, dfIERS)	# timescale object
                     config.useIERSEOP = True
                 else:
                     print("NOTE: no Internet connection... using built-in UT1-tables")
@@ -209,74 +219,25 @@ def init_sf(spad):
         ts = load.timescale()	# timescale object with built-in UT1-tables
 
     if config.useIERSEOP and os.path.isfile(dfIERS):
-# get the IERS EOP data "release date" according to these rules:
-#   - begin searching within this millenium (ignoring data from 02 Jan 1973 to 31 Dec 1999)
-#   - halt when the following value is "P", i.e. predicted as opposed to measured:
-#       - flag for Bull. A UT1-UTC values
-#   - step back one day to the record that has "I", i.e. measured data.
-#
-# the date of this record is the last date with IERS measured data.
-#   [the more recent the date, the more accurate/reliable are both the past IERS
-#   Earth Orientation Parameters as well as the future (predicted) EOP data values.]
-
-# IERS EOP data format definition:
-# https://maia.usno.navy.mil/ser7/readme.finals2000A
-
-        queue = deque(["a", "b", "c", "d"])
-        PredData = False    # True when Prediction data flagged
-        PredEnd  = False    # True when Prediction data no longer flagged
-
-        iers = ""
-        with open(dfIERS) as file:
-            for line in file:
-                mjd = int(line[7:12])
-
-                if not PredData and mjd >= 51544:    # skip data in previous  millenium
-                    queue.append(line)
-                    queue.popleft()
-                    c1 = line[16:17]    # IERS (I) or Prediction (P) flag for Bull. A polar motion values
-                    c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
-                    c3 = line[95:96]    # IERS (I) or Prediction (P) flag for Bull. A nutation values
-                    if not PredData and c2 == "P":
-                        PredData = True
-                        iers = ""
-                        while queue:
-                            iersdata = queue.pop()
-                            if iersdata[57:58] == "I":
-                                iers = iersdata
-                                break
-                        if iers == "": iers = iersdata
-                        year = int(iers[0:2]) + 2000
-                        mth  = int(iers[2:4])
-                        day  = int(iers[4:6])
-                        dt = date(year, mth, day)
-                        config.txtIERSEOP = "IERS Earth Orientation data as of " + dt.strftime("%d-%b-%Y")
-                elif PredData:    # search for end of Prediction data
-                    c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
-                    if c2 == "P":
-                        iers = line
-                    else:
-                        PredEnd = True
-                        break
-
-        if iers == "":
+        # dates of the last IERS measured data and of the end of the prediction data
+        # (parsed once per version of the data file: see eopcache.py)
+        dt, dt2 = eopcache.dates(dfIERS)
+        if dt2 is None:
             print("Error: IERS Earth Orientation Parameters data file is incomplete...")
             print("       most likely the download did not finish properly.")
             print("       Please delete the 'finals2000A.all' data file and")
             print("       rerun this program - it will be downloaded anew.")
             sys.exit(0)
-
-        # detect end of Prediction data even if file ends with c2 == "P" ...
-        year = int(iers[0:2]) + 2000
-        mth  = int(iers[2:4])
-        day  = int(iers[4:6])
-        dt2 = date(year, mth, day)
+        config.txtIERSEOP = "IERS Earth Orientation data as of " + dt.strftime("%d-%b-%Y")
         config.endIERSEOP = "IERS Earth Orientation predictions end " + dt2.strftime("%d-%b-%Y")
         config.dt_IERSEOP = dt2
+    if config.useIERS and config.offlineEOP:
+        eoprefresh.record(eoprefresh.release(dfIERS))
 
     if config.ephndx in set([0, 1, 2, 3, 4]):
     
-        eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
+        eph = load(ephexcerpt.choose(spad, first_day, last_day))	# load chosen ephemeris (or its smallest excerpt covering the dates)
+        config.ephfile = os.path.abspath(load.path_to(config.ephfile))  # the worker processes only read this file
         earth   = eph['earth']
         moon    = eph['moon']
         sun     = eph['sun']
@@ -287,11 +248,26 @@ def init_sf(spad):
             mars    = eph['mars barycenter']
         else:
             mars    = eph['mars']
-
-    # load the Hipparcos catalog as a 118,218 row Pandas dataframe.
-    with load.open(hipparcos.URL) as f:
-        #hipparcos_epoch = ts.tt(1991.25)
-        df = hipparcos.load_dataframe(f)
+        bodies = {'sun': sun, 'moon': moon, 'venus': venus, 'mars': mars, 'jupiter': jupiter, 'saturn': saturn}
+        registry = observers.build(earth)   # observers of all latitudes (see observers.py)
+        epochs.clear()      # positions from a previous ephemeris are obsolete
+        sunevents.clear()
+        moonevents.clear()
+        eventtable.clear()
+        transittable.clear()
+        deferred.clear()
+        moonhorizons.clear()
+        eventstore.clear()
+        grid = []
+        gridcache.init_cache(spad, config.ephemeris[config.ephndx][0], dfIERS if config.useIERSEOP else None)
+        eventcache.init_cache(spad, config.ephemeris[config.ephndx][0], dfIERS if config.useIERSEOP else None)
+
+    # the navigational stars from the compact Hipparcos catalog (see starcat.py)
+    starcat.init_catalog(load, navhips)
+    navstars = starcat.lookup(navhips)
+
+    if refreshEOP:
+        eoprefresh.start(spad, EOPdf)   # after the caches are keyed by the current data file
 
     return ts
 
@@ -419,6 +395,8 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
     ndxR = 0 if len(rise) > 0 else 10
     ndxS = 0 if len(sett) > 0 else 10
     pickRISE = None         # no idea if RISE or SET comes first and is valid
+    Rall = tablefmt.times(rise, with_seconds)   # the text of all event times (see tablefmt.py)
+    Sall = tablefmt.times(sett, with_seconds)
     
     prev_dt = datetime.min.replace(tzinfo=timezone.utc)     # closest to datetime zero
     r = s = 0
@@ -444,7 +422,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = rise[ndxR]
                 valid = yR[ndxR]
                 if valid:
-                    Rtxt[r] = time2text(t, with_seconds)
+                    Rtxt[r] = Rall[ndxR]
                     r += 1; finalstate = True
                 ndxR += 1
             pickRISE = False            # flip RISE to SET & vice-versa
@@ -453,7 +431,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = sett[ndxS]
                 valid = yS[ndxS]
                 if valid:
-                    Stxt[s] = time2text(t, with_seconds)
+                    Stxt[s] = Sall[ndxS]
                     s += 1; finalstate = False
                 ndxS += 1
             pickRISE = True             # flip RISE to SET & vice-versa
@@ -480,18 +458,19 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
 def fmt_transits(t, txt, with_seconds=False):
     # analyse the return values from the 'find_transits' method...
     # get planet transit times (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     transit1 = '--:--'
     transit2 = '--:--'
     if len(t) == 1:         # this happens most often
         t0 = t[0]
         # get the UT1 time rounded to minutes OR seconds ...
-        transit1 = time2text(t0, with_seconds)
+        transit1 = tt[0]
     else:
         if len(t) == 2:		# this happens very rarely
             t0 = t[0]; t1 = t[1]
             # get the UT1 time rounded to minutes OR seconds ...
-            transit1 = time2text(t0, with_seconds)
-            transit2 = time2text(t1, with_seconds)
+            transit1 = tt[0]
+            transit2 = tt[1]
         elif len(t) > 2:
             # this should never get here!
             rise_set_error(0,txt,t[0])
@@ -501,6 +480,7 @@ def fmt_transits(t, txt, with_seconds=False):
 def rise_set(t, y, txt, with_seconds=False):
     # analyse the return values from the 'find_discrete' method...
     # get sun/moon rise/set values (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     rise = '--:--'
     sett = '--:--'
     ris2 = '--:--'
@@ -511,14 +491,14 @@ def rise_set(t, y, txt, with_seconds=False):
         t0 = t[0]; t1 = t[1]        # Aug 2024 simplification
         if y[0] and not(y[1]):
             # get the UT1 time rounded to minutes OR seconds ...
-            rise = time2text(t0, with_seconds)
-            sett = time2text(t1, with_seconds)
+            rise = tt[0]
+            sett = tt[1]
             finalstate = False
         else:
             if not(y[0]) and y[1]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
-                rise = time2text(t1, with_seconds)
+                sett = tt[0]
+                rise = tt[1]
                 finalstate = True
             else:
                 # this should never get here!
@@ -528,27 +508,27 @@ def rise_set(t, y, txt, with_seconds=False):
             t0 = t[0]               # Aug 2024 simplification
             if y[0]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                rise = time2text(t0, with_seconds)
+                rise = tt[0]
                 finalstate = True
             else:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
+                sett = tt[0]
                 finalstate = False
         else:
             if len(t) == 3:		# this happens rarely (in high latitudes mid-year)
                 t0 = t[0]; t1 = t[1]; t2 = t[2]     # Aug 2024 simplification
                 if y[0] and not(y[1]) and y[2]:
                     # get the UT1 time rounded to minutes OR seconds ...
-                    rise = time2text(t0, with_seconds)
-                    sett = time2text(t1, with_seconds)
-                    ris2 = time2text(t2, with_seconds)
+                    rise = tt[0]
+                    sett = tt[1]
+                    ris2 = tt[2]
                     finalstate = True
                 else:
                     if not(y[0]) and y[1] and not(y[2]):
                         # get the UT1 time rounded to minutes OR seconds ...
-                        sett = time2text(t0, with_seconds)
-                        rise = time2text(t1, with_seconds)
-                        set2 = time2text(t2, with_seconds)
+                        sett = tt[0]
+                        rise = tt[1]
+                        set2 = tt[2]
                         finalstate = False
                     else:
                         # this should never get here!
@@ -589,51 +569,140 @@ def getDUT1(d):         # used in nautical.doublepage
     t = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
     return t.dut1, t.delta_t
 
+#-------------------------------
+#   Hourly ephemeris grid
+#-------------------------------
+
+# The daily pages require hourly positions of the Sun, Moon and the four
+# navigational planets (and GHA Aries). Instead of observing each body for
+# 24 epochs per day, 'build_grid' observes each body ONCE for every hour of
+# the date range to be printed (8760+ epochs for a year). The functions below
+# slice their day from the grid; dates outside the grid are calculated per day.
+# With 'config.cacheGRID' the grid consists of whole years that are re-used
+# from disk (see gridcache.py).
+
+grid = []       # list of grid partitions (see gridcache.partition)
+
+def build_grid(first_day, days):    # used in nautical.pages, suntables.pages & eventtables.pages
+    # the grid begins one day before first_day and ends four days after the last day
+    # (e.g. 'moonGHA' requires 23:59:30 on the previous day; 'ariestransit' 00:00 on day+1)
+    global grid
+    if not config.cacheGRID:
+        d0 = first_day - timedelta(days=1)
+        grid = [gridcache.partition(d0, *gridcache.compute(d0, days+5, ts, earth, bodies))]
+        return
+
+    # whole years are cached; less than a month in a year not yet cached is calculated only
+    last_day = first_day + timedelta(days=days+2)
+    grid = []
+    for y in range(first_day.year, last_day.year+1):
+        g = gridcache.open_year(y)
+        if g is None:
+            d1 = max(first_day, date(y, 1, 1))
+            d2 = min(last_day, date(y, 12, 31))
+            if (d2 - d1).days < 31:
+                d0 = d1 - timedelta(days=1)
+                g = gridcache.partition(d0, *gridcache.compute(d0, (d2 - d1).days + 3, ts, earth, bodies))
+            else:
+                g = gridcache.year_grid(y, ts, earth, bodies)
+        grid.append(g)
+    return
+
+def gridday(d):
+    # partition and index of date d in the grid (None if not covered including 00:00 on the next day)
+    for g in grid:
+        n = (d - g['first']).days
+        if 1 <= n <= g['days'] - 2: return g, n
+    return None
+
+def ingrid(d, days=1):      # used in nautical.planetstab(m) & sunmoontab(m)
+    # True if 'days' consecutive days starting with date d are in the grid
+    return gridday(d) is not None and gridday(d + timedelta(days=days-1)) is not None
+
+def hourly(d, name, hours=24):
+    # returns GAST, RA (hours), Dec (degrees) and distance (AU) of a body...
+    # ...for 'hours' hourly epochs beginning at 00:00 on date d
+    gd = gridday(d)
+    if gd is not None:
+        g, n = gd
+        i = n * 24
+        ra, dec, au = g[name]
+        return g['gast'][i:i+hours], ra[i:i+hours], dec[i:i+hours], au[i:i+hours]
+
+    e = day_epochs(d)
+    ra, dec, au = radec(e, name)
+    return e['gast'][:hours], ra[:hours], dec[:hours], au[:hours]
+
+#-------------------------------
+#   Per-day epoch registry
+#-------------------------------
+
+# Dates outside the grid were calculated by observing each body from its own
+# 'earth.at(t)' for the same hours. 'epochs' holds per date ONE set of hourly
+# Time objects (00:00 to 24:00, GAST and nutation computed) together with the
+# barycentric Earth position; every body is observed from it at most once.
+
+epochs = {}     # date -> dictionary (see day_epochs)
+
+def day_epochs(d):
+    # hourly epochs of date d, shared by all bodies
+    e = epochs.get(d)
+    if e is None:
+        if len(epochs) >= 4: epochs.clear()     # only a few consecutive dates are needed
+        t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day + [24], 0, 0))
+        e = {'t': t, 'gast': t.gast, 'observer': earth.at(t)}
+        epochs[d] = e
+    return e
+
+def astrometric(e, name):
+    # position of a body as observed from the epochs e
+    if name + 'pos' not in e:
+        e[name + 'pos'] = e['observer'].observe(bodies[name])
+    return e[name + 'pos']
+
+def radec(e, name):
+    # RA (hours), Dec (degrees) and distance (AU) of a body at the epochs e
+    if name not in e:
+        ra, dec, distance = precision.apparent(astrometric(e, name)).radec(epoch='date')
+        e[name] = (ra.hours, dec.degrees, distance.au)
+    return e[name]
+
+def moonEoD(d, with_seconds = False):
+    # the moon's GHA at End of Day (23:59:59.5 or 23:59:30) on date d
+    e = day_epochs(d)
+    key = 'moonEoD2' if with_seconds else 'moonEoD'
+    if key not in e:
+        tEoD = precision.fast(ts.ut1(d.year, d.month, d.day, 23, 59, 59.5 if with_seconds else 30))
+        raEoD = precision.apparent(earth.at(tEoD).observe(moon)).radec(epoch='date')[0]
+        e[key] = gha2deg(tEoD.gast, raEoD.hours)    # GHA as float
+    return e[key]
+
 #-------------------------------
 #   Sun and Moon calculations
 #-------------------------------
 
 def sunGHA(d):              # used in nautical.sunmoontab(m)
     # compute sun's GHA and DEC per hour of day
+    gast, ra, dec, _ = hourly(d, 'sun')
 
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(sun)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(gast, ra)
+    decs = tablefmt.degrees(dec, 2)
+    degs = list(dec)
 
     # degs has been added for the suntab function
     return ghas,decs,degs
 
 def sunSD(d):               # used in nautical.sunmoontab(m)
     # compute semi-diameter of sun and sun's declination change per hour (in minutes)
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)
-    position = earth.at(t00).observe(sun)
-    distance = position.apparent().radec(epoch='date')[2]
-    dist_km = distance.km
+    gast, ra, dec, au = hourly(d, 'sun', 2)     # at 00:00 and 01:00
+    dist_km = au[0] * AU_KM
 # OLD:  sds = degrees(atan(695500.0 / dist_km))   # radius of sun = 695500 km
     svmr  = degrees(atan(695700.0 / dist_km))   # volumetric mean radius of sun = 695700 km
     sunVMRm = "{:0.1f}".format(svmr * 60)   # convert to minutes of arc
 
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    position0 = earth.at(t0).observe(sun)
-    dec0 = position0.apparent().radec(epoch='date')[1]
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
-    t1= ts.ut1(d.year, d.month, d.day, 1, 0, 0)
-    position1 = earth.at(t1).observe(sun)
-    dec1 = position1.apparent().radec(epoch='date')[1]
-    D1 = dec1.degrees * 60.0    # convert to minutes of arc
+    D0 = dec[0] * 60.0    # convert to minutes of arc
+    D1 = dec[1] * 60.0    # convert to minutes of arc
     if config.d_valNA:
         Dvalue = abs(D1 - D0)
     elif copysign(1.0,D1) == copysign(1.0,D0):
@@ -645,60 +714,51 @@ def sunSD(d):               # used in nautical.sunmoontab(m)
 
 def moonSD(d):              # used in nautical.sunmoontab(m)
     # compute semi-diameter of moon (in minutes)
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)
-    position = earth.at(t00).observe(moon)
-    distance = position.apparent().radec(epoch='date')[2]
-    dist_km = distance.km
+    gast, ra, dec, au = hourly(d, 'moon', 1)    # at 00:00
+    dist_km = au[0] * AU_KM
 # OLD: sdm = degrees(atan(1738.1/dist_km))   # equatorial radius of moon = 1738.1 km
     sdm = degrees(atan(1737.4/dist_km))   # volumetric mean radius of moon = 1737.4 km
     sdmm = "{:0.1f}".format(sdm * 60)  # convert to minutes of arc
     return sdmm
 
+def moonSoDEoD(d, with_seconds = False):
+    # the moon's GHA at Start of Day and End of Day (23:59:59.5 or 23:59:30 on d-1 and d)
+    gd = gridday(d)
+    if gd is not None:
+        g, n = gd
+        # GHA at End of Day (23:59:59.5 or 23:59:30) and Start of Day (24 hours earlier)
+        gastEoD, raEoD = g['moonEoD2'] if with_seconds else g['moonEoD']
+        ghaSoD = gha2deg(gastEoD[n-1], raEoD[n-1])  # GHA as float
+        ghaEoD = gha2deg(gastEoD[n], raEoD[n])      # GHA as float
+    else:
+        # Start of Day is the End of the previous day
+        ghaSoD = moonEoD(d - timedelta(days=1), with_seconds)
+        ghaEoD = moonEoD(d, with_seconds)
+    return ghaSoD, ghaEoD
+
 def moonGHA(d, with_seconds = False):  # used in nautical.sunmoontab(m) & eventtables.equationtab
     # compute moon's GHA, DEC and HP per hour of day
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    #distance = position.apparent().radec(epoch='date')[2]
-    ra, dec, distance = position.apparent().radec(epoch='date')
-
-    if with_seconds:
-        # also compute moon's GHA at End of Day (23:59:59.5) and Start of Day (24 hours earlier)
-        tSoD = ts.ut1(d.year, d.month, d.day-1, 23, 59, 59.5)
-        tEoD = ts.ut1(d.year, d.month, d.day, 23, 59, 59.5)
-    else:   # round to minutes of time
-        # also compute moon's GHA at End of Day (23:59:30) and Start of Day (24 hours earlier)
-        tSoD = ts.ut1(d.year, d.month, d.day-1, 23, 59, 30)
-        tEoD = ts.ut1(d.year, d.month, d.day, 23, 59, 30)
-
-    posSoD = earth.at(tSoD).observe(moon)
-    raSoD = posSoD.apparent().radec(epoch='date')[0]
-    ghaSoD = gha2deg(tSoD.gast, raSoD.hours)   # GHA as float
-    posEoD = earth.at(tEoD).observe(moon)
-    raEoD = posEoD.apparent().radec(epoch='date')[0]
-    ghaEoD = gha2deg(tEoD.gast, raEoD.hours)   # GHA as float
+    gast, ra, dec, au = hourly(d, 'moon')
+    ghaSoD, ghaEoD = moonSoDEoD(d, with_seconds)
 
     GHAupper = [-1.0 for x in range(24)]
     GHAlower = [-1.0 for x in range(24)]
-    gham = ['' for x in range(24)]
-    decm = ['' for x in range(24)]
-    degm = ['' for x in range(24)]
-    HPm  = ['' for x in range(24)]
+    HP = [0.0 for x in range(24)]
 
-    for i in range(len(dec.degrees)):
-##        raIDL = ra.hours[i] + 12	# at International Date Line
+    for i in range(len(dec)):
+##        raIDL = ra[i] + 12	# at International Date Line
 ##        if raIDL > 24: raIDL = raIDL - 24
-        GHAupper[i] = gha2deg(t[i].gast, ra.hours[i])   # GHA as float
+        GHAupper[i] = gha2deg(gast[i], ra[i])   # GHA as float
         GHAlower[i] = GHAcolong(GHAupper[i])
-        gham[i] = fmtgha(t[i].gast, ra.hours[i])
-        decm[i] = fmtdeg(dec.degrees[i],2)
-        degm[i] = dec.degrees[i]
-        dist_km = distance.km[i]
+        dist_km = au[i] * AU_KM
 # OLD:  HP = degrees(atan(6378.0/dist_km))	# radius of earth = 6378.0 km
-        HP = degrees(atan(6371.0/dist_km))	# volumetric mean radius of earth = 6371.0 km
-        HPm[i] = "{:0.1f}'".format(HP * 60)     # convert to minutes of arc
+        HP[i] = degrees(atan(6371.0/dist_km)) * 60  # volumetric mean radius of earth = 6371.0 km (in minutes of arc)
+
+    # each column is formatted at once (see tablefmt.py)
+    gham = tablefmt.gha(gast, ra)
+    decm = tablefmt.degrees(dec, 2)
+    degm = list(dec)
+    HPm  = tablefmt.minutes(HP)
 
     # degm has been added for the sunmoontab function
     # GHAupper is an array of GHA per hour as float
@@ -710,172 +770,75 @@ def moonVD(d00, d):           # used in nautical.sunmoontab(m)
 # OLD:  # first value required is from 23:30 on the previous day...
 # OLD:  t0 = ts.ut1(d00.year, d00.month, d00.day, 23, 30, 0)
     # first value required is at 00:00 on the current day...
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    pos0 = earth.at(t0).observe(moon)
-    #ra0 = pos0.apparent().radec(epoch='date')[0]
-    #dec0 = pos0.apparent().radec(epoch='date')[1]
-    ra0, dec0, _ = pos0.apparent().radec(epoch='date')
-    V0 = gha2deg(t0.gast, ra0.hours)
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
+    # ...then 24 values at hourly intervals from 01:00 onwards
+    gast, ra, dec, _ = hourly(d, 'moon', 25)
+    V0 = gha2deg(gast[0], ra[0])
+    D0 = dec[0] * 60.0    # convert to minutes of arc
     if config.d_valNA:
         D0 = round(D0, 1)
 
-# OLD:  # ...then 24 values at hourly intervals from 23:30 onwards
-# OLD:  t = ts.ut1(d.year, d.month, d.day, hour_of_day, 30, 0)
-    # ...then 24 values at hourly intervals from 00:00 onwards
-    t = ts.ut1(d.year, d.month, d.day, next_hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    moonVm = ['' for x in range(24)]
-    moonDm = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        V1 = gha2deg(t[i].gast, ra.hours[i])
+    Vdm = [0.0 for x in range(24)]
+    Dvalue = [0.0 for x in range(24)]
+    for i in range(24):
+        V1 = gha2deg(gast[i+1], ra[i+1])
         Vdelta = V1 - V0
         if Vdelta < 0: Vdelta += 360
-        Vdm = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
-        moonVm[i] = "{:0.1f}'".format(Vdm)
-        D1 = dec.degrees[i] * 60.0  # convert to minutes of arc
+        Vdm[i] = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
+        D1 = dec[i+1] * 60.0  # convert to minutes of arc
         if config.d_valNA:
             D1 = round(D1, 1)
-            Dvalue = abs(D1 - D0)
+            Dvalue[i] = abs(D1 - D0)
         elif copysign(1.0,D1) == copysign(1.0,D0):
-            Dvalue = abs(D1) - abs(D0)
+            Dvalue[i] = abs(D1) - abs(D0)
         else:
-            Dvalue = -abs(D1 - D0)
-        moonDm[i] = "{:0.1f}'".format(Dvalue)
+            Dvalue[i] = -abs(D1 - D0)
         V0 = V1		# store current value as next previous value
         D0 = D1		# store current value as next previous value
+    moonVm = tablefmt.minutes(Vdm)      # each column is formatted at once
+    moonDm = tablefmt.minutes(Dvalue)
     return moonVm, moonDm
 
 #------------------------------------------------
 #   Venus, Mars, Jupiter & Saturn calculations
 #------------------------------------------------
 
-def venusGHA(d):            # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(venus)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+def planetGHA(d, name):
+    # compute a planet's GHA and DEC per hour of day
+    gast, ra, dec, _ = hourly(d, name)
+
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(gast, ra)
+    decs = tablefmt.degrees(dec, 2)
+    degs = list(dec)
     return ghas, decs, degs
 
+def venusGHA(d):            # used in nautical.planetstab(m)
+    return planetGHA(d, 'venus')
+
 def marsGHA(d):             # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(mars)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
-    return ghas, decs, degs
+    return planetGHA(d, 'mars')
 
 def jupiterGHA(d):          # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(jupiter)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
-    return ghas, decs, degs
+    return planetGHA(d, 'jupiter')
 
 def saturnGHA(d):           # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(saturn)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
-    return ghas, decs, degs
+    return planetGHA(d, 'saturn')
 
-def vdm_Venus(d):           # used in nautical.planetstab(m)
+def vdm_planet(d, name):
     # compute v (GHA correction), d (Declination correction), m (magnitude of planet)
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    position0 = earth.at(t0).observe(venus)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #dec0 = position0.apparent().radec(epoch='date')[1]	# declination
-    ra0, dec0, _ = position0.apparent().radec(epoch='date')
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
-    mag = "{:0.2f}".format(planetary_magnitude(position0))  # planetary magnitude
-
-    t1 = ts.ut1(d.year, d.month, d.day, 1, 0, 0)
-    position1 = earth.at(t1).observe(venus)
-    #ra1 = position1.apparent().radec(epoch='date')[0]	# RA
-    #dec1 = position1.apparent().radec(epoch='date')[1]	# declination
-    ra1, dec1, _ = position1.apparent().radec(epoch='date')
-    D1 = dec1.degrees * 60.0    # convert to minutes of arc
-
-    sha0 = (t0.gast - ra0.hours) * 15
-    sha1 = (t1.gast - ra1.hours) * 15
-    sha  = norm(sha1 - sha0) - 15
-    RAcorrm = "{:0.1f}".format(sha * 60)	# convert to minutes of arc
-    if config.d_valNA:
-        Dvalue = abs(D1 - D0)
-    elif copysign(1.0,D1) == copysign(1.0,D0):
-        Dvalue = abs(D1) - abs(D0)
+    gast, ra, dec, _ = hourly(d, name, 2)     # at 00:00 and 01:00
+    gd = gridday(d)
+    if gd is not None:
+        g, n = gd
+        magnitude = g[name + 'mag'][n]
     else:
-        Dvalue = -abs(D1 - D0)
-    venusDm = "{:0.1f}".format(Dvalue)
-    return RAcorrm, venusDm, mag
+        magnitude = planetary_magnitude(astrometric(day_epochs(d), name))[0]
+    mag = "{:0.2f}".format(magnitude)  # planetary magnitude
+    D0 = dec[0] * 60.0    # convert to minutes of arc
+    D1 = dec[1] * 60.0    # convert to minutes of arc
 
-def vdm_Mars(d):            # used in nautical.planetstab(m)
-    # compute v (GHA correction), d (Declination correction)
-    # NOTE: m (magnitude of planet) comes from alma_ephem.py
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    position0 = earth.at(t0).observe(mars)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #dec0 = position0.apparent().radec(epoch='date')[1]	# declination
-    ra0, dec0, _ = position0.apparent().radec(epoch='date')
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
-    mag = "{:0.2f}".format(planetary_magnitude(position0))  # planetary magnitude
-
-    t1 = ts.ut1(d.year, d.month, d.day, 1, 0, 0)
-    position1 = earth.at(t1).observe(mars)
-    #ra1 = position1.apparent().radec(epoch='date')[0]	# RA
-    #dec1 = position1.apparent().radec(epoch='date')[1]	# declination
-    ra1, dec1, _ = position1.apparent().radec(epoch='date')
-    D1 = dec1.degrees * 60.0    # convert to minutes of arc
-
-    sha0 = (t0.gast - ra0.hours) * 15
-    sha1 = (t1.gast - ra1.hours) * 15
+    sha0 = (gast[0] - ra[0]) * 15
+    sha1 = (gast[1] - ra[1]) * 15
     sha  = norm(sha1 - sha0) - 15
     RAcorrm = "{:0.1f}".format(sha * 60)	# convert to minutes of arc
     if config.d_valNA:
@@ -884,87 +847,45 @@ def vdm_Mars(d):            # used in nautical.planetstab(m)
         Dvalue = abs(D1) - abs(D0)
     else:
         Dvalue = -abs(D1 - D0)
-    marsDm = "{:0.1f}".format(Dvalue)
-    return RAcorrm, marsDm, mag
+    planetDm = "{:0.1f}".format(Dvalue)
+    return RAcorrm, planetDm, mag
+
+def vdm_Venus(d):           # used in nautical.planetstab(m)
+    return vdm_planet(d, 'venus')
+
+def vdm_Mars(d):            # used in nautical.planetstab(m)
+    return vdm_planet(d, 'mars')
 
 def vdm_Jupiter(d):         # used in nautical.planetstab(m)
-    # compute v (GHA correction), d (Declination correction), m (magnitude of planet)
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    position0 = earth.at(t0).observe(jupiter)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #dec0 = position0.apparent().radec(epoch='date')[1]	# declination
-    ra0, dec0, _ = position0.apparent().radec(epoch='date')
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
-    mag = "{:0.2f}".format(planetary_magnitude(position0))  # planetary magnitude
-
-    t1 = ts.ut1(d.year, d.month, d.day, 1, 0, 0)
-    position1 = earth.at(t1).observe(jupiter)
-    #ra1 = position1.apparent().radec(epoch='date')[0]	# RA
-    #dec1 = position1.apparent().radec(epoch='date')[1]	# declination
-    ra1, dec1, _ = position1.apparent().radec(epoch='date')
-    D1 = dec1.degrees * 60.0    # convert to minutes of arc
-
-    sha0 = (t0.gast - ra0.hours) * 15
-    sha1 = (t1.gast - ra1.hours) * 15
-    sha  = norm(sha1 - sha0) - 15
-    RAcorrm = "{:0.1f}".format(sha * 60)	# convert to minutes of arc
-    if config.d_valNA:
-        Dvalue = abs(D1 - D0)
-    elif copysign(1.0,D1) == copysign(1.0,D0):
-        Dvalue = abs(D1) - abs(D0)
-    else:
-        Dvalue = -abs(D1 - D0)
-    jupDm = "{:0.1f}".format(Dvalue)
-    return RAcorrm, jupDm, mag
+    return vdm_planet(d, 'jupiter')
 
 def vdm_Saturn(d):          # used in nautical.planetstab(m)
-    # compute v (GHA correction), d (Declination correction)
-    # NOTE: m (magnitude of planet) comes from alma_ephem.py
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    position0 = earth.at(t0).observe(saturn)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #dec0 = position0.apparent().radec(epoch='date')[1]	# declination
-    ra0, dec0, _ = position0.apparent().radec(epoch='date')
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
-    mag = "{:0.2f}".format(planetary_magnitude(position0))  # planetary magnitude
-
-    t1 = ts.ut1(d.year, d.month, d.day, 1, 0, 0)
-    position1 = earth.at(t1).observe(saturn)
-    #ra1 = position1.apparent().radec(epoch='date')[0]	# RA
-    #dec1 = position1.apparent().radec(epoch='date')[1]	# declination
-    ra1, dec1, _ = position1.apparent().radec(epoch='date')
-    D1 = dec1.degrees * 60.0    # convert to minutes of arc
-
-    sha0 = (t0.gast - ra0.hours) * 15
-    sha1 = (t1.gast - ra1.hours) * 15
-    sha  = norm(sha1 - sha0) - 15
-    RAcorrm = "{:0.1f}".format(sha * 60)	# convert to minutes of arc
-    if config.d_valNA:
-        Dvalue = abs(D1 - D0)
-    elif copysign(1.0,D1) == copysign(1.0,D0):
-        Dvalue = abs(D1) - abs(D0)
-    else:
-        Dvalue = -abs(D1 - D0)
-    satDm = "{:0.1f}".format(Dvalue)
-    return RAcorrm, satDm, mag
+    return vdm_planet(d, 'saturn')
 
 #-----------------------------------------
 #   Aries & planet transit calculations
 #-----------------------------------------
 
 def ariesGHA(d):            # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    gd = gridday(d)
+    if gd is not None:
+        g, n = gd
+        gast = g['gast'][n*24:n*24+24]
+    else:
+        gast = day_epochs(d)['gast']
 
-    ghas = ['' for x in range(24)]
-    for i in range(24):
-        ghas[i] = fmtgha(t[i].gast, 0)
-    return ghas
+    return tablefmt.gha(gast[0:24], 0)
 
 def ariestransit(d):        # used in nautical.planetstab(m)
     # returns transit time of aries for the *PREVIOUS* date
 
-    t = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    trans = 24 - (t.gast / 1.00273790935)
+    gd = gridday(d)
+    if gd is not None:
+        g, n = gd
+        gast = g['gast'][n*24]
+    else:
+        gast = day_epochs(d)['gast'][0]
+    trans = 24 - (gast / 1.00273790935)
     hr = int(trans)
     # round >=30 seconds to next minute
     #min = tup[-2] + int(round(tup[-1]/60+0.00001))
@@ -983,17 +904,10 @@ def planetstransit(d, with_seconds = False):        # used in nautical.starstab
     t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
     t1 = ts.ut1(d1.year, d1.month, d1.day, 0, 0, 0)
 
-    if SkyfieldVersion("1.48") >= 0:
-        topos = wgs84.latlon(0.0 * N, 0.0 * E, elevation_m=0.0) # default latitude 0°N (any will do)
-        observer = earth + topos
-
 # Venus
-    position0 = earth.at(t0).observe(venus)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #vau = position0.apparent().radec(epoch='date')[2]	# distance
-    ra0, _, vau = position0.apparent().radec(epoch='date')
-    vsha = fmtgha(0, ra0.hours)
-    hpvenus = "{:0.1f}".format((tan(6371/(vau.au*149597870.7)))*60*180/pi)
+    gast, ra0, _, vau = hourly(d, 'venus', 1)  # RA and distance at 00:00
+    vsha = fmtgha(0, ra0[0])
+    hpvenus = "{:0.1f}".format((tan(6371/(vau[0]*149597870.7)))*60*180/pi)
 
     #position = earth.at(t0).observe(venus)
     #ra = position.apparent().radec(epoch='date')[0]
@@ -1001,76 +915,76 @@ def planetstransit(d, with_seconds = False):        # used in nautical.starstab
 
     # calculate planet transit
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         transit_time, y = almanac.find_discrete(t0, t1, planet_transit(venus))
         config.stopwatch += Time.time()-start00 # 00000
         vtrans = rise_set(transit_time,y,u'Venus   0{} E transit'.format(degree_sign),with_seconds)[0]
     else:
-        transit_time = almanac.find_transits(observer, venus, t0, t1)
+        vtrans = planet_text('venus', d, t0, t1, u'Venus   0{} E transit'.format(degree_sign), with_seconds)
         config.stopwatch += Time.time()-start00 # 00000
-        vtrans = fmt_transits(transit_time,u'Venus   0{} E transit'.format(degree_sign),with_seconds)[0]
     #if len(transit_time) != 1:
     #    print('Venus returned %s transit values' %len(transit_time))
 
 # Mars
-    position0 = earth.at(t0).observe(mars)
-    #ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    #mau = position0.apparent().radec(epoch='date')[2]	# distance
-    ra0, _, mau = position0.apparent().radec(epoch='date')
-    marssha = fmtgha(0, ra0.hours)
-    hpmars = "{:0.1f}".format((tan(6371/(mau.au*149597870.7)))*60*180/pi)
+    gast, ra0, _, mau = hourly(d, 'mars', 1)   # RA and distance at 00:00
+    marssha = fmtgha(0, ra0[0])
+    hpmars = "{:0.1f}".format((tan(6371/(mau[0]*149597870.7)))*60*180/pi)
 
     # calculate planet transit
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         transit_time, y = almanac.find_discrete(t0, t1, planet_transit(mars))
         config.stopwatch += Time.time()-start00 # 00000
         marstrans = rise_set(transit_time,y,u'Mars    0{} E transit'.format(degree_sign),with_seconds)[0]
     else:
-        transit_time = almanac.find_transits(observer, mars, t0, t1)
+        marstrans = planet_text('mars', d, t0, t1, u'Mars    0{} E transit'.format(degree_sign), with_seconds)
         config.stopwatch += Time.time()-start00 # 00000
-        marstrans = fmt_transits(transit_time,u'Mars    0{} E transit'.format(degree_sign),with_seconds)[0]
     #if len(transit_time) != 1:
     #    print('Mars returned %s transit values' %len(transit_time))
 
 # Jupiter
-    position0 = earth.at(t0).observe(jupiter)
-    ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    jsha = fmtgha(0, ra0.hours)
+    ra0 = hourly(d, 'jupiter', 1)[1]   # RA at 00:00
+    jsha = fmtgha(0, ra0[0])
 
     # calculate planet transit
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         transit_time, y = almanac.find_discrete(t0, t1, planet_transit(jupiter))
         config.stopwatch += Time.time()-start00 # 00000
         jtrans = rise_set(transit_time,y,u'Jupiter 0{} E transit'.format(degree_sign),with_seconds)[0]
     else:
-        transit_time = almanac.find_transits(observer, jupiter, t0, t1)
+        jtrans = planet_text('jupiter', d, t0, t1, u'Jupiter 0{} E transit'.format(degree_sign), with_seconds)
         config.stopwatch += Time.time()-start00 # 00000
-        jtrans = fmt_transits(transit_time,u'Jupiter 0{} E transit'.format(degree_sign),with_seconds)[0]
     #if len(transit_time) != 1:
     #    print('Jupiter returned %s transit values' %len(transit_time))
 
 # Saturn
-    position0 = earth.at(t0).observe(saturn)
-    ra0 = position0.apparent().radec(epoch='date')[0]	# RA
-    satsha = fmtgha(0, ra0.hours)
+    ra0 = hourly(d, 'saturn', 1)[1]    # RA at 00:00
+    satsha = fmtgha(0, ra0[0])
 
     # calculate planet transit
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         transit_time, y = almanac.find_discrete(t0, t1, planet_transit(saturn))
         config.stopwatch += Time.time()-start00 # 00000
         sattrans = rise_set(transit_time,y,u'Saturn  0{} E transit'.format(degree_sign),with_seconds)[0]
     else:
-        transit_time = almanac.find_transits(observer, saturn, t0, t1)
+        sattrans = planet_text('saturn', d, t0, t1, u'Saturn  0{} E transit'.format(degree_sign), with_seconds)
         config.stopwatch += Time.time()-start00 # 00000
-        sattrans = fmt_transits(transit_time,u'Saturn  0{} E transit'.format(degree_sign),with_seconds)[0]
     #if len(transit_time) != 1:
     #    print('Saturn returned %s transit values' %len(transit_time))
 
     return [vsha,vtrans,marssha,marstrans,jsha,jtrans,satsha,sattrans,hpmars,hpvenus]
 
+def planet_text(name, d, t0, t1, txt, with_seconds):
+    # a planet's transit time (text) on date d from the event cache ... or calculated
+    kind = name + 'transit'
+    out = eventcache.get(kind, 0.0, d, with_seconds)
+    if out is None:
+        out = fmt_transits(planet_day(name, d, t0, t1),txt,with_seconds)[0]
+        eventcache.put(kind, 0.0, d, with_seconds, out)
+    return out
+
 def planet_transit(planet_name):
     # Build a function of time that returns a planet's upper transit time.
 
@@ -1095,22 +1009,13 @@ def planet_transit(planet_name):
 def stellar_info(d):        # used in starstab
     # returns a list of lists with name, SHA and Dec all navigational stars for epoch of date.
 
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)   #calculate at midnight
+    t00 = precision.fast(ts.ut1(d.year, d.month, d.day, 0, 0, 0))   #calculate at midnight
     #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)  #calculate at noon
     out = []
 
-    for line in db.strip().split('\n'):
-        x1 = line.index(',')
-        name = line[0:x1]
-        HIPnum = line[x1+1:]
-
-        star = Star.from_dataframe(df.loc[int(HIPnum)])
-        astrometric = earth.at(t00).observe(star).apparent()
-        ra, dec, distance = astrometric.radec(epoch='date')
-
-        sha  = fmtgha(0, ra.hours)
-        decl = fmtdeg(dec.degrees)
-
+    # all navigational stars are observed at once
+    ra, dec = starcat.apparent_radec(navstars, earth.at(t00))
+    for name, sha, decl in zip(navnames, tablefmt.gha(0, ra), tablefmt.degrees(dec)):
         out.append([name,sha,decl])
     return out
 
@@ -1180,26 +1085,39 @@ Fomalhaut,113368
 Scheat,113881
 Markab,113963
 """
+navnames = [line.rsplit(',', 1)[0] for line in db.strip().split('\n')]
+navhips  = [int(line.rsplit(',', 1)[1]) for line in db.strip().split('\n')]
+navstars = None     # compact catalog of the navigational stars (see starcat.py)
+
+#------------------------
+#   observer registry
+#------------------------
+
+registry = {}       # latitude -> topos, observer and label (see observers.py)
+
+def lat_observer(lat):
+    # topos, observer and label at latitude 'lat' (longitude 0) from the observer registry
+    return observers.lookup(registry, earth, lat)
 
 #------------------------
 #   SUN TWILIGHT table
 #------------------------
 
-def twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (section 1)
+def twilight(d, lat, with_seconds = False, astro = False):     # used in nautical.twilighttab (section 1) & eventtables.twilighttab
     # Returns for given date and latitude(in full degrees):
     # naut. and civil twilight (before sunrise), sunrise, meridian passage, sunset, civil and nautical twilight (after sunset).
     # NOTE: 'twilight' is only called for every third day in the Full Almanac...
     #       ...therefore daily tracking of the sun state is not possible.
 
+    astro = astro and config.astroTW            # astronomical twilight (Event Time tables only)
+    kind = 'twilight18' if astro else 'twilight'
+    out = eventcache.get(kind, lat, d, with_seconds)
+    if out is not None: return out
+
     out = [0,0,0,0,0,0]
     hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
+    topos, observer, latNS = lat_observer(lat)
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
 
     if with_seconds:
         dt -= timedelta(seconds=0.5)    # search from 0.5 seconds before midnight
@@ -1212,13 +1130,12 @@ def twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (
 
     # Sunrise/Sunset...
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         actual, y = almanac.find_discrete(t0, t1, f_sun(topos, 0.8333))
         config.stopwatch += Time.time()-start00 # 00000
         out[2], out[3], r2, s2, fs = rise_set(actual,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -0.8333)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -0.8333)
+        sunrise, yR, sunset, yS = sun_day(t0, t1, astro)[0.8333][config.lat.index(lat)]
         config.stopwatch += Time.time()-start00 # 00000
         out[2], out[3], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -1230,13 +1147,12 @@ def twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (
 
     # Civil Twilight...
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         civil, y = almanac.find_discrete(t0, t1, f_sun(topos, 6.0))
         config.stopwatch += Time.time()-start00 # 00000
         out[1], out[4], r2, s2, fs = rise_set(civil,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -6.0)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -6.0)
+        sunrise, yR, sunset, yS = sun_day(t0, t1, astro)[6.0][config.lat.index(lat)]
         config.stopwatch += Time.time()-start00 # 00000
         out[1], out[4], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -1247,13 +1163,12 @@ def twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (
 
     # Nautical Twilight...
     start00 = Time.time()                       # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         naut, y = almanac.find_discrete(t0, t1, f_sun(topos, 12.0))
         config.stopwatch += Time.time()-start00 # 00000
         out[0], out[5], r2, s2, fs = rise_set(naut,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -12.0)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -12.0)
+        sunrise, yR, sunset, yS = sun_day(t0, t1, astro)[12.0][config.lat.index(lat)]
         config.stopwatch += Time.time()-start00 # 00000
         out[0], out[5], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -1262,8 +1177,77 @@ def twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (
         out[0] = yn
         out[5] = yn
 
+    # Astronomical Twilight (Event Time tables only)...
+    if astro:
+        out.extend([0,0])
+        start00 = Time.time()                       # 00000
+        if not observers.risingsok:
+            astro, y = almanac.find_discrete(t0, t1, f_sun(topos, 18.0))
+            config.stopwatch += Time.time()-start00 # 00000
+            out[6], out[7], r2, s2, fs = rise_set(astro,y,latNS,with_seconds)
+        else:
+            sunrise, yR, sunset, yS = sun_day(t0, t1, astro)[18.0][config.lat.index(lat)]
+            config.stopwatch += Time.time()-start00 # 00000
+            out[6], out[7], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
+
+        if abhd and out[6] == '--:--' and out[7] == '--:--':	# if neither begin nor end...
+            yn = midnightsun(d, hemisph)
+            out[6] = yn
+            out[7] = yn
+
+    eventcache.put(kind, lat, d, with_seconds, out)
     return out
 
+# The events of all latitudes are calculated together (see multilat.py) when
+# the first latitude of a date is requested; the others are looked up.
+
+sunevents = {}      # (t0, t1) -> horizon -> (sunrise, yR, sunset, yS) per latitude
+eventtable = {}     # events of all days of the period (see sweep_events)
+deferred = {}       # sweeps postponed until an event is not in the event cache
+
+def sweep_events(first_day, days, sec, astro=False):    # used in nautical.pages & eventtables.pages
+    # calculate the events of all days from first_day-1 to first_day+days+1 at
+    # once (days begin 'sec' seconds before midnight as in the tables; 'astro'
+    # adds astronomical twilight, see multilat.twilight_horizons)
+    eventtable.clear()
+    deferred.pop('events', None)
+    if not config.sweepEV: return
+    if eventcache.active():     # ... when the first event is not found in the cache
+        deferred['events'] = (event_sweep, (first_day, days, sec, astro))
+        return
+    event_sweep(first_day, days, sec, astro)
+
+def event_sweep(first_day, days, sec, astro):
+    t0 = []
+    t1 = []
+    horizons = []
+    for n in range(-1, days + 2):
+        dt = datetime(first_day.year, first_day.month, first_day.day, 0, 0, 0)
+        dt += timedelta(days=n, seconds=-sec)
+        t0.append(ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second))
+        t1.append(ts.ut1(dt.year, dt.month, dt.day+1, dt.hour, dt.minute, dt.second))
+        horizons.append(getHorizon(ts.ut1(dt.year, dt.month, dt.day, dt.hour+12, dt.minute, dt.second)))
+    start00 = Time.time()                   # 00000
+    eventtable.update(multilat.event_table(ts, earth, sun, moon, config.lat, t0, t1, multilat.twilight_horizons(astro), horizons))
+    config.stopwatch += Time.time()-start00 # 00000
+
+def run_deferred(name):
+    # a sweep postponed by sweep_events or sweep_transits
+    if name in deferred:
+        func, args = deferred.pop(name)
+        func(*args)
+
+def sun_day(t0, t1, astro=False):
+    # sunrise/sunset, civil, nautical (and astronomical) twilight at all latitudes between t0 and t1
+    run_deferred('events')
+    key = (t0.tt, t1.tt)
+    if key in eventtable: return eventtable[key]
+    key = (t0.tt, t1.tt, astro)
+    if key not in sunevents:
+        if len(sunevents) >= 4: sunevents.clear()   # only a few consecutive dates are needed
+        sunevents[key] = multilat.sun_events(ts, earth, sun, config.lat, t0, t1, multilat.twilight_horizons(astro))
+    return sunevents[key]
+
 def midnightsun(d, hemisph):
     # simple way to fudge whether the sun is up or down when there's no
     # sunrise or sunset on date 'dt' depending on the hemisphere only.
@@ -1305,24 +1289,18 @@ def f_sun(topos, degBelowHorizon):
 #    moonvisible[0] is not linked to a latitude but a manual override
 moonvisible = [None] * 32       # moonvisible[0] up to moonvisible[31]
 
-# create a list of dates with pre-calculated moonrise/moonset data in 'np_array'
-#    MoonDate[0 to MDlen-1] = a date, the index of which corresponds to the first index in 'np_array'
-# note: this is only used for hh:mm rise/set times (rounded to the minute)
-# note: MDlen > 5 has no advantage - it only wastes array memory space
-MDlen = 5                   # number of days in transient MoonData store (np_array)
-MoonDate = [None] * MDlen   # MoonDate[0] up to MoonDate[MDlen-1]
-MDndx = MDlen - 1           # index to latest added date (initially 0 will be chosen)
-
-# create a homogeneous NumPy array of 2 Moon Rise/Set data values per 31 latitudes, up to 'MDlen' adjacent days
-#    This increases performance when creating a Nautical Almanac by about 12% 
-#       by avoiding data re-calculation in special cases.
-#    MoonData[date][lat][item]
-#       date[0 to 9] = a date index 'i' corresponding to MoonDate[i]
-#       lat[0 to 31] = index 'i' to config.lat[i]
-#       item[0] = rise time (hh:mm) or '--:--'
-#       item[1] = set  time (hh:mm) or '--:--'
-#       item[1][2:3] ... the middle character is 'finalstate' ... 'n' = above horizon; 'v' = below horizon
-np_array = np.ndarray(shape=(MDlen,31,2), dtype=np.dtype('U5'))
+moonevents = {}     # (tFrom, tTo, horizon) -> (times, y) per latitude
+moonhorizons = {}   # tNoon -> the moon's horizon (see moonHorizon)
+
+def moon_day(tFrom, tTo, horizon):
+    # moonrise/moonset events at all latitudes between tFrom and tTo (see multilat.py)
+    run_deferred('events')
+    key = (tFrom.tt, tTo.tt, horizon)
+    if key in eventtable: return eventtable[key]
+    if key not in moonevents:
+        if len(moonevents) >= 8: moonevents.clear()     # 3 days plus the days before/after
+        moonevents[key] = multilat.moon_events(ts, earth, moon, config.lat, tFrom, tTo, horizon)
+    return moonevents[key]
 
 def getHorizon(t):
     # calculate the angle of the moon below the horizon at moonrise/set
@@ -1336,60 +1314,37 @@ def getHorizon(t):
 
     return horizon
 
+def moonHorizon(tNoon):
+    # getHorizon at noontime (the daily average distance) ... calculated once per day
+    key = tNoon.tt
+    if key not in moonhorizons:
+        if len(moonhorizons) >= 16: moonhorizons.clear()    # only a few consecutive dates are needed
+        moonhorizons[key] = getHorizon(tNoon)
+    return moonhorizons[key]
+
 def fetchMoonData(d, tFrom, tNoon, tTo, i, lat, hFlag = False, with_seconds=False):
     # calculate & store moon data (rise/set times) or fetch data if pre-calculated.
     # --- THIS IMPROVES PERFORMANCE BY AVOIDING DUPLICATE COSTLY CALCULATIONS AS ---
     # --- 76% OF THE ALMANAC EXECUTION TIME IS SPENT IN almanac.find_discrete()  ---
-    # The temporary data store 'np_array' continually overwrites itself with fresh data.
-    # note: the transient data store is disabled if time with seconds is required
+    # The event times are kept in the event store (see eventstore.py) and are
+    # formatted to minutes or seconds here, i.e. only when the table is rendered.
     #           d           python date (in an idealized calendar)
     #   tFrom, tNoon, tTo   The time 00h, 12h, 24h on date 'd' in UT1
     #                       (almanacs print time as UT1)
 
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
-
-    # obtain the index to the current date 'd' ... or assign a new index
-    global MDndx, MDlen
-    iFnd = False
-    idx = -1            # an invalid value
-    min_d = d
-    for k in range(MDlen):
-        if MoonDate[k] == d:
-            ndx = k
-            iFnd = True
-        if config.moonDaysCount >= 31 * MDlen and MoonDate[k] < min_d:
-            min_d = MoonDate[k]     # find oldest date in 'MoonDate'
-            idx = k
-    if not iFnd:
-        # assigining a new index in a rotary fashion works, however a more intelligent algorithm
-        #   is to re-use the index to the oldest date once all 'MDlen' dates are in use.
-        if config.moonDaysCount >= 31 * MDlen:
-            # assign a new index by re-using the oldest date
-            ndx = idx
-            MoonDate[ndx] = d
-        else:
-            # assign a new index in a rotary fashion
-            MDndx = (MDndx + 1) % MDlen
-            ndx = MDndx
-            MoonDate[ndx] = d
-        for k in range(31):     # IMPORTANT ... and clear all old values!!!
-            np_array[ndx][k][0] = b''
-            np_array[ndx][k][1] = b''
-
-    # check the transient data store...
-    if with_seconds or len(np_array[ndx][i-1][0]) == 0:     # no data stored - calculate new values
-
-        horizon = getHorizon(tNoon)         # 0.8307988 on 16-08-2024
+    topos, observer, latNS = lat_observer(lat)
+
+    horizon = moonHorizon(tNoon)            # 0.8307988 on 16-08-2024
+
+    # check the event store...
+    events = eventstore.get('moon', d, lat, horizon, tFrom.tt)
+    if events is None:                  # no data stored - calculate new values
+
         start00 = Time.time()               # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(tFrom, tTo, f_moon(topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(tFrom, tTo, horizon)[i-1]
             time00 = Time.time()-start00    # 00000
+            eventstore.put('moon', d, lat, horizon, tFrom.tt, moonrise, y)
             rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS,with_seconds)
         else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
             moonrise, yR = almanac.find_risings(observer, moon, tFrom, tTo, -horizon)
@@ -1397,38 +1352,13 @@ def fetchMoonData(d, tFrom, tNoon, tTo, i, lat, hFlag = False, with_seconds=Fals
             time00 = Time.time()-start00    # 00000
             rise, sett, ris2, set2, fs = fmt_rise_set(moonrise,moonset,yR,yS,latNS,with_seconds)
 
-        # only store single events (not double events, which are very rare)
-        if ris2 == '--:--' and set2 == '--:--':
-            # save 'sett' with moon's finalstate (above/below horizon or currently unknown)
-            if fs == True:
-                set9 = sett[0:2] + 'n' + sett[3:5]
-            elif fs == False:
-                set9 = sett[0:2] + 'v' + sett[3:5]
-            else:
-                set9 = sett
-
-            np_array[ndx][i-1][0] = rise.encode('utf-8')
-            np_array[ndx][i-1][1] = set9.encode('utf-8')
-        
-        #print("np_array[{}][{}][{}] = {}".format(ndx,i-1,0,np_array[ndx][i-1][0]))
-        #print("np_array[{}][{}][{}] = {}".format(ndx,i-1,1,np_array[ndx][i-1][1]))
         if hFlag:
             config.stopwatch2 += time00
         else:
             config.stopwatch += time00
     else:                               # fetch stored data
-        rise = np_array[ndx][i-1][0]
-        sett = np_array[ndx][i-1][1]
-        ris2 = '--:--'
-        set2 = '--:--'
-        fstate = sett[2:3]      # moon final state  (above/below horizon, if known)
-        sett = sett[0:2] + ':' + sett[3:5]  # replace middle character
-        fs = None
-
-        if fstate == "n":
-            fs = True
-        elif fstate == "v":
-            fs = False
+        whole, fraction, y = events
+        rise, sett, ris2, set2, fs = rise_set(ts.tt_jd(whole, fraction),y,latNS,with_seconds)
 
         if hFlag:
             config.moonHorizonFound += 1    # "data found in transient store" count
@@ -1437,7 +1367,6 @@ def fetchMoonData(d, tFrom, tNoon, tTo, i, lat, hFlag = False, with_seconds=Fals
 
     return rise, sett, ris2, set2, fs
 
-
 def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     # - - - TIMES ARE ROUNDED TO MINUTES - - -
     # returns moonrise and moonset for the given dates and latitude:
@@ -1445,6 +1374,11 @@ def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     # Additionally it also tracks the current state of the moon (above or below horizon)
 
     i = 1 + config.lat.index(lat)   # index 0 is reserved to enable an explicit setting
+    cached = eventcache.get('moon3days', lat, d, False)
+    if cached is not None:
+        out, out2, moonvisible[i] = cached
+        return out, out2
+
     out  = ['--:--','--:--','--:--','--:--','--:--','--:--']	# first event
     out2 = ['--:--','--:--','--:--','--:--','--:--','--:--']	# second event on same day (rare)
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
@@ -1478,7 +1412,7 @@ def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     # Moonrise/Moonset on 1st. day ...
 
     # first compute semi-diameter of moon (in degrees)
-    horizon = getHorizon(t0noon)
+    horizon = moonHorizon(t0noon)
 
     config.moonDaysCount += 1
     config.moonDataSeeks += 1
@@ -1504,7 +1438,7 @@ def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     # Moonrise/Moonset on 2nd. day ...
 
     # first compute semi-diameter of moon (in degrees)
-    horizon = getHorizon(t1noon)
+    horizon = moonHorizon(t1noon)
 
     config.moonDaysCount += 1
     config.moonDataSeeks += 1
@@ -1530,7 +1464,7 @@ def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     # Moonrise/Moonset on 3rd. day ...
 
     # first compute semi-diameter of moon (in degrees)
-    horizon = getHorizon(t2noon)
+    horizon = moonHorizon(t2noon)
 
     config.moonDaysCount += 1
     config.moonDataSeeks += 1
@@ -1552,10 +1486,12 @@ def moonrise_set(d, lat):   # used in nautical.twilighttab (section 2)
     if out[2] != '--:--' and out[5] == '--:--':	# if moonrise but no moonset...
         out[5] = moonrise_no_set(d2, lat, d1, t1, t1noon, t2, d3, t3, t3noon, t4, i)
 
+    eventcache.put('moon3days', lat, d, False, [out, out2, eventcache.state(moonvisible[i])])
     return out, out2
 
 def f_moon(topos, degBelowHorizon):
     # Build a function of time that returns the moon above/below horizon state.
+    # note: multilat.moon_up evaluates the same for all latitudes at once
     topos_at = (earth + topos).at
 
     def is_moon_up_at(t):
@@ -1600,25 +1536,22 @@ def getmoonstate(dt, lat, horizon):
     # note: getmoonstate is called when there is neither a moonrise nor a moonset on the day following 'dt'
 
     i = 1 + config.lat.index(lat)   # index 0 is reserved to enable an explicit setting
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = '{:3.1f} {}'.format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)     # at elevation zero
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
     # horizon = 0.8333        # degrees below horizon
 
+    # look up the next moonrise or moonset in the event table (if available)
+    moonvisible[i] = multilat.moon_state(eventtable, t0, i-1)
+
     # search for the next moonrise or moonset (returned in moonrise[0] and y[0])
     while moonvisible[i] == None:
         t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         dt += timedelta(days=1)
         t9 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         start00 = Time.time()               # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t0, t9, f_moon(topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t0, t9, horizon)[i-1]
             config.stopwatch2 += Time.time()-start00 # 00000
     #        for n in range(len(moonrise)):
     #            print(y[n], moonrise[n].utc_datetime())
@@ -1722,6 +1655,11 @@ def moonrise_set2(d, lat):      # used in eventtables.twilighttab
     # Additionally it also tracks the current state of the moon (above or below horizon)
 
     i = 1 + config.lat.index(lat)   # index 0 is reserved to enable an explicit setting
+    cached = eventcache.get('moon', lat, d, True)
+    if cached is not None:
+        out, out2, moonvisible[i] = cached
+        return out, out2
+
     out  = ['--:--','--:--']	# first event
     out2 = ['--:--','--:--']	# second event on same day (rare)
 
@@ -1747,7 +1685,7 @@ def moonrise_set2(d, lat):      # used in eventtables.twilighttab
     # Moonrise/Moonset on the selected day ...
 
     # first compute semi-diameter of moon (in degrees)
-    horizon = getHorizon(t0noon)
+    horizon = moonHorizon(t0noon)
 
     out[0], out[1], out2[0], out2[1], fs = fetchMoonData(d, t0, t0noon, t1, i, lat, False, True)
 
@@ -1766,32 +1704,64 @@ def moonrise_set2(d, lat):      # used in eventtables.twilighttab
     if out[0] != '--:--' and out[1] == '--:--':	# if moonrise but no moonset...
         out[1] = moonrise_no_set(d, lat, d9, t9, t9noon, t0, d1, t1, t1noon, t2, i, True)
 
+    eventcache.put('moon', lat, d, True, [out, out2, eventcache.state(moonvisible[i])])
     return out, out2
 
 #------------------------------
 #   Equation of Time section
 #------------------------------
 
-def getGHA(d, hh, mm, ss):
-    # calculate the Moon's GHA on date d at hh:mm:ss (ss can be a float)
-    t1 = ts.ut1(d.year, d.month, d.day, hh, mm, ss)
-    pos = earth.at(t1).observe(moon)
-    ra = pos.apparent().radec(epoch='date')[0]
-    gha = gha2deg(t1.gast, ra.hours)
-    return gha      # GHA as float (degrees)
-
-def roundup(hr, mi):
-    # round time up to next minute. Both arguments are integers and all times are within one day.
-    # Times (for calculation) between 23:59:30 and 00:00:00 are rounded up to 00:00 ... no 
-    # date adjustment is necessary as the calculated time came on purpose from the day before.
-
-    mi += 1         # round minutes up
-    if(mi == 60):
-        mi = 0
-        hr += 1     # round hours up
-    if(hr == 24):
-        hr = 0
-    return hr, mi
+# The Moon's transits are found by the transit engine (see transits.py) from
+# the hourly GHA grid: for all days of the period at once by 'sweep_transits'
+# or else per day. The planet transits of the period are also found at once.
+
+transittable = {}   # transits of the period (see sweep_transits)
+
+def moon_ghalist(d, with_seconds = False):
+    # the moon's GHA at 23:59:30 (or 23:59:59.5) on d-1; 01:00; 02:00 ... 23:00; 23:59:30 (or 23:59:59.5)
+    gast, ra, _, _ = hourly(d, 'moon')
+    ghaSoD, ghaEoD = moonSoDEoD(d, with_seconds)
+    return [ghaSoD] + [gha2deg(gast[i], ra[i]) for i in range(1, 24)] + [ghaEoD]
+
+def sweep_transits(first_day, days, with_seconds):  # used in nautical.pages & eventtables.pages
+    # find the Moon and planet transits of all days from first_day-1 to first_day+days+1 at once
+    transittable.clear()
+    deferred.pop('transits', None)
+    if not config.sweepEV: return
+    if eventcache.active():     # ... when the first transit is not found in the cache
+        deferred['transits'] = (transit_sweep, (first_day, days, with_seconds))
+        return
+    transit_sweep(first_day, days, with_seconds)
+
+def transit_sweep(first_day, days, with_seconds):
+    dates = [first_day + timedelta(days=n) for n in range(-1, days + 2)]
+    start00 = Time.time()                   # 00000
+    upper = [moon_ghalist(d, with_seconds) for d in dates]
+    lower = [[GHAcolong(gha) for gha in ghaList] for ghaList in upper]
+    n = len(dates)
+    mp = transits.moon_transits(ts, earth, moon, dates + dates, upper + lower, [False]*n + [True]*n, with_seconds)
+    for k, d in enumerate(dates):
+        transittable[('moon', d, False, with_seconds)] = mp[k]
+        transittable[('moon', d, True, with_seconds)] = mp[n+k]
+
+    if observers.risingsok:
+        tt0 = []
+        tt1 = []
+        for d in dates:
+            d1 = d + timedelta(days=1)
+            tt0.append(ts.ut1(d.year, d.month, d.day, 0, 0, 0).tt)
+            tt1.append(ts.ut1(d1.year, d1.month, d1.day, 0, 0, 0).tt)
+        for name in gridcache.planets:
+            for d, t in zip(dates, transits.planet_transits(ts, earth, bodies[name], tt0, tt1)):
+                transittable[(name, d)] = t
+    config.stopwatch += Time.time()-start00 # 00000
+
+def planet_day(name, d, t0, t1):
+    # transits of a planet between t0 and t1 (00:00 on date d and on the next day)
+    run_deferred('transits')
+    key = (name, d)
+    if key in transittable: return transittable[key]
+    return transits.planet_transits(ts, earth, bodies[name], [t0.tt], [t1.tt])[0]
 
 def find_transit(d, ghaList, modeLT):
     # Determine the Transit Event Time rounded to the nearest minute.
@@ -1808,112 +1778,16 @@ def find_transit(d, ghaList, modeLT):
     # This method may also be used to determine the Lower transit by replacing
     #  GHA with the colongitude GHA (and an adapted ghaList). Thus...
     # modeLT = False means find Upper Transit; = True means find Lower Transit
-    
-    # This OPTIMIZED version does not calculate every minute from 0 to 59 until
-    # it detects a transit event. The minutes search begins from 'min_start'
-    # and is so chosen that 2 or 3 values before the event are searched (with the
-    # exception when the search begins from zero minutes, where the event might
-    # follow immediately).
-
-    # If the transit event is very close to the mid-point between minutes, one cannot
-    # reliably estimate to round up or down without inspecting the mid-point GHA value.
 
-    if modeLT:
-        txt = "Lower Transit"
-    else:
-        txt = "Upper Transit"
-    hr = -1                 # an invalid hour value
-    transit_time = '--:--'  # assume 'no event'
-    prev_gha = 0
-    prev_time = '--:--'
-    mid_gha = 0
-    mid_time = '--:--:--'
-    gha = 0
-    gha_time = '--:--'
-    gha = ghaList[0]    # GHA at 23:59:30 on d-1
-    gha_top = 360       # min_start defaults to 0
-
-    # find the hour after which the transit event occurs
-    for i in range(24): # 0 to 23
-        if(ghaList[i+1] < gha):
-            hr = i      # event is between hr:00 and {hr+1}:00
-            gha_top = ghaList[i]
-            break
-        gha = ghaList[i+1]  # test GHA at {hr+1}:00
-
-    # estimate where to begin searching by the minute
-    min_start = max(0, int((360-gha_top)/0.25)-1)
-    if hr == 0:
-        # compensation for gha at Start-of-Day being 30 seconds earlier at 23:59:30
-        min_start = max(0, min_start-1)
-
-    if hr< 0:
-        return transit_time     # no event detected this day
-
-    # if event found... locate it more precisely (to the minute)
-    iLoops = 0
-    prev_gha = ghaList[i]    # GHA before the event (typically on the hour)
-    prev_time = "{:02d}:{:02d}".format(hr,0)
-    for mi in range(min_start,60):       # 0 to 59 max
-        gha = getGHA(d, hr, mi+1, 0)   # GHA on the minute after the event
-        gha_time = "{:02d}:{:02d}".format(hr,mi+1)
-        if(modeLT):
-            gha = GHAcolong(gha)
-        if(gha < prev_gha):
-            if(iLoops == 0 and mi > 0): raise ValueError('ERROR: min_start ({}) too large on {} at {} ({})'.format(mi, d, gha_time, txt))
-            break       # break when event detected ('hr:mi' is before the event)
-        prev_gha = gha  # GHA on the minute before the event
-        prev_time = "{:02d}:{:02d}".format(hr,mi+1)
-        iLoops += 1
-
-    mid_time = '-'      # no value yet for mid-way between minutes
-    diff = prev_gha - 360 + gha      # if negative, round time up
-
-    if(hr == 23 and mi == 59):
-        pass            # events between 23:59 and 23:59:30 never round up to 00:00 next day
-
-    elif(hr == 0 and mi == 0):
-        mid_gha = getGHA(d, hr, mi, 30)
-        mid_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,30)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    elif(abs(diff) < 0.002):
-        # midpoint too close to the transit event to estimate round up or down.
-        #    Check the GHA 30 sec later (midway between minutes).
-        # (The GHA changes by 0.002 in about 0.5 seconds time)
-        mid_gha = getGHA(d, hr, mi, 30)
-        mid_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,30)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    elif(diff < 0):
-        # just compare which GHA is closer to zero GHA and round accordingly
-        hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    transit_time = "{:02d}:{:02d}".format(hr,mi)
-    return transit_time
-
-
-def roundup2(hr, mi, se):
-    # round time up to next second. All arguments are integers and all times are within one day.
-    # Times (for calculation) between 23:59:59.5 and 00:00:00 are rounded up to 00:00:00 ... no 
-    # date adjustment is necessary as the calculated time came on purpose from the day before.
-
-    se += 1         # round seconds up
-    if(se == 60):
-        se = 0
-        mi += 1     # round minutes up
-    if(mi == 60):
-        mi = 0
-        hr += 1     # round hours up
-    if(hr == 24):
-        hr = 0
-    return hr, mi, se
+    kind = 'moonlower' if modeLT else 'moonupper'
+    out = eventcache.get(kind, 0.0, d, False)
+    if out is None:
+        run_deferred('transits')
+        out = transittable.get(('moon', d, modeLT, False))
+        if out is None:
+            out = transits.moon_transits(ts, earth, moon, [d], [ghaList], [modeLT], False)[0]
+        eventcache.put(kind, 0.0, d, False, out)
+    return out
 
 def find_transit2(d, ghaList, modeLT):
     # Determine the Transit Event Time rounded to the nearest second.
@@ -1930,113 +1804,16 @@ def find_transit2(d, ghaList, modeLT):
     # This method may also be used to determine the Lower transit by replacing
     #  GHA with the colongitude GHA (and an adapted ghaList). Thus...
     # modeLT = False means find Upper Transit; = True means find Lower Transit
-    
-    # This OPTIMIZED version does not calculate every minute from 0 to 59 
-    # and then every second from 0 to 59 until it detects a transit event. 
-    # The minutes search begins from 'min_start'; the seconds search from 'sec_start'
-    # and are so chosen that 2 or 3 values before the event are searched (with the
-    # exception when either minutes or seconds search begins from zero where the event
-    #  might follow immediately).
-
-    # If the transit event is very close to the mid-point between minutes/seconds, one
-    # cannot reliably estimate to round up or down without inspecting the mid-point GHA value.
-
-    if modeLT:
-        txt = "Lower Transit"
-    else:
-        txt = "Upper Transit"
-    hr = -1             # an invalid hour value
-    transit_time = '--:--'  # assume 'no event'
-    prev_gha = 0
-    prev_time = '--:--'
-    mid_gha = 0
-    mid_time = '--:--:--'
-    gha = 0
-    gha_time = '--:--'
-    gha = ghaList[0]    # GHA at 23:59:59.5 on d-1
-    gha_top = 360       # min_start defaults to 0
-
-    # find the hour after which the transit event occurs
-    for i in range(24): # 0 to 23
-        if(ghaList[i+1] < gha):
-            hr = i      # event is between hr:00:00 and {hr+1}:00:00
-            gha_top = ghaList[i]
-            break
-        gha = ghaList[i+1]  # test GHA at {hr+1}:00:00
-    # estimate where to begin searching by the minute
-    min_start = max(0, int((360-gha_top)/0.25)-1)
-
-    if hr< 0:
-        return transit_time     # no event detected this day
-
-    # if event found... locate it more precisely (to the minute)
-    iLoops = 0
-    prev_gha = ghaList[i]       # GHA before the event (typically on the hour)
-    prev_time = "{:02d}:{:02d}".format(hr,0)
-    gha = getGHA(d, hr, 0, 0)   # GHA on the minute after the event
-    for mi in range(min_start,60):      # 0 to 59 max
-        gha = getGHA(d, hr, mi+1, 0)    # GHA on the minute after the event
-        gha_time = "{:02d}:{:02d}".format(hr,mi+1)
-        if(modeLT):
-            gha = GHAcolong(gha)
-        if(gha < prev_gha):
-            if(iLoops == 0 and mi > 0): raise ValueError('ERROR: min_start ({}) too large on {} at {} ({})'.format(mi, d, gha_time, txt))
-            break       # break when event detected ('hr:mi' is before the event)
-        prev_gha = gha  # GHA on the minute before the event
-        prev_time = "{:02d}:{:02d}".format(hr,mi+1)
-        iLoops += 1
-
-    # again locate it more precisely (to the second)
-    iLoops = 0
-    # NOTE: 0.25 in the sec_start equation below works for every day except 24.08.2063 (Lower Transit)
-    #       0.26 is a better choice
-    #val = (360-prev_gha)/0.25*60.0
-    sec_start = max(0, int((360-prev_gha)/0.26*60.0)-1)
-    for se in range(sec_start,60):      # 0 to 59 max
-        gha = getGHA(d, hr, mi, se+1)   # GHA on the second after the event
-        gha_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,se+1)
-        if(modeLT):
-            gha = GHAcolong(gha)
-        if(gha < prev_gha):
-            if(iLoops == 0 and se > 0): raise ValueError('ERROR: sec_start ({}) too large on {} at {} ({})'.format(se, d, gha_time, txt))
-            #if(iLoops == 0 and se > 0): raise ValueError('ERROR: sec_start ({}) too large on {} at {} ({}) val = {:f}'.format(se, d, gha_time, txt, val))
-            break       # break when event detected ('hr:mi:se' is before event)
-        prev_gha = gha  # GHA each second before the event
-        prev_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,se+1)
-        iLoops += 1
-
-    mid_time = '-'      # no value yet for mid-way between seconds
-    diff = prev_gha - 360.0 + gha      # if negative, round time up
-
-    if(hr == 23 and mi == 59 and se == 59):
-        pass            # events between 23:59:59 and 23:59:59.5 never round up to 00:00:00 next day
-
-    elif(hr == 0 and mi == 0 and se == 0):
-        mid_gha = getGHA(d, hr, mi, se+0.5)
-        mid_time = "{:02d}:{:02d}:{:04.1f}".format(hr,mi,se+0.5)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi, se = roundup2(hr, mi, se)    # midway is before the event (round seconds up)
-
-    elif(abs(diff) < 0.001):
-        # midpoint too close to the transit event to estimate round up or down...
-        #    Check the GHA 0.5 sec later (midway between seconds).
-        # (The GHA changes by 0.002 in about 0.5 seconds time)
-        mid_gha = getGHA(d, hr, mi, se+0.5)
-        mid_time = "{:02d}:{:02d}:{:04.1f}".format(hr,mi,se+0.5)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi, se = roundup2(hr, mi, se)    # midway is before the event (round seconds up)
-
-    elif(diff < 0):
-        # just compare which GHA is closer to zero GHA and round accordingly
-        hr, mi, se = roundup2(hr, mi, se)     # closer to following GHA (round seconds up)
-
-    transit_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,se)
-    return transit_time
 
+    kind = 'moonlower' if modeLT else 'moonupper'
+    out = eventcache.get(kind, 0.0, d, True)
+    if out is None:
+        run_deferred('transits')
+        out = transittable.get(('moon', d, modeLT, True))
+        if out is None:
+            out = transits.moon_transits(ts, earth, moon, [d], [ghaList], [modeLT], True)[0]
+        eventcache.put(kind, 0.0, d, True, out)
+    return out
 
 def moonphase(d):           # used in nautical.twilighttab (section 3)
     # returns the moon's elongation (angle to the sun)
@@ -2099,18 +1876,15 @@ def equation_of_time(d, d1, UpperList, LowerList, extras, with_seconds = False):
     # the moon's transit-, antitransit-time, age and percent illumination.
     # (Equation of Time = Mean solar time - Apparent solar time)
 
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)       # EoT at 00h
-    position = earth.at(t00).observe(sun)
-    ra = position.apparent().radec(epoch='date')[0]
-    gha00 = gha2deg(t00.gast, ra.hours)
+    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
+    gast, ra, _, _ = hourly(d, 'sun', 13)
+
+    gha00 = gha2deg(gast[0], ra[0])                     # EoT at 00h
     eqt00 = gha2eqt(gha00)
     if gha00 <= 180:
         eqt00 = r"\colorbox{{lightgray!60}}{{{}}}".format(eqt00)
 
-    t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)      # EoT at 12h
-    position = earth.at(t12).observe(sun)
-    ra = position.apparent().radec(epoch='date')[0]
-    gha12 = gha2deg(t12.gast, ra.hours)
+    gha12 = gha2deg(gast[12], ra[12])                   # EoT at 12h
     eqt12 = gha2eqt(gha12)
     if gha12 > 270:
         eqt12 = r"\colorbox{{lightgray!60}}{{{}}}".format(eqt12)
@@ -2226,7 +2000,31 @@ def gha2eqt(gha):
         mmss = '??:??'		# indicate error
     return mmss
 
-def find_new_moon(d):       # used in nautical.doublepage
+# The moon phases of the whole period are found ONCE (instead of searching
+# 30 days for every page). 'find_new_moon' then looks up the new and full moons
+# of a date by binary search.
+
+lunations = {}      # moon phases of the period (see build_lunations)
+
+def build_lunations(first_day, days):   # used in nautical.pages & eventtables.pages
+    # find all new, first quarter, full and last quarter moons from 31 days
+    # before first_day until 31 days after the last day
+    d0 = first_day - timedelta(days=31)
+    d1 = first_day + timedelta(days=days+31)
+    t0 = ts.utc(d0.year, d0.month, d0.day, 12, 0, 0)
+    t1 = ts.utc(d1.year, d1.month, d1.day, 12, 0, 0)
+    start00 = Time.time()                   # 00000
+    t, y = almanac.find_discrete(t0, t1, almanac.moon_phases(eph))
+    config.stopwatch += Time.time()-start00 # 00000
+    lunations.clear()
+    lunations['from'] = d0
+    lunations['to'] = d1
+    utc = t.utc_datetime()
+    for phase in range(4):  # 0=New Moon, 1=First Quarter, 2=Full Moon, 3=Last Quarter
+        i = np.flatnonzero(y == phase)
+        lunations[phase] = (t.tt[i], [utc[k] for k in i])
+
+def find_new_moon(d):       # used in nautical.doublepage & eventtables.page
     # find previous & next new moon and full moon
     global PreviousNewMoon
     global PreviousFullMoon
@@ -2240,31 +2038,26 @@ def find_new_moon(d):       # used in nautical.doublepage
     WaxingMoon = None
     # note: the python datetimes above are timezone 'aware' (not 'naive')
 
-    # search from 30 days earlier than noon... till noon on this day
-    d0 = d - timedelta(days=30)
-    t0 = ts.utc(d0.year, d0.month, d0.day, 12, 0, 0)
-    t1 = ts.utc(d.year, d.month, d.day, 12, 0, 0)
-    start00 = Time.time()                   # 00000
-    t, y = almanac.find_discrete(t0, t1, almanac.moon_phases(eph))
-    config.stopwatch += Time.time()-start00 # 00000
-    for i in range(len(t)):
-        if y[i] == 0:       # 0=New Moon, 1=First Quarter, 2=Full Moon, 3=Last Quarter
-            PreviousNewMoon = t[i].utc_datetime()
-        if y[i] == 2:       # 2 = Full Moon
-            PreviousFullMoon = t[i].utc_datetime()
-    # note: if two PreviousNewMoons are found within the range, the last is stored
-    # note: if two PreviousFullMoons are found within the range, the last is stored
+    # the phases from 30 days earlier than noon... until 30 days later are required
+    if not lunations or d - timedelta(days=30) < lunations['from'] or d + timedelta(days=31) > lunations['to']:
+        build_lunations(d, 1)
+
+    # the last new moon and full moon until noon on this day
+    noon = ts.utc(d.year, d.month, d.day, 12, 0, 0).tt
+    tt, utc = lunations[0]
+    i = np.searchsorted(tt, noon, side='right') - 1
+    if i >= 0:
+        PreviousNewMoon = utc[i]
+    tt, utc = lunations[2]
+    k = np.searchsorted(tt, noon, side='right') - 1
+    if k >= 0:
+        PreviousFullMoon = utc[k]
 
     if PreviousNewMoon != None and PreviousFullMoon != None:
         # synodic month = about 29.53 days
-        t2 = ts.utc(PreviousNewMoon + timedelta(days=28))
-        t3 = ts.utc(PreviousNewMoon + timedelta(days=30))
-        start00 = Time.time()                   # 00000
-        t, y = almanac.find_discrete(t2, t3, almanac.moon_phases(eph))
-        config.stopwatch += Time.time()-start00 # 00000
-        for i in range(len(t)):
-            if y[i] == 0:       # 0 = New Moon
-                NextNewMoon = t[i].utc_datetime()
+        tt, utc = lunations[0]
+        if i + 1 < len(utc):
+            NextNewMoon = utc[i+1]
 
         WaxingMoon = True
         if PreviousFullMoon > PreviousNewMoon:
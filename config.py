@@ -30,7 +30,18 @@ pgsz = 'A4'     # page size 'A4' or 'Letter' (global variable)
 moonimg = True  # 'True' to include a moon image; otherwise 'False'
 useIERS = True  # 'True' to download finals2000A.all; 'False' to use built-in UT1 tables
 ageIERS = 30    # download a new finals2000A.all version after 'ageIERS' days if useIERS=True
+offlineEOP = False  # 'True' to start at once with the existing finals2000A.all (no network access) and refresh it in the background for the next run
+mirrorEOP = ""  # URL (ending with '/') or local folder with finals2000A.all for the background refresh ('' = IERS, USNO and IERS datacenter servers)
 MULTIpr = True  # 'True' enables multiprocessing; otherwise only 1 logical processor is used
+cacheGRID = True  # 'True' to store hourly positions per year for re-use (in the 'gridcache' subfolder)
+cacheMB = 100   # maximum size of the 'gridcache' subfolder in MB (least recently used years are deleted)
+cacheEV = False # 'True' to store the computed event times (twilight, moonrise/set, transits) on disk for re-use (in the Skyfield folder)
+fitERR = 2.0    # arcseconds: error bound of the fitted Moon altitude model for moonrise/moonset (0 = exact search only)
+sweepEV = True  # 'True' to calculate the rise/set/twilight events of the whole period at once; otherwise per day
+astroTW = False # 'True' to add astronomical twilight (Sun 18° below horizon) to the Event Time tables
+eventLRU = 1000 # maximum number of (body, date, latitude, horizon) entries in the moonrise/moonset event store
+precision = 'exact' # 'exact', 'reduced' (faster) or 'preview' (fastest): see precision.py for the deviations in the tables
+autoEPH = False # 'True' to load the smallest excerpt (see ephexcerpt.py) or kernel of the chosen ephemeris that covers the requested dates
 
 # Calculation mode for Moon's d-value (also applies to Sun and Planets):
 #   'True' to calculate the Moon's d-value as in the HMNAO Nautical Almanac:
@@ -60,7 +71,8 @@ dockerized = False  # 'True' to build this app to run in a Docker-Linux containe
 docker_pdf = "tmp"
 docker_prefix  = docker_pdf + "/" if dockerized else ""  # docker image is based on Linux
 docker_postfix = "/" + docker_pdf if dockerized else ""  # docker image is based on Linux
-if dockerized: MULTIpr = False  # Linux creates 12 x finals2000A.all if 'True'
+# multiprocessing works in Docker too: the worker processes only read the ephemeris
+# downloaded by the parent process (and receive its timescale and star catalog)
 # --------------------------------------------------------------
 
 # global variables initialized during main program startup (and on every spawned process)
@@ -77,6 +89,7 @@ useIERSEOP = False
 txtIERSEOP = ""     # footer text (using 'fancyhdr')
 endIERSEOP = ""     # footer text (using 'fancyhdr')
 dt_IERSEOP = None
+ephfile = ""        # ephemeris file loaded: config.ephemeris[ephndx][0] or an excerpt (see ephexcerpt.py) ... its absolute path after init_sf
 ephemeris = [['de421.bsp',1900,2050],['de405.bsp',1600,2200],['de406.bsp',1000,2750],['de430t.bsp',1550,2650],['de440.bsp',1550,2650]]
 tbls = ''		# table style (global variable)
 decf = ''		# Declination format (global variable)
@@ -87,6 +100,7 @@ moonDataSeeks = 0   # count of moon daily data seeks
 moonDataFound = 0   # moon daily data seeks found in transient data store
 moonHorizonSeeks = 0   # count of moon continuously above/below horizon seeks
 moonHorizonFound = 0   # moon continuously above/below horizon seeks found in transient data store
+circumpolarSkips = 0   # count of Sun/Moon event searches skipped as continuously above/below horizon
 
 # define global variables for Lunar Distance tables and charts
 # 'True' on 'debug_....' variables expands the terminal/console output
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Parsed IERS EOP data: the timescale arrays (TT and Delta T per day, leap
+# seconds) that Skyfield derives from the UT1-UTC values in 'finals2000A.all'
+# and the dates of the footer text (last measured data, end of predictions)
+# are stored in a sidecar file ('finals2000A.npz') next to the data file.
+# The sidecar is valid while the data file has the same modification time and
+# size (and the Skyfield version is the same); otherwise the data file is
+# parsed again and the sidecar replaced. Polar motion is not used here.
+
+###### Standard library imports ######
+from datetime import date
+from collections import deque
+import os
+
+###### Third party imports ######
+import numpy as np
+from skyfield import VERSION
+from skyfield.data.iers import parse_dut1_from_finals_all, build_timescale_arrays
+from skyfield.timelib import Timescale
+
+#----------------------
+#   global variables
+#----------------------
+
+arrays = ['daily_tt', 'daily_delta_t', 'leap_dates', 'leap_offsets']
+
+def sidecar(dfIERS):
+    return os.path.splitext(dfIERS)[0] + ".npz"
+
+def stamp(dfIERS):
+    # modification time, size and Skyfield version the sidecar is valid for
+    st = os.stat(dfIERS)
+    return "{}:{}:{}".format(st.st_mtime_ns, st.st_size, ".".join(str(v) for v in VERSION))
+
+def read(dfIERS):
+    # the sidecar contents if valid (else None)
+    try:
+        with np.load(sidecar(dfIERS)) as npz:
+            if str(npz['stamp']) != stamp(dfIERS): return None
+            return {k: npz[k] for k in npz.files}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def write(dfIERS, entry):
+    # replace the sidecar (a read-only folder is ignored: the file is parsed next time)
+    tmp = sidecar(dfIERS) + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, **entry)
+        os.replace(tmp, sidecar(dfIERS))
+    except OSError:
+        pass
+
+def parse(dfIERS):
+    # parse the data file ... the sidecar contents
+    with open(dfIERS, "rb") as f:
+        utc_mjd, dut1 = parse_dut1_from_finals_all(f)
+    entry = dict(zip(arrays, build_timescale_arrays(utc_mjd, dut1)))
+    dt1, dt2 = parse_dates(dfIERS)
+    entry['measured']  = np.array(dt1.isoformat() if dt1 is not None else "")
+    entry['predicted'] = np.array(dt2.isoformat() if dt2 is not None else "")
+    entry['stamp'] = np.array(stamp(dfIERS))
+    return entry
+
+def cached(dfIERS):
+    # the sidecar contents (parsing the data file if required)
+    entry = read(dfIERS)
+    if entry is None:
+        entry = parse(dfIERS)
+        write(dfIERS, entry)
+    return entry
+
+def timescale(load, dfIERS):    # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # the timescale from the IERS EOP data (as load.timescale(builtin=False))
+    if not os.path.isfile(dfIERS):
+        return load.timescale(builtin=False)
+    entry = cached(dfIERS)
+    return Timescale((entry['daily_tt'], entry['daily_delta_t']), entry['leap_dates'], entry['leap_offsets'])
+
+def dates(dfIERS):      # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # date of the last IERS measured data and end of the prediction data ... (None, None) if incomplete
+    entry = cached(dfIERS)
+    dt1, dt2 = str(entry['measured']), str(entry['predicted'])
+    if dt2 == "": return None, None
+    return (date.fromisoformat(dt1) if dt1 != "" else None), date.fromisoformat(dt2)
+
+def parse_dates(dfIERS):
+# get the IERS EOP data "release date" according to these rules:
+#   - begin searching within this millenium (ignoring data from 02 Jan 1973 to 31 Dec 1999)
+#   - halt when the following value is "P", i.e. predicted as opposed to measured:
+#       - flag for Bull. A UT1-UTC values
+#   - step back one day to the record that has "I", i.e. measured data.
+#
+# the date of this record is the last date with IERS measured data.
+#   [the more recent the date, the more accurate/reliable are both the past IERS
+#   Earth Orientation Parameters as well as the future (predicted) EOP data values.]
+
+# IERS EOP data format definition:
+# https://maia.usno.navy.mil/ser7/readme.finals2000A
+
+    queue = deque(["a", "b", "c", "d"])
+    PredData = False    # True when Prediction data flagged
+
+    dt = None
+    iers = ""
+    with open(dfIERS) as file:
+        for line in file:
+            mjd = int(line[7:12])
+
+            if not PredData and mjd >= 51544:    # skip data in previous  millenium
+                queue.append(line)
+                queue.popleft()
+                c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
+                if c2 == "P":
+                    PredData = True
+                    iers = ""
+                    while queue:
+                        iersdata = queue.pop()
+                        if iersdata[57:58] == "I":
+                            iers = iersdata
+                            break
+                    if iers == "": iers = iersdata
+                    dt = date(int(iers[0:2]) + 2000, int(iers[2:4]), int(iers[4:6]))
+            elif PredData:    # search for end of Prediction data
+                c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
+                if c2 == "P":
+                    iers = line
+                else:
+                    break
+
+    if iers == "": return None, None
+    # detect end of Prediction data even if file ends with c2 == "P" ...
+    dt2 = date(int(iers[0:2]) + 2000, int(iers[2:4]), int(iers[4:6]))
+    return dt, dt2
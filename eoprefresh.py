@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Offline-first startup (see config.offlineEOP): init_sf and ld_init_sf use the
+# existing 'finals2000A.all' (or the built-in UT1-tables if there is none)
+# without any network access. If the data file is missing or older than
+# config.ageIERS days, it is downloaded in a background thread while the
+# tables are calculated: from config.mirrorEOP (a URL ending with '/' or a
+# local folder containing 'finals2000A.all') or else from the IERS, USNO and
+# IERS datacenter servers. The new file replaces the old one only when it is
+# complete, so the new data applies from the next run.
+#
+# The EOP release used and the outcome of the refresh are printed (and written
+# to the log file if open).
+
+###### Standard library imports ######
+from urllib.request import urlopen
+import atexit
+import os
+import shutil
+import threading
+
+###### Local application imports ######
+import config
+import eopcache
+
+#----------------------
+#   global variables
+#----------------------
+
+servers = [("ftp://ftp.iers.org/products/eop/rapid/standard/", "IERS"),
+           ("https://maia.usno.navy.mil/ser7/", "USNO"),
+           ("https://datacenter.iers.org/data/9/", "IERS datacenter")]
+timeout = 30        # seconds: socket timeout of a download
+wait = 60           # seconds: maximum wait at exit for an unfinished download
+thread = None       # the background download
+pid = None          # the process that started it
+outcome = ""        # result of the background download
+
+def record(text):       # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # print a line of the run log (and write it to the log file if open)
+    print(text)
+    if config.logfileopen and not config.logfile.closed:
+        config.writeLOG(text + "\n")
+
+def release(dfIERS):    # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # the EOP release used in this run
+    if not config.useIERSEOP:
+        return "EOP data: built-in UT1-tables"
+    return "EOP data: {} ({})".format(config.txtIERSEOP, os.path.basename(dfIERS))
+
+def sources():
+    # the mirror (if configured) or the IERS, USNO and IERS datacenter servers
+    if config.mirrorEOP != "":
+        return [(config.mirrorEOP, "mirror")]
+    return servers
+
+def fetch(src, filename, tmp):
+    # copy or download 'filename' from a folder or URL to the file 'tmp'
+    if os.path.isdir(src):
+        shutil.copyfile(os.path.join(src, filename), tmp)
+        return
+    with urlopen(src + filename, timeout=timeout) as connection:
+        with open(tmp, "wb") as f:
+            shutil.copyfileobj(connection, f, 128*1024)
+
+def refresh(spad, filename):
+    # download a new data file (replacing the existing one when complete)
+    global outcome
+    dfIERS = os.path.join(spad, filename)
+    tmp = dfIERS + ".refresh"
+    for src, loc in sources():
+        try:
+            fetch(src, filename, tmp)
+            if eopcache.parse_dates(tmp)[1] is None:
+                raise ValueError("incomplete data file")
+            os.replace(tmp, dfIERS)
+            outcome = "EOP refresh: new '{}' from {} (used from the next run)".format(filename, loc)
+            return
+        except Exception as e:
+            outcome = "EOP refresh: '{}' not updated - {}".format(filename, e)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+def start(spad, filename):  # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # start the background download (once per run)
+    global thread, pid
+    if thread is not None: return
+    pid = os.getpid()
+    thread = threading.Thread(target=refresh, args=(spad, filename), daemon=True)
+    thread.start()
+
+def finish():
+    # wait for an unfinished download (at most 'wait' seconds) and log its outcome
+    if thread is None or pid != os.getpid(): return
+    thread.join(wait)
+    record(outcome if not thread.is_alive() else "EOP refresh: download not finished")
+
+atexit.register(finish)
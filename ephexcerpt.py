@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Ephemeris excerpts: a small .bsp file holding only the segments of the Sun,
+# Moon, Earth, Venus, Mars, Jupiter and Saturn for a range of years, copied
+# from one of the kernels in config.ephemeris (the Chebyshev coefficients are
+# copied unchanged, so the positions are identical to those of the kernel).
+# Create an excerpt in the Skyfield folder with:
+#   python ephexcerpt.py <ephemeris> <first year> [<last year>]
+# where <ephemeris> is an index of config.ephemeris (0 to 4) or a kernel name,
+# e.g. "python ephexcerpt.py 4 2024 2026" writes 'de440_2024-2026.bsp'.
+#
+# With config.autoEPH = True, alma_skyfield.init_sf and ld_skyfield.ld_init_sf
+# load the smallest file that covers the requested dates: the chosen kernel
+# (config.ephndx) or one of its excerpts. The worker processes load the same
+# file (config.ephfile). The grid cache and event cache are keyed by the
+# kernel name, as an excerpt gives the same positions.
+
+###### Standard library imports ######
+from datetime import date, timedelta
+import glob
+import os
+import sys
+
+###### Third party imports ######
+from jplephem.spk import SPK
+from jplephem.excerpter import write_excerpt
+
+###### Local application imports ######
+import config
+
+#----------------------
+#   global variables
+#----------------------
+
+targets = set([2, 3, 4, 5, 6, 10, 299, 301, 399, 499])  # NAIF codes of the bodies (and barycenters) in the tables
+margin = 40         # days before the first and after the last year of an excerpt
+jd2000 = 2451544.5  # Julian date of 2000-01-01 00:00
+
+def julian(d):
+    # the Julian date (TDB) at 00:00 on date d
+    return jd2000 + (d - date(2000, 1, 1)).days
+
+def excerptname(ephfile, yr1, yr2):
+    # e.g. 'de440_2024-2026.bsp' (or 'de440_2024.bsp' for a single year)
+    if yr1 == yr2:
+        return "{}_{}.bsp".format(os.path.splitext(ephfile)[0], yr1)
+    return "{}_{}-{}.bsp".format(os.path.splitext(ephfile)[0], yr1, yr2)
+
+def excerpt(spad, ephfile, yr1, yr2):     # used in __main__
+    # write the excerpt of kernel 'ephfile' for the years yr1 to yr2 ... returns its path
+    outfile = os.path.join(spad, excerptname(ephfile, yr1, yr2))
+    jd1 = julian(date(yr1, 1, 1) - timedelta(days=margin))
+    jd2 = julian(date(yr2+1, 1, 1) + timedelta(days=margin))
+    spk = SPK.open(os.path.join(spad, ephfile))
+    try:
+        summaries = [summary for summary, segment in zip(spk.daf.summaries(), spk.segments)
+                     if segment.target in targets]
+        with open(outfile + ".tmp", "w+b") as f:
+            write_excerpt(spk, f, jd1, jd2, summaries)
+    finally:
+        spk.close()
+    os.replace(outfile + ".tmp", outfile)
+    return outfile
+
+def covers(path, jd1, jd2):
+    # True if every body of the tables in the file 'path' covers jd1 to jd2
+    try:
+        spk = SPK.open(path)
+    except (OSError, ValueError):
+        return False
+    try:
+        found = set()
+        for segment in spk.segments:
+            if segment.target in targets:
+                found.add(segment.target)
+        for target in found:
+            if not any(s.target == target and s.start_jd <= jd1 and jd2 <= s.end_jd for s in spk.segments):
+                return False
+        return len(found) > 0
+    finally:
+        spk.close()
+
+def span(first_day, last_day):
+    # Julian dates that the tables of first_day to last_day require: whole
+    # years of the grid cache, the moon phases 31 days before and after
+    jd1 = julian(min(date(first_day.year, 1, 1), first_day - timedelta(days=31)) - timedelta(days=2))
+    jd2 = julian(max(date(last_day.year+1, 1, 2), last_day + timedelta(days=34)) + timedelta(days=2))
+    return jd1, jd2
+
+def choose(spad, first_day, last_day):     # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # the ephemeris file to load (also set as config.ephfile for the worker processes)
+    ephfile = config.ephemeris[config.ephndx][0]
+    config.ephfile = ephfile
+    if not config.autoEPH or first_day is None: return ephfile
+    jd1, jd2 = span(first_day, last_day if last_day is not None else first_day)
+    candidates = glob.glob(os.path.join(spad, "{}_[0-9]*.bsp".format(os.path.splitext(ephfile)[0])))
+    if os.path.isfile(os.path.join(spad, ephfile)):
+        candidates.append(os.path.join(spad, ephfile))
+    best = None
+    for path in candidates:
+        if covers(path, jd1, jd2) and (best is None or os.path.getsize(path) < os.path.getsize(best)):
+            best = path
+    if best is not None:
+        config.ephfile = os.path.basename(best)
+        if config.ephfile != ephfile:
+            print("Using the ephemeris excerpt '{}'".format(config.ephfile))
+    return config.ephfile
+
+if __name__ == '__main__':
+    if len(sys.argv) not in [3, 4] or not all(a.isnumeric() for a in sys.argv[2:]):
+        print("usage: python ephexcerpt.py <ephemeris (0-4 or file name)> <first year> [<last year>]")
+        sys.exit(0)
+    eph = sys.argv[1]
+    if eph.isnumeric():
+        if int(eph) not in range(len(config.ephemeris)):
+            print("Error - Please choose a valid ephemeris (0 to {})".format(len(config.ephemeris)-1))
+            sys.exit(0)
+        eph = config.ephemeris[int(eph)][0]
+    yr1 = int(sys.argv[2])
+    yr2 = int(sys.argv[3]) if len(sys.argv) == 4 else yr1
+    for name, yrmin, yrmax in config.ephemeris:
+        if name == eph and not (yrmin <= yr1 and yr2 <= yrmax):
+            print("!! Please pick years between {} and {} !!".format(yrmin, yrmax))
+            sys.exit(0)
+    if not os.path.isfile(eph):
+        print("Error - '{}' not found in this folder".format(eph))
+        sys.exit(0)
+    if yr2 < yr1:
+        print("Error - the last year precedes the first year")
+        sys.exit(0)
+    path = excerpt("./", eph, yr1, yr2)
+    print("'{}' written ({:.1f} MB)".format(path[2:], os.path.getsize(path) / 1048576.0))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# On-disk cache of the computed events (optional, see config.cacheEV):
+# sunrise/sunset & twilight, moonrise/moonset and the Moon and planet transits
+# as printed in the tables, so that regenerating the same dates (e.g. with a
+# different paper size, table style or d-value mode) needs no event search.
+#
+# The events are stored in an SQLite database in the Skyfield folder (WAL mode,
+# so that readers are not blocked by a writer) with one row per
+#   ephemeris (and precision tier), EOP data file date, Skyfield version, event type, latitude,
+#   date and precision (60 = rounded to minutes; 1 = rounded to seconds)
+# holding the table values as JSON. New rows are written in batches.
+#
+# The database connection is only written in the process that opened it. A
+# forked worker process (see nautical.pages) reads through its own connection
+# and returns its new rows to that process (see collect and merge).
+
+###### Standard library imports ######
+from datetime import datetime
+import atexit
+import json
+import os
+import sqlite3
+
+###### Third party imports ######
+from skyfield import VERSION
+
+###### Local application imports ######
+import config
+import precision
+
+#----------------------
+#   global variables
+#----------------------
+
+dbname = "eventcache.db"    # database in the Skyfield folder
+batch = 500         # number of new rows written together
+conn = None         # database connection
+pid = None          # the process that opened the connection
+path = ""           # the database file
+reader = None       # read connection of a forked worker process
+readerpid = None    # the worker process that opened it
+collecting = False  # True in a worker process that returns its new rows (see collect)
+source = ()         # ephemeris, EOP data file date and Skyfield version
+pending = []        # new rows not yet written
+
+def init_cache(spad, ephfile, eopfile=None):    # used in alma_skyfield.init_sf
+    # open (or create) the event cache database if enabled
+    global conn, pid, source, path
+    close()
+    eop = "builtin"     # built-in UT1-tables
+    if eopfile is not None and os.path.isfile(eopfile):
+        eop = "EOP" + datetime.fromtimestamp(os.path.getmtime(eopfile)).strftime("%Y%m%d%H%M")
+    source = (os.path.splitext(ephfile)[0] + precision.tag(), eop, ".".join(str(v) for v in VERSION))
+    if not config.cacheEV: return
+    try:
+        path = os.path.join(spad, dbname)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS events (
+            ephemeris TEXT, eop TEXT, skyfield TEXT, kind TEXT, lat REAL, date TEXT, precision INTEGER, value TEXT,
+            PRIMARY KEY (ephemeris, eop, skyfield, kind, lat, date, precision)) WITHOUT ROWID""")
+        conn.commit()
+        pid = os.getpid()
+    except sqlite3.Error:
+        conn = None     # e.g. read-only folder: events are calculated as usual
+
+def active():
+    return conn is not None and pid == os.getpid()
+
+def connection():
+    # the connection to read from in this process (or None)
+    global reader, readerpid
+    if conn is None: return None
+    if pid == os.getpid(): return conn
+    if readerpid != os.getpid():    # a forked worker process never uses the inherited connection
+        readerpid = os.getpid()
+        try:
+            reader = sqlite3.connect(path)
+        except sqlite3.Error:
+            reader = None
+    return reader
+
+def get(kind, lat, d, with_seconds):    # used in alma_skyfield, mp_nautical & mp_eventtables
+    # the cached value of an event type at latitude 'lat' on date 'd' (or None)
+    db = connection()
+    if db is None: return None
+    try:
+        row = db.execute("SELECT value FROM events WHERE ephemeris=? AND eop=? AND skyfield=? AND kind=? AND lat=? AND date=? AND precision=?",
+                           source + (kind, float(lat), d.isoformat(), 1 if with_seconds else 60)).fetchone()
+    except sqlite3.Error:
+        return None
+    return None if row is None else json.loads(row[0])
+
+def put(kind, lat, d, with_seconds, value):   # used in alma_skyfield, mp_nautical & mp_eventtables
+    # cache the value of an event type (written with the next batch)
+    if conn is None or not (active() or collecting): return
+    pending.append(source + (kind, float(lat), d.isoformat(), 1 if with_seconds else 60, json.dumps(value)))
+    if len(pending) >= batch: flush()
+
+def collect():      # used in nautical.mp_doublepage_worker & eventtables.mp_page_worker
+    # the new rows of a forked worker process (for merge in the parent process)
+    if active(): return []
+    rows = list(pending)
+    pending.clear()
+    return rows
+
+def merge(rows):    # used in nautical.pages & eventtables.pages
+    # add the new rows of a worker process
+    if not active() or len(rows) == 0: return
+    pending.extend(rows)
+    if len(pending) >= batch: flush()
+
+def state(s):          # used in alma_skyfield, mp_nautical & mp_eventtables
+    # a moon state (True/False/None) that is stored as JSON (e.g. from a NumPy bool)
+    return None if s is None else bool(s)
+
+def flush():        # used in nautical.pages & eventtables.pages
+    # write the pending rows
+    if not active() or len(pending) == 0: return
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?)", pending)
+    except sqlite3.Error:
+        pass        # e.g. disk full: the events are recalculated next time
+    pending.clear()
+
+def close():
+    global conn
+    if conn is not None and pid == os.getpid():
+        flush()
+        conn.close()
+    conn = None
+    pending.clear()
+
+atexit.register(close)      # write the last batch
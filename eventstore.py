@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Event store: the rise/set events of a body on a date at a latitude (and
+# horizon) are kept as numbers, i.e. the event times as Julian dates (TT, as
+# 'whole' + 'fraction' exactly as in the Skyfield Time object) plus a flag per
+# event (True = rise; False = set). The events are formatted to hh:mm or
+# hh:mm:ss only when a table is rendered, so the same entry serves the
+# Nautical Almanac (minutes) and the Event Time tables (seconds).
+#
+# An entry is only valid for the search window it was calculated for: the
+# window starts 30 seconds (or 0.5 second) before midnight depending on the
+# rounding of the table. The least recently used entries are dropped when
+# the store holds more than 'config.eventLRU' entries.
+
+###### Standard library imports ######
+from collections import OrderedDict
+
+###### Third party imports ######
+import numpy as np
+
+###### Local application imports ######
+import config
+
+#----------------------
+#   global variables
+#----------------------
+
+store = OrderedDict()   # (body, date, latitude, horizon) -> (tt0, whole, fraction, y)
+
+def get(body, d, lat, horizon, tt0):      # used in alma_skyfield.fetchMoonData
+    # the stored events (whole, fraction, y) of 'body' on date 'd' at latitude
+    # 'lat' for the search window beginning at tt0 (TT) ... or None if not stored
+    key = (body, d, lat, horizon)
+    entry = store.get(key)
+    if entry is None or entry[0] != tt0:
+        return None
+    store.move_to_end(key)      # most recently used
+    return entry[1:]
+
+def put(body, d, lat, horizon, tt0, t, y):  # used in alma_skyfield.fetchMoonData
+    # store the events 't' (Time array) with their flags 'y' (see get)
+    key = (body, d, lat, horizon)
+    store[key] = (tt0, np.array(t.whole, dtype=float, ndmin=1),
+                  np.array(t.tt_fraction, dtype=float, ndmin=1), np.array(y, dtype=bool, ndmin=1))
+    store.move_to_end(key)
+    while len(store) > max(config.eventLRU, 1):
+        store.popitem(last=False)   # drop the least recently used entry
+
+def clear():            # used in alma_skyfield.init_sf
+    store.clear()
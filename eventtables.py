@@ -29,6 +29,7 @@ import signal       # for init_worker
 
 ###### Local application imports ######
 import config
+import eventcache
 if config.MULTIpr:      # in multi-processing mode ...
     # ------------------------------------------------------
     # EITHER comment next 2 lines out to invoke executor.map
@@ -41,12 +42,12 @@ if config.MULTIpr:      # in multi-processing mode ...
     # ! DO NOT PLACE imports IN CONDITIONAL 'if'-STATEMENTS WHEN MULTI-PROCESSING !
     from functools import partial
     # ... following is still required for SINGLE-PROCESSING (in multi-processing mode):
-    from alma_skyfield import planetstransit, moonGHA, equation_of_time, getDUT1, find_new_moon
+    from alma_skyfield import planetstransit, moonGHA, equation_of_time, getDUT1, find_new_moon, build_lunations, build_grid, sweep_transits
     # ... following is required for MULTI-PROCESSING:
-    from mp_eventtables import mp_twilight, mp_moonrise_set, mp_planetstransit
+    from mp_eventtables import mp_twilight, mp_moonrise_set, mp_planetstransit, init_context, sweep_events, sweep_pages
 else:
     # ... following is required for SINGLE-PROCESSING:
-    from alma_skyfield import twilight, moonrise_set2, planetstransit, moonGHA, equation_of_time, getDUT1, find_new_moon
+    from alma_skyfield import twilight, moonrise_set2, planetstransit, moonGHA, equation_of_time, getDUT1, find_new_moon, build_lunations, build_grid, sweep_transits, sweep_events
 
 
 UpperLists = [[], []]    # moon GHA per hour for 2 days
@@ -111,16 +112,16 @@ def twilight_symbol(oldtwi):
     return twi
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-def mp_twilight_worker(Date, ts, lat):
+def mp_twilight_worker(Date, lat):
     #print(" mp_twilight_worker Start {}".format(lat))
     hemisph = 'N' if lat >= 0 else 'S'
-    twi = mp_twilight(Date, lat, ts, True) # ===>>> mp_eventtables.py
+    twi = mp_twilight(Date, lat, True) # ===>>> mp_eventtables.py
     #print(" mp_twilight_worker Finish {}".format(lat))
     return twi      # return list for all latitudes
 
-def mp_moonlight_worker(Date, ts, lat):
+def mp_moonlight_worker(Date, lat):
     #print(" mp_moonlight_worker Start  {}".format(lat))
-    ml = mp_moonrise_set(Date, lat, ts)    # ===>>> mp_eventtables.py
+    ml = mp_moonrise_set(Date, lat)    # ===>>> mp_eventtables.py
     #print(" mp_moonlight_worker Finish {}".format(lat))
     return ml       # return list for all latitudes
 
@@ -128,42 +129,17 @@ def twilighttab(Date, ts):
     # returns the sun twilight and moonrise/moonset tables
 
     if config.MULTIpr:
-        # multiprocess twilight values per latitude simultaneously
-        if MPmode == 0:      # with pool.map
-            partial_func = partial(mp_twilight_worker, Date, ts)
-
-            try:
-                # RECOMMENDED: chunksize = 1
-                listoftwi = pool.map(partial_func, config.lat, 1)
-            except KeyboardInterrupt:
-                print(msg0)
-                sys.exit(0)
-
-        if MPmode == 1:      # with executor.map
-            partial_func = partial(mp_twilight_worker, Date, ts)
-            future_value = executor.map(partial_func, config.lat)
-            listoftwi = list(future_value)
+        # twilight values - all latitudes are solved together (see multilat.py),
+        #   so this runs in this process instead of one worker task per latitude.
+        listoftwi = [mp_twilight_worker(Date, lat) for lat in config.lat]
 
         for k in range(len(listoftwi)):
             config.stopwatch += listoftwi[k][6]     # accumulate multiprocess processing time
-            del listoftwi[k][-1]
+            del listoftwi[k][6]
         #print("listoftwi = {}".format(listoftwi))
 
-        # multiprocess moonrise/moonset values per latitude simultaneously
-        if MPmode == 0:      # with pool.map
-            partial_func2 = partial(mp_moonlight_worker, Date, ts)
-
-            try:
-                # RECOMMENDED: chunksize = 1
-                listmoon = pool.map(partial_func2, config.lat, 1)
-            except KeyboardInterrupt:
-                print(msg0)
-                sys.exit(0)
-
-        if MPmode == 1:      # with executor.map
-            partial_func2 = partial(mp_moonlight_worker, Date, ts)
-            future_val = executor.map(partial_func2, config.lat)
-            listmoon = list(future_val)
+        # moonrise/moonset values (all latitudes are solved together)
+        listmoon = [mp_moonlight_worker(Date, lat) for lat in config.lat]
 
         for k in range(len(listmoon)):
             tuple_times = listmoon[k][-1]
@@ -175,32 +151,47 @@ def twilighttab(Date, ts):
 # Sun Twilight tables ...........................................
     #lat = [72,70,68,66,64,62,60,58,56,54,52,50,45,40,35,30,20,10,0, -10,-20,-30,-35,-40,-45,-50,-52,-54,-56,-58,-60]
     latNS = [72, 70, 58, 40, 10, -10, -50, -60]
+    # twilight columns: (Astr.) Naut. Civil | Sunrise | Sunset | Civil Naut. (Astr.)
+    ntwi = 3 if config.astroTW else 2
+    ncols = 2*ntwi + 5
+    cols = "c" * (ntwi+1)
 #    tab = r'''\begin{tabular*}{0.72\textwidth}[t]{@{\extracolsep{\fill}}|r|ccc|ccc|cc|}
-    tab = r'''\begin{tabular}[t]{|r|ccc|ccc|cc|}
-%%%\multicolumn{9}{c}{\normalsize{}}\\
-'''
+    tab = r'''\begin{{tabular}}[t]{{|r|{}|{}|cc|}}
+%%%\multicolumn{{{}}}{{c}}{{\normalsize{{}}}}\\
+'''.format(cols,cols,ncols)
 
     ondate = Date.strftime("%d %B %Y")
     tab = tab + r'''\hline
-\multicolumn{{9}}{{|c|}}{{\rule{{0pt}}{{2.4ex}}{{\textbf{{{}}}}}}}\\
-'''.format(ondate)
+\multicolumn{{{}}}{{|c|}}{{\rule{{0pt}}{{2.4ex}}{{\textbf{{{}}}}}}}\\
+'''.format(ncols,ondate)
 
     tab = tab + r'''\hline
-\multicolumn{1}{|c|}{\rule{0pt}{2.4ex}\multirow{2}{*}{\textbf{Lat.}}} & 
-\multicolumn{2}{c}{\textbf{Twilight}} & 
-\multicolumn{1}{|c|}{\multirow{2}{*}{\textbf{Sunrise}}} & 
-\multicolumn{1}{c|}{\multirow{2}{*}{\textbf{Sunset}}} & 
-\multicolumn{2}{c|}{\textbf{Twilight}} & 
-\multicolumn{1}{c|}{\multirow{2}{*}{\textbf{Moonrise}}} & 
-\multicolumn{1}{c|}{\multirow{2}{*}{\textbf{Moonset}}}\\
-\multicolumn{1}{|c|}{} & 
-\multicolumn{1}{c}{Naut.} & 
+\multicolumn{{1}}{{|c|}}{{\rule{{0pt}}{{2.4ex}}\multirow{{2}}{{*}}{{\textbf{{Lat.}}}}}} & 
+\multicolumn{{{}}}{{c}}{{\textbf{{Twilight}}}} & 
+\multicolumn{{1}}{{|c|}}{{\multirow{{2}}{{*}}{{\textbf{{Sunrise}}}}}} & 
+\multicolumn{{1}}{{c|}}{{\multirow{{2}}{{*}}{{\textbf{{Sunset}}}}}} & 
+\multicolumn{{{}}}{{c|}}{{\textbf{{Twilight}}}} & 
+\multicolumn{{1}}{{c|}}{{\multirow{{2}}{{*}}{{\textbf{{Moonrise}}}}}} & 
+\multicolumn{{1}}{{c|}}{{\multirow{{2}}{{*}}{{\textbf{{Moonset}}}}}}\\
+\multicolumn{{1}}{{|c|}}{{}} & 
+'''.format(ntwi,ntwi)
+    if config.astroTW:
+        tab = tab + r'''\multicolumn{1}{c}{Astr.} & 
+'''
+    tab = tab + r'''\multicolumn{1}{c}{Naut.} & 
 \multicolumn{1}{c}{Civil} & 
 \multicolumn{1}{|c|}{} & 
 \multicolumn{1}{c|}{} & 
 \multicolumn{1}{c}{Civil} & 
-\multicolumn{1}{c|}{Naut.} & 
-\multicolumn{1}{c|}{} & 
+'''
+    if config.astroTW:
+        tab = tab + r'''\multicolumn{1}{c}{Naut.} & 
+\multicolumn{1}{c|}{Astr.} & 
+'''
+    else:
+        tab = tab + r'''\multicolumn{1}{c|}{Naut.} & 
+'''
+    tab = tab + r'''\multicolumn{1}{c|}{} & 
 \multicolumn{1}{c|}{}\\
 \hline\rule{0pt}{2.6ex}\noindent
 '''
@@ -221,23 +212,25 @@ def twilighttab(Date, ts):
             moon = listmoon[j-5][0]
             moon2 = listmoon[j-5][1]
         else:
-            twi = twilight(Date, lat, True)
+            twi = twilight(Date, lat, True, True)
             moon, moon2 = moonrise_set2(Date, lat)
         twi = twilight_symbol(twi)
+        if config.astroTW:
+            twi = [twi[6]] + twi[0:6] + [twi[7]]    # astronomical begin ... end
+        else:
+            twi = twi[0:6]
 
         if not(double_events_found(moon,moon2)):
             line = r'''\textbf{{{}}}'''.format(hs) + r''' {}$^\circ$'''.format(abs(lat))
-            line = line + r''' & {} & {} & {} & {} & {} & {} & {} & {} \\
-'''.format(twi[0],twi[1],twi[2],twi[3],twi[4],twi[5],moon[0],moon[1])
+            for event in twi + moon[0:2]:
+                line = line + r''' & {}'''.format(event)
+            line = line + r''' \\
+'''
         else:
             # print a row with two moonrise/moonset events on the same day & latitude
             line = r'''\multirow{{2}}{{*}}{{\textbf{{{}}} {}$^\circ$}}'''.format(hs,abs(lat))
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[0])
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[1])
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[2])
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[3])
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[4])
-            line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(twi[5])
+            for event in twi:
+                line = line + r''' & \multirow{{2}}{{*}}{{{}}}'''.format(event)
 
 # top row...
             for k in range(len(moon)):
@@ -248,7 +241,7 @@ def twilighttab(Date, ts):
             line = line + r'''\\
 '''	# terminate top row
 # bottom row...
-            line = line + r'''& & & & & & '''
+            line = line + r'''& ''' * len(twi)
             for k in range(len(moon)):
                 if moon2[k] != '--:--':
                     line = line + r''' & \colorbox{{khaki!45}}{{{}}}'''.format(moon2[k])
@@ -260,16 +253,16 @@ def twilighttab(Date, ts):
         tab = tab + line
         j += 1
     # add space between tables...
-    tab = tab + r'''\hline\multicolumn{9}{c}{}\\
-'''
+    tab = tab + r'''\hline\multicolumn{{{}}}{{c}}{{}}\\
+'''.format(ncols)
     tab = tab + r'''\end{tabular}
 '''
     return tab
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-def mp_planets_worker(Date, ts, obj):
+def mp_planets_worker(Date, obj):
     #print(" mp_planets_worker Start  {}".format(obj))
-    sha = mp_planetstransit(Date, ts, obj, True)    # ===>>> mp_eventtables.py
+    sha = mp_planetstransit(Date, obj, True)    # ===>>> mp_eventtables.py
     #print(" mp_planets_worker Finish {}".format(obj))
     return sha      # return list for four planets
 
@@ -281,7 +274,7 @@ def meridiantab(Date, ts):
         # multiprocess 'SHA + transit times' simultaneously
         objlist = ['venus', 'mars', 'jupiter', 'saturn']
         # set constant values to all arguments which are not changed during parallel processing
-        partial_func2 = partial(mp_planets_worker, Date, ts)
+        partial_func2 = partial(mp_planets_worker, Date)
 
         try:
             listofsha = pool.map(partial_func2, objlist, 1)     # RECOMMENDED: chunksize = 1
@@ -434,92 +427,123 @@ def page(Date, ts, dpp):
 #   This simple but effective function eliminates endless keyboard interrupts
 #   each time Ctrl-C is issued, while none actually kill the parent process
 #   ... and this causes the Command Prompt window (in Windows, MPmode=0) to hang.
-def init_worker():
+def init_worker(ts, ephndx, ephfile):
+    # Prevent child process from ever receiving a KeyboardInterrupt.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # load the ephemeris once per worker process (not per task)
+    init_context(ts, ephndx, ephfile)
+
+# The pages of a month or year are calculated in parallel (one task per page)
+# by worker processes that are forked when the hourly positions, events and
+# transits of all days are ready, so they inherit them. With "spawn" (Windows
+# & macOS) the pages are calculated in this process; Windows multiprocesses
+# the planet transits of each day (see meridiantab).
+
+pagets = None       # the timescale in a page worker process
+counters = ['stopwatch', 'stopwatch2', 'moonDaysCount', 'moonDataSeeks', 'moonDataFound', 'moonHorizonSeeks', 'moonHorizonFound', 'circumpolarSkips']
+
+def init_pageworker(ts):
     # Prevent child process from ever receiving a KeyboardInterrupt.
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    global pagets
+    pagets = ts
+    eventcache.collecting = True    # new event times are returned to the parent process
+
+def mp_page_worker(task):
+    # returns a page, the changes of the statistics counters and the new event times
+    Date, dpp = task
+    before = [getattr(config, c) for c in counters]
+    pg = page(Date, pagets, dpp)
+    return pg, [getattr(config, c) - b for c, b in zip(counters, before)], eventcache.collect()
 
 def pages(first_day, dtp, ts):
     # dtp = 0 if for entire year; = -1 if for entire month; else days to print
 
+    # calculate the hourly positions for all pages in one pass
+    if dtp == 0:
+        days = (date(first_day.year+1, 1, 1) - first_day).days
+    elif dtp == -1:
+        days = 31
+    else:
+        days = dtp
+    build_grid(first_day, days)
+    build_lunations(first_day, days)    # moon phases of all pages
+
+    # worker processes are only started if they get work (pool.map in MPmode 0)
+    bypage = config.MULTIpr and MPmode == 0 and not config.WINpf and mp.get_start_method() == "fork"
+    bydate = config.MULTIpr and MPmode == 0 and config.WINpf
     if config.MULTIpr:
+        init_context(ts, config.ephndx, config.ephfile)     # twilighttab runs in this process
         # Windows & macOS defaults to "spawn"; Unix to "fork"
         #mp.set_start_method("spawn")
         n = config.CPUcores
         if n > 12: n = 12   # use 12 cores maximum
         if (config.WINpf or config.MACOSpf) and n > 8: n = 8   # 8 maximum if Windows or Mac OS
-        if MPmode == 0:
-            global pool
-            pool = mp.Pool(n, init_worker)   # start 8 max. worker processes
-        if MPmode == 1:
-            global executor
-            executor = concurrent.futures.ProcessPoolExecutor(max_workers=config.CPUcores,initializer=init_worker)
-
-    out = ''
+        global pool
+        if bydate:      # ... for the planet transits in meridiantab
+            pool = mp.Pool(n, init_worker, (ts, config.ephndx, config.ephfile))   # start 8 max. worker processes
+
+    # calculate the rise/set/twilight events of all days in one pass
+    sweep_events(first_day, days, 0.5, True)
+    # and the Moon and planet transits
+    sweep_transits(first_day, days, True)
+
+    # the pages (2 days per page maximum) with the progress indicator
+    tasks = []
+    progress = []
     pmth = ''
-    dpp = 2         # 2 days per page maximum
     day1 = first_day
+    i = dtp   # don't decrement dtp
+    while (dtp == 0 and day1.year == first_day.year) or (dtp == -1 and day1.month == first_day.month) or (dtp > 0 and i > 0):
+        dpp = 2
+        day2 = day1 + timedelta(days=1)
+        if dtp > 0:
+            if i < 2: dpp = i
+        elif (dtp == 0 and day2.year != first_day.year) or (dtp == -1 and day2.month != first_day.month):
+            dpp -= day2.day
+            if dpp <= 0: break
+        tasks.append((day1, dpp))
+        cmth = day1.strftime("%b ")
+        if dtp > 0:
+            progress.append('')
+        elif cmth != pmth:
+            progress.append("\n" + cmth)     # next month
+            pmth = cmth
+        else:
+            progress.append('.')
+        i -= 2
+        day1 += timedelta(days=2)
 
-    if dtp == 0:        # if entire year
-        year = first_day.year
-        yr = year
-        while year == yr:
-            cmth = day1.strftime("%b ")
-            day2 = day1 + timedelta(days=1)
-            if day2.year != yr:
-                dpp -= day2.day
-                if dpp <= 0: return out
-            if cmth != pmth:
-                print() # progress indicator - next month
-                #print(cmth, end='')
-                sys.stdout.write(cmth)	# next month
-                sys.stdout.flush()
-                pmth = cmth
-            else:
-                sys.stdout.write('.')	# progress indicator
-                sys.stdout.flush()
-            out += page(day1,ts,dpp)
-            day1 += timedelta(days=2)
-            year = day1.year
-
-    elif dtp == -1:     # if entire month
-        mth = first_day.month
-        m = mth
-        while mth == m:
-            cmth = day1.strftime("%b ")
-            day2 = day1 + timedelta(days=1)
-            if day2.month != m:
-                dpp -= day2.day
-                if dpp <= 0: return out
-            if cmth != pmth:
-                print() # progress indicator - next month
-                #print(cmth, end='')
-                sys.stdout.write(cmth)	# next month
-                sys.stdout.flush()
-                pmth = cmth
-            else:
-                sys.stdout.write('.')	# progress indicator
+    out = ''
+    if bypage:
+        sweep_pages([d + timedelta(days=k) for d, dpp in tasks for k in range(dpp)])   # ... before the worker processes are forked
+        eventcache.flush()
+        pool = mp.Pool(min(n, len(tasks)), init_pageworker, (ts,))
+        try:
+            # RECOMMENDED: chunksize = 1
+            for k, (pg, changes, rows) in enumerate(pool.imap(mp_page_worker, tasks, 1)):
+                sys.stdout.write(progress[k])   # progress indicator
                 sys.stdout.flush()
+                out += pg
+                for c, v in zip(counters, changes):
+                    setattr(config, c, getattr(config, c) + v)
+                eventcache.merge(rows)
+        except KeyboardInterrupt:
+            print(msg0)
+            sys.exit(0)
+    else:
+        for k, (day1, dpp) in enumerate(tasks):
+            sys.stdout.write(progress[k])   # progress indicator
+            sys.stdout.flush()
             out += page(day1,ts,dpp)
-            day1 += timedelta(days=2)
-            mth = day1.month
-
-    else:           # print 'dtp' days beginning with first_day
-        i = dtp   # don't decrement dtp
-        while i > 0:
-            if i < 2: dpp = i
-            out += page(day1,ts,dpp)
-            i -= 2
-            day1 += timedelta(days=2)
 
     if dtp <= 0:       # if Event Time Tables for a whole month/year...
         print("\n")	    # 2 x newline to terminate progress indicator
 
-    if config.MULTIpr:
-        if MPmode == 0:
-            pool.close()    # close all worker processes
-            pool.join()
-        if MPmode == 1:
-            executor.shutdown()
+    if bypage or bydate:
+        pool.close()    # close all worker processes
+        pool.join()
+    eventcache.flush()  # store the new event times (see eventcache.py)
 
     return out
 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# The hourly ephemeris grid (see alma_skyfield.build_grid) and its on-disk cache.
+#
+# A grid partition holds hourly GAST with the RA, Dec and distance of the Sun,
+# Moon, Venus, Mars, Jupiter and Saturn plus, per day, the Moon's GHA at End of
+# Day and the planetary magnitudes at 00:00. A cached partition covers one year
+# (31 Dec of the previous year to 1 Jan of the following year) and is stored as
+# two memory-mapped NumPy files in the 'gridcache' subfolder. The file names
+# contain the ephemeris name, the date of the EOP data file, the Skyfield
+# version and the precision tier (if not 'exact'), so the cache never mixes
+# data from different sources.
+
+###### Standard library imports ######
+from datetime import date, datetime
+import os
+
+###### Third party imports ######
+import numpy as np
+from skyfield import VERSION
+from skyfield.magnitudelib import planetary_magnitude
+
+###### Local application imports ######
+import config
+import precision
+
+#----------------------
+#   global variables
+#----------------------
+
+names   = ['sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn']
+planets = ['venus', 'mars', 'jupiter', 'saturn']
+
+cachedir = None     # folder containing the cached partitions
+cachekey = ""       # ephemeris name, EOP file date and Skyfield version
+partitions = {}     # year -> partition opened (or calculated) in this session
+
+def init_cache(spad, ephfile, eopfile=None):    # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # nothing is read from disk until a partition is requested
+    global cachedir, cachekey
+    eop = "builtin"     # built-in UT1-tables
+    if eopfile is not None and os.path.isfile(eopfile):
+        eop = "EOP" + datetime.fromtimestamp(os.path.getmtime(eopfile)).strftime("%Y%m%d%H%M")
+    cachedir = os.path.join(spad, "gridcache")
+    cachekey = "{}_{}_sf{}{}".format(os.path.splitext(ephfile)[0], eop, ".".join(str(v) for v in VERSION), precision.tag())
+    partitions.clear()
+
+#-------------------------------
+#   Grid calculation
+#-------------------------------
+
+def compute(d0, ndays, ts, earth, bodies):
+    # calculate 'ndays' days beginning with date d0 as 2D arrays (hourly and daily rows)
+    dayofs = np.arange(ndays)
+    hours = precision.sample_hours(range(ndays * 24))
+    if precision.tier() == 'preview':
+        t = ts.ut1(d0.year, d0.month, d0.day, hours, 0, 0)  # interpolated to hourly values below
+    else:
+        # identical epochs to 'ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)' per day...
+        t = ts.ut1(d0.year, d0.month, d0.day + np.repeat(dayofs, 24), np.tile(np.arange(24), ndays), 0, 0)
+    observer = earth.at(precision.fast(t))
+    hourly = [precision.hourly(t.gast, hours, ndays * 24, 24)]
+    for name in names:
+        ra, dec, distance = precision.apparent(observer.observe(bodies[name])).radec(epoch='date')
+        hourly += [precision.hourly(ra.hours, hours, ndays * 24, 24),
+                   precision.hourly(dec.degrees, hours, ndays * 24),
+                   precision.hourly(distance.au, hours, ndays * 24)]
+
+    # the moon's GHA at End of Day as time is rounded to hh:mm (or hh:mm:ss)
+    daily = []
+    for sec in [30, 59.5]:
+        tEoD = precision.fast(ts.ut1(d0.year, d0.month, d0.day + dayofs, 23, 59, sec))
+        raEoD = precision.apparent(earth.at(tEoD).observe(bodies['moon'])).radec(epoch='date')[0]
+        daily += [tEoD.gast, raEoD.hours]
+
+    # planetary magnitudes at 00:00 per day
+    t00 = ts.ut1(d0.year, d0.month, d0.day + dayofs, 0, 0, 0)
+    observer00 = earth.at(t00)
+    for name in planets:
+        daily.append(planetary_magnitude(observer00.observe(bodies[name])))
+    return np.array(hourly), np.array(daily)
+
+def partition(d0, hourly, daily):
+    # the grid dictionary refers to rows of the arrays (no data is copied)
+    g = {'first': d0, 'days': daily.shape[1], 'gast': hourly[0]}
+    for i, name in enumerate(names):
+        g[name] = (hourly[3*i+1], hourly[3*i+2], hourly[3*i+3])
+    g['moonEoD']  = (daily[0], daily[1])
+    g['moonEoD2'] = (daily[2], daily[3])
+    for i, name in enumerate(planets):
+        g[name + 'mag'] = daily[4+i]
+    return g
+
+#-------------------------------
+#   Year partitions on disk
+#-------------------------------
+
+def yearfiles(year):
+    base = os.path.join(cachedir, "{}_{}".format(cachekey, year))
+    return base + ".hourly.npy", base + ".daily.npy"
+
+def yearstart(year):
+    # first date and number of days in a year partition
+    d0 = date(year-1, 12, 31)
+    return d0, (date(year+1, 1, 2) - d0).days
+
+def year_grid(year, ts, earth, bodies):     # used in alma_skyfield.build_grid
+    # the partition of a year: from this session, from disk or calculated (and saved)
+    g = open_year(year)
+    if g is None:
+        d0, ndays = yearstart(year)
+        hourly, daily = compute(d0, ndays, ts, earth, bodies)
+        save_year(year, hourly, daily)
+        g = partition(d0, hourly, daily)
+        partitions[year] = g
+    return g
+
+def open_year(year):        # used in ld_skyfield
+    # the partition of a year if available without calculation (else None)
+    if year in partitions: return partitions[year]
+    if cachedir is None or not config.cacheGRID: return None
+    fnH, fnD = yearfiles(year)
+    if not (os.path.isfile(fnH) and os.path.isfile(fnD)): return None
+    d0, ndays = yearstart(year)
+    try:
+        hourly = np.load(fnH, mmap_mode='r')
+        daily  = np.load(fnD, mmap_mode='r')
+        if hourly.shape != (3*len(names)+1, ndays*24) or daily.shape != (4+len(planets), ndays):
+            return None
+    except (OSError, ValueError):
+        return None
+    try:
+        os.utime(fnH)       # the least recently used files are evicted first
+        os.utime(fnD)
+    except OSError:
+        pass        # e.g. read-only folder: the cached year is still used
+    partitions[year] = partition(d0, hourly, daily)
+    return partitions[year]
+
+def save_year(year, hourly, daily):
+    if cachedir is None or not config.cacheGRID: return
+    try:
+        os.makedirs(cachedir, exist_ok=True)
+        for fn, arr in zip(yearfiles(year), [hourly, daily]):
+            with open(fn + ".tmp", "wb") as f:
+                np.save(f, arr)
+            os.replace(fn + ".tmp", fn)     # never leave an incomplete file
+    except OSError:
+        return      # e.g. read-only folder: the grid is used from memory only
+    evict()
+
+def evict():
+    # delete the least recently used years until the cache fits in 'cacheMB'
+    years = {}      # file name without '.hourly.npy' or '.daily.npy' -> [mtime, size]
+    for fn in os.listdir(cachedir):
+        if fn.endswith(".npy"):
+            st = os.stat(os.path.join(cachedir, fn))
+            base = fn.rsplit(".", 2)[0]
+            y = years.setdefault(base, [0, 0])
+            y[0] = max(y[0], st.st_mtime)
+            y[1] += st.st_size
+    total = sum(y[1] for y in years.values())
+    for base in sorted(years, key=lambda b: years[b][0]):
+        if total <= config.cacheMB * 1024 * 1024: break
+        try:
+            for ext in [".hourly.npy", ".daily.npy"]:
+                if os.path.isfile(os.path.join(cachedir, base + ext)):
+                    os.remove(os.path.join(cachedir, base + ext))
+            total -= years[base][1]
+        except OSError:
+            pass    # e.g. still memory-mapped (Windows)
+    return
@@ -19,7 +19,6 @@
 # Skyfield functions for Lunar Distance tables and charts
 
 ###### Standard library imports ######
-from datetime import date
 from math import atan, degrees, copysign
 import os
 import errno
@@ -27,7 +26,6 @@ import socket
 import sys			# required for .stdout.write()
 import urllib.error # used in 'download_EOP' function
 from urllib.request import urlopen
-from collections import deque
 
 ###### Third party imports ######
 from skyfield import VERSION
@@ -35,11 +33,19 @@ from skyfield.api import Loader
 from skyfield.api import Topos, Star
 from skyfield import almanac
 from skyfield.nutationlib import iau2000b
-from skyfield.data import hipparcos
+from skyfield.constants import AU_KM
 
 ###### Local application imports ######
 import config
+import eopcache
+import eoprefresh
+import ephexcerpt
 import ld_stardata
+import gridcache
+import precision
+import starcat
+import tablefmt
+import transits
 
 #---------------------------
 #   Module initialization
@@ -167,17 +173,26 @@ def download_EOP(path, filename, url, loc):
     sys.stdout.write("done.\n")
     sys.stdout.flush()
 
-def ld_init_sf(spad):
-    global ts, pandasDF, eph, earth, moon, sun, venus, mars, jupiter, saturn
+def ld_init_sf(spad, first_day=None, last_day=None):
+    global ts, eph, earth, moon, sun, venus, mars, jupiter, saturn
     load = Loader(spad)         # spad = folder to store the downloaded files
     EOPdf  = "finals2000A.all"  # Earth Orientation Parameters data file
     dfIERS = spad + EOPdf
     config.useIERSEOP = False
     config.txtIERSEOP = ""
+    refreshEOP = False          # True to download a new data file in the background (offline-first)
 
     if config.useIERS:
         if SkyfieldVersion("1.31") >= 0:
-            if os.path.isfile(dfIERS):
+            if config.offlineEOP:   # no network access before the calculations (see eoprefresh.py)
+                if os.path.isfile(dfIERS):
+                    ts = eopcache.timescale(load, dfIERS)	# timescale object
+                    config.useIERSEOP = True
+                    refreshEOP = load.days_old(EOPdf) > float(config.ageIERS)
+                else:
+                    ts = load.timescale()	# timescale object with built-in UT1-tables
+                    refreshEOP = True
+            elif os.path.isfile(dfIERS):
                 if load.days_old(EOPdf) > float(config.ageIERS):
                     if isConnected():
                         if testServer(EOPdf, urlIERS):  # first try downloading via FTP
@@ -187,7 +202,7 @@ def ld_init_sf(spad):
                         else:   # finally try the IERS datacenter (available in more countries)
                             download_EOP(spad,EOPdf,urlDCIERS,"IERS datacenter")
                     else: print("NOTE: no Internet connection... using existing '{}'".format(EOPdf))
-                ts = load.timescale(builtin=False)	# timescale object
+                ts = eopcache.timescale(load, dfIERS)	# timescale object
                 config.useIERSEOP = True
             else:
                 if isConnected():
@@ -197,7 +212,7 @@ def ld_init_sf(spad):
                         download_EOP(spad,EOPdf,urlUSNO,"USNO")
                     else:   # finally try the IERS datacenter (available in more countries)
                         download_EOP(spad,EOPdf,urlDCIERS,"IERS datacenter")
-                    ts = load.timescale(builtin=False)	# timescale object
+                    ts = eopcache.timescale(load, dfIERS)	# timescale object
                     config.useIERSEOP = True
                 else:
                     print("NOTE: no Internet connection... using built-in UT1-tables")
@@ -208,66 +223,25 @@ def ld_init_sf(spad):
         ts = load.timescale()	# timescale object with built-in UT1-tables
 
     if config.useIERSEOP and os.path.isfile(dfIERS):
-# get the IERS EOP data "release date" according to these rules:
-#   - begin searching within this millenium (ignoring data from 02 Jan 1973 to 31 Dec 1999)
-#   - halt when the following value is "P", i.e. predicted as opposed to measured:
-#       - flag for Bull. A UT1-UTC values
-#   - step back one day to the record that has "I", i.e. measured data.
-#
-# the date of this record is the last date with IERS measured data.
-#   [the more recent the date, the more accurate/reliable are both the past IERS
-#   Earth Orientation Parameters as well as the future (predicted) EOP data values.]
-
-# IERS EOP data format definition:
-# https://maia.usno.navy.mil/ser7/readme.finals2000A
-
-        queue = deque(["a", "b", "c", "d"])
-        PredData = False    # True when Prediction data flagged
-        PredEnd  = False    # True when Prediction data no longer flagged
-
-        with open(dfIERS) as file:
-            for line in file:
-                mjd = int(line[7:12])
-
-                if not PredData and mjd >= 51544:    # skip data in previous  millenium
-                    queue.append(line)
-                    queue.popleft()
-                    c1 = line[16:17]    # IERS (I) or Prediction (P) flag for Bull. A polar motion values
-                    c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
-                    c3 = line[95:96]    # IERS (I) or Prediction (P) flag for Bull. A nutation values
-                    if not PredData and c2 == "P":
-                        PredData = True
-                        iers = ""
-                        while queue:
-                            iersdata = queue.pop()
-                            if iersdata[57:58] == "I":
-                                iers = iersdata
-                                break
-                        if iers == "": iers = iersdata
-                        year = int(iers[0:2]) + 2000
-                        mth  = int(iers[2:4])
-                        day  = int(iers[4:6])
-                        dt = date(year, mth, day)
-                        config.txtIERSEOP = "IERS Earth Orientation data as of " + dt.strftime("%d-%b-%Y")
-                elif PredData:    # search for end of Prediction data
-                    c2 = line[57:58]    # IERS (I) or Prediction (P) flag for Bull. A UT1-UTC values
-                    if c2 == "P":
-                        iers = line
-                    else:
-                        PredEnd = True
-                        break
-
-        # detect end of Prediction data even if file ends with c2 == "P" ...
-        year = int(iers[0:2]) + 2000
-        mth  = int(iers[2:4])
-        day  = int(iers[4:6])
-        dt2 = date(year, mth, day)
+        # dates of the last IERS measured data and of the end of the prediction data
+        # (parsed once per version of the data file: see eopcache.py)
+        dt, dt2 = eopcache.dates(dfIERS)
+        if dt2 is None:
+            print("Error: IERS Earth Orientation Parameters data file is incomplete...")
+            print("       most likely the download did not finish properly.")
+            print("       Please delete the 'finals2000A.all' data file and")
+            print("       rerun this program - it will be downloaded anew.")
+            sys.exit(0)
+        config.txtIERSEOP = "IERS Earth Orientation data as of " + dt.strftime("%d-%b-%Y")
         config.endIERSEOP = "IERS Earth Orientation predictions end " + dt2.strftime("%d-%b-%Y")
         config.dt_IERSEOP = dt2
+    if config.useIERS and config.offlineEOP:
+        eoprefresh.record(eoprefresh.release(dfIERS))
 
     if config.ephndx in set([0, 1, 2, 3, 4]):
     
-        eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
+        eph = load(ephexcerpt.choose(spad, first_day, last_day))	# load chosen ephemeris (or its smallest excerpt covering the dates)
+        config.ephfile = os.path.abspath(load.path_to(config.ephfile))
         earth   = eph['earth']
         moon    = eph['moon']
         sun     = eph['sun']
@@ -278,11 +252,13 @@ def ld_init_sf(spad):
             mars    = eph['mars barycenter']
         else:
             mars    = eph['mars']
+        gridcache.init_cache(spad, config.ephemeris[config.ephndx][0], dfIERS if config.useIERSEOP else None)
+
+    # the stars in ld_stardata from the compact Hipparcos catalog (see starcat.py)
+    starcat.init_catalog(load)
 
-    # load the Hipparcos catalog as a 118,218 row Pandas dataframe.
-    with load.open(hipparcos.URL) as f:
-        #hipparcos_epoch = ts.tt(1991.25)
-        pandasDF = hipparcos.load_dataframe(f)
+    if refreshEOP:
+        eoprefresh.start(spad, EOPdf)   # after the caches are keyed by the current data file
 
     return ts
 
@@ -349,6 +325,15 @@ def fmtdeg(deg, fixedwidth=1):
 #   Miscellaneous  (Lunar Distance tables only)
 #-------------------------------------------------
 
+def cached(d, name, hours=24):
+    # GAST, RA (hours), Dec (degrees) and distance (AU) of a body for 'hours' hourly epochs
+    # beginning at 00:00 on date d, if the year is in the grid cache (see gridcache.py)
+    g = gridcache.open_year(d.year)
+    if g is None: return None
+    i = (d - g['first']).days * 24
+    ra, dec, au = g[name]
+    return g['gast'][i:i+hours], ra[i:i+hours], dec[i:i+hours], au[i:i+hours]
+
 def getDUT1(d):       # used in 'page' (Lunar DIstance tables only)
     # obtain calculation parameters
     t = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
@@ -360,11 +345,15 @@ def getDUT1(d):       # used in 'page' (Lunar DIstance tables only)
 
 def moon_SD(d):         # used in moontab
     # compute semi-diameter of moon (in minutes)
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)
-    position = earth.at(t00).observe(moon)
-    distance = position.apparent().radec(epoch='date')[2]
-    dist_km = distance.km
+    c = cached(d, 'moon', 1)
+    if c is not None:
+        dist_km = c[3][0] * AU_KM
+    else:
+        t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
+        #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)
+        position = earth.at(t00).observe(moon)
+        distance = position.apparent().radec(epoch='date')[2]
+        dist_km = distance.km
 # OLD: sdm = degrees(atan(1738.1/dist_km))   # equatorial radius of moon = 1738.1 km
     sdm = degrees(atan(1737.4/dist_km))   # volumetric mean radius of moon = 1737.4 km
     sdmm = "{:0.1f}".format(sdm * 60)  # convert to minutes of arc
@@ -372,41 +361,51 @@ def moon_SD(d):         # used in moontab
 
 def moon_GHA(d):        # used in moontab
     # compute moon's GHA, DEC and HP per hour of day
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    #ra = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    #distance = position.apparent().radec(epoch='date')[2]
-    ra, dec, distance = position.apparent().radec(epoch='date')
-
-    # also compute moon's GHA at End of Day (23:59:30) and Start of Day (24 hours earlier)
-    tSoD = ts.ut1(d.year, d.month, d.day-1, 23, 59, 30)
-    posSoD = earth.at(tSoD).observe(moon)
-    raSoD = posSoD.apparent().radec(epoch='date')[0]
-    ghaSoD = gha2deg(tSoD.gast, raSoD.hours)   # GHA as float
-    tEoD = ts.ut1(d.year, d.month, d.day, 23, 59, 30)
-    posEoD = earth.at(tEoD).observe(moon)
-    raEoD = posEoD.apparent().radec(epoch='date')[0]
-    ghaEoD = gha2deg(tEoD.gast, raEoD.hours)   # GHA as float
+    c = cached(d, 'moon')
+    if c is not None:
+        gast, ra, dec, au = c
+        # GHA at End of Day (23:59:30) and Start of Day (24 hours earlier)
+        g = gridcache.open_year(d.year)
+        n = (d - g['first']).days
+        gastEoD, raEoD = g['moonEoD']
+        ghaSoD = gha2deg(gastEoD[n-1], raEoD[n-1])  # GHA as float
+        ghaEoD = gha2deg(gastEoD[n], raEoD[n])      # GHA as float
+    else:
+        t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
+        position = earth.at(t).observe(moon)
+        #ra = position.apparent().radec(epoch='date')[0]
+        #dec = position.apparent().radec(epoch='date')[1]
+        #distance = position.apparent().radec(epoch='date')[2]
+        ra, dec, distance = precision.apparent(position).radec(epoch='date')
+        gast, ra, dec, au = t.gast, ra.hours, dec.degrees, distance.au
+
+        # also compute moon's GHA at End of Day (23:59:30) and Start of Day (24 hours earlier)
+        tSoD = precision.fast(ts.ut1(d.year, d.month, d.day-1, 23, 59, 30))
+        posSoD = earth.at(tSoD).observe(moon)
+        raSoD = precision.apparent(posSoD).radec(epoch='date')[0]
+        ghaSoD = gha2deg(tSoD.gast, raSoD.hours)   # GHA as float
+        tEoD = precision.fast(ts.ut1(d.year, d.month, d.day, 23, 59, 30))
+        posEoD = earth.at(tEoD).observe(moon)
+        raEoD = precision.apparent(posEoD).radec(epoch='date')[0]
+        ghaEoD = gha2deg(tEoD.gast, raEoD.hours)   # GHA as float
 
     GHAupper = [-1.0 for x in range(24)]
     GHAlower = [-1.0 for x in range(24)]
-    gham = ['' for x in range(24)]
-    decm = ['' for x in range(24)]
-    degm = ['' for x in range(24)]
-    HPm  = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-##        raIDL = ra.hours[i] + 12	# at International Date Line
+    HP = [0.0 for x in range(24)]
+    for i in range(len(dec)):
+##        raIDL = ra[i] + 12	# at International Date Line
 ##        if raIDL > 24: raIDL = raIDL - 24
-        GHAupper[i] = gha2deg(t[i].gast, ra.hours[i])   # GHA as float
+        GHAupper[i] = gha2deg(gast[i], ra[i])   # GHA as float
         GHAlower[i] = GHAcolong(GHAupper[i])
-        gham[i] = fmtgha(t[i].gast, ra.hours[i])
-        decm[i] = fmtdeg(dec.degrees[i],2)
-        degm[i] = dec.degrees[i]
-        dist_km = distance.km[i]
+        dist_km = au[i] * AU_KM
 # OLD:  HP = degrees(atan(6378.0/dist_km))	# radius of earth = 6378.0 km
-        HP = degrees(atan(6371.0/dist_km))	# volumetric mean radius of earth = 6371.0 km
-        HPm[i] = "{:0.1f}'".format(HP * 60)     # convert to minutes of arc
+        HP[i] = degrees(atan(6371.0/dist_km)) * 60  # volumetric mean radius of earth = 6371.0 km (in minutes of arc)
+
+    # each column is formatted at once (see tablefmt.py)
+    gham = tablefmt.gha(gast, ra)
+    decm = tablefmt.degrees(dec, 2)
+    degm = list(dec)
+    HPm  = tablefmt.minutes(HP)
 
     # degm has been added for the sunmoontab function
     # GHAupper is an array of GHA per hour as float
@@ -416,61 +415,37 @@ def moon_GHA(d):        # used in moontab
 
 def moon_VD(d0,d):           # used in moontab
     # first value required is at 00:00 on the current day...
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    pos0 = earth.at(t0).observe(moon)
-    #ra0 = pos0.apparent().radec(epoch='date')[0]
-    #dec0 = pos0.apparent().radec(epoch='date')[1]
-    ra0, dec0, _ = pos0.apparent().radec(epoch='date')
-    V0 = gha2deg(t0.gast, ra0.hours)
-    D0 = dec0.degrees
-
-    # ...then 24 values at hourly intervals from 00:00 onwards
-    t = ts.ut1(d.year, d.month, d.day, next_hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    #ra  = position.apparent().radec(epoch='date')[0]
-    #dec = position.apparent().radec(epoch='date')[1]
-    ra, dec, _ = position.apparent().radec(epoch='date')
-
-    moonVm = ['' for x in range(24)]
-    moonDm = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        V1 = gha2deg(t[i].gast, ra.hours[i])
+    # ...then 24 values at hourly intervals from 01:00 onwards
+    c = cached(d, 'moon', 25)
+    if c is not None:
+        gast, ra, dec, _ = c
+    else:
+        t = precision.fast(ts.ut1(d.year, d.month, d.day, [0] + next_hour_of_day, 0, 0))
+        position = earth.at(t).observe(moon)
+        ra, dec, _ = precision.apparent(position).radec(epoch='date')
+        gast, ra, dec = t.gast, ra.hours, dec.degrees
+    V0 = gha2deg(gast[0], ra[0])
+    D0 = dec[0]
+
+    Vdm = [0.0 for x in range(24)]
+    Dm  = [0.0 for x in range(24)]
+    for i in range(24):
+        V1 = gha2deg(gast[i+1], ra[i+1])
         Vdelta = V1 - V0
         if Vdelta < 0: Vdelta += 360
-        Vdm = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
-        moonVm[i] = "{:0.1f}'".format(Vdm)
-        D1 = dec.degrees[i]
-        moonDm[i] = "{:0.1f}'".format((D1-D0) * 60)	# convert to minutes of arc
+        Vdm[i] = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
+        D1 = dec[i+1]
+        Dm[i] = (D1-D0) * 60	# convert to minutes of arc
         V0 = V1		# store current value as next previous value
         D0 = D1		# store current value as next previous value
+    moonVm = tablefmt.minutes(Vdm)      # each column is formatted at once
+    moonDm = tablefmt.minutes(Dm)
     return moonVm, moonDm
 
 #-----------------------------------------------------------------
 #   Moon transit time calculation  (Lunar Distance tables only)
 #-----------------------------------------------------------------
 
-def getGHA(d, hh, mm, ss):
-    # calculate the Moon's GHA on date d at hh:mm:ss (ss can be a float)
-    t1 = ts.ut1(d.year, d.month, d.day, hh, mm, ss)
-    pos = earth.at(t1).observe(moon)
-    ra = pos.apparent().radec(epoch='date')[0]
-    gha = gha2deg(t1.gast, ra.hours)
-###    print("getGHA: {}  {:02d}:{:02d}:{:04.1f}   {}".format(d, hh, mm, ss, gha))
-    return gha      # GHA as float (degrees)
-
-def roundup(hr, mi):
-    # round time up to next minute. Both arguments are integers and all times are within one day.
-    # Times (for calculation) between 23:59:30 and 00:00:00 are rounded up to 00:00 ... no 
-    # date adjustment is necessary as the calculated time came on purpose from the day before.
-
-    mi += 1         # round minutes up
-    if(mi == 60):
-        mi = 0
-        hr += 1     # round hours up
-    if(hr == 24):
-        hr = 0
-    return hr, mi
-
 def find_transit(d, ghaList, modeLT):   # used in moontab
     # Determine the Transit Event Time rounded to the nearest minute.
 
@@ -486,95 +461,9 @@ def find_transit(d, ghaList, modeLT):   # used in moontab
     # This method may also be used to determine the Lower transit by replacing
     #  GHA with the colongitude GHA (and an adapted ghaList). Thus...
     # modeLT = False means find Upper Transit; = True means find Lower Transit
-    
-    # This OPTIMIZED version does not calculate every minute from 0 to 59 until
-    # it detects a transit event. The minutes search begins from 'min_start'
-    # and is so chosen that 2 or 3 values before the event are searched (with the
-    # exception when the search begins from zero minutes, where the event might
-    # follow immediately).
 
-    # If the transit event is very close to the mid-point between minutes, one cannot
-    # reliably estimate to round up or down without inspecting the mid-point GHA value.
-
-    if modeLT:
-        txt = "Lower Transit"
-    else:
-        txt = "Upper Transit"
-    hr = -1                 # an invalid hour value
-    transit_time = '--:--'  # assume 'no event'
-    prev_gha = 0
-    prev_time = '--:--'
-    mid_gha = 0
-    mid_time = '--:--:--'
-    gha = 0
-    gha_time = '--:--'
-    gha = ghaList[0]    # GHA at 23:59:30 on d-1
-    gha_top = 360       # min_start defaults to 0
-
-    # find the hour after which the transit event occurs
-    for i in range(24): # 0 to 23
-        if(ghaList[i+1] < gha):
-            hr = i      # event is between hr:00 and {hr+1}:00
-            gha_top = ghaList[i]
-            break
-        gha = ghaList[i+1]  # test GHA at {hr+1}:00
-
-    # estimate where to begin searching by the minute
-    min_start = max(0, int((360-gha_top)/0.25)-1)
-    if hr == 0:
-        # compensation for gha at Start-of-Day being 30 seconds earlier at 23:59:30
-        min_start = max(0, min_start-1)
-
-    if hr< 0:
-        return transit_time     # no event detected this day
-
-    # if event found... locate it more precisely (to the minute)
-    iLoops = 0
-    prev_gha = ghaList[i]    # GHA before the event (typically on the hour)
-    prev_time = "{:02d}:{:02d}".format(hr,0)
-    for mi in range(min_start,60):       # 0 to 59 max
-        gha = getGHA(d, hr, mi+1, 0)   # GHA on the minute after the event
-        gha_time = "{:02d}:{:02d}".format(hr,mi+1)
-        if(modeLT):
-            gha = GHAcolong(gha)
-        if(gha < prev_gha):
-            if(iLoops == 0 and mi > 0): raise ValueError('ERROR: min_start ({}) too large on {} at {} ({})'.format(mi, d, gha_time, txt))
-            break       # break when event detected ('hr:mi' is before the event)
-        prev_gha = gha  # GHA on the minute before the event
-        prev_time = "{:02d}:{:02d}".format(hr,mi+1)
-        iLoops += 1
-
-    mid_time = '-'      # no value yet for mid-way between minutes
-    diff = prev_gha - 360 + gha      # if negative, round time up
-
-    if(hr == 23 and mi == 59):
-        pass            # events between 23:59 and 23:59:30 never round up to 00:00 next day
-
-    elif(hr == 0 and mi == 0):
-        mid_gha = getGHA(d, hr, mi, 30)
-        mid_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,30)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    elif(abs(diff) < 0.002):
-        # midpoint too close to the transit event to estimate round up or down.
-        #    Check the GHA 30 sec later (midway between minutes).
-        # (The GHA changes by 0.002 in about 0.5 seconds time)
-        mid_gha = getGHA(d, hr, mi, 30)
-        mid_time = "{:02d}:{:02d}:{:02d}".format(hr,mi,30)
-        if(modeLT):
-            mid_gha = GHAcolong(mid_gha)
-        if(mid_gha > 180):
-            hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    elif(diff < 0):
-        # just compare which GHA is closer to zero GHA and round accordingly
-        hr, mi = roundup(hr, mi)   # midway is before the event (round minutes up)
-
-    transit_time = "{:02d}:{:02d}".format(hr,mi)
-    return transit_time
+    # The transit is interpolated from ghaList and polished with the exact GHA (see transits.py)
+    return transits.moon_transits(ts, earth, moon, [d], [ghaList], [modeLT], False)[0]
 
 ####    if(modeLT):
 ####        prev_gha = GHAcolong(prev_gha)
@@ -590,12 +479,16 @@ def find_transit(d, ghaList, modeLT):   # used in moontab
 def sunSD(d):
     # compute semi-diameter of sun at 0h and 23h
     sdsm = [0.0, 0.0]
+    c = cached(d, 'sun')
     i = 0
     for hh in [0, 23]:
-        t00 = ts.ut1(d.year, d.month, d.day, hh, 0, 0)
-        position = earth.at(t00).observe(sun)
-        distance = position.apparent().radec(epoch='date')[2]
-        dist_km = distance.km
+        if c is not None:
+            dist_km = c[3][hh] * AU_KM
+        else:
+            t00 = ts.ut1(d.year, d.month, d.day, hh, 0, 0)
+            position = earth.at(t00).observe(sun)
+            distance = position.apparent().radec(epoch='date')[2]
+            dist_km = distance.km
         # volumetric mean radius of sun = 695700 km
         sds = degrees(atan(695700.0 / dist_km))
         sdsm[i] = "{:0.1f}".format(sds * 60)   # convert to minutes of arc
@@ -609,11 +502,11 @@ def sunSD(d):
 
 def sunGHA(d):              # used in addPLANET and showLD
     # compute sun's GHA and DEC at 0h, 6h, 12h, 18h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0))
     position = earth.at(t).observe(sun)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 5
     dec = [None] * 5
@@ -627,11 +520,11 @@ def sunGHA(d):              # used in addPLANET and showLD
 
 def moonGHA(d):             # used in getMOON, addMOON and Main
     # compute moon's GHA, DEC and HP at 0h, 12h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day3, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day3, 0, 0))
     position = earth.at(t).observe(moon)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 3
     dec = [None] * 3
@@ -649,11 +542,11 @@ def moonGHA(d):             # used in getMOON, addMOON and Main
 
 def venusGHA(d):            # used in addPLANET and showLD
     # compute planet's GHA and DEC at 0h, 6h, 12h, 18h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0))
     position = earth.at(t).observe(venus)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 5
     dec = [None] * 5
@@ -667,11 +560,11 @@ def venusGHA(d):            # used in addPLANET and showLD
 
 def marsGHA(d):             # used in addPLANET and showLD
     # compute planet's GHA and DEC at 0h, 6h, 12h, 18h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0))
     position = earth.at(t).observe(mars)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 5
     dec = [None] * 5
@@ -685,11 +578,11 @@ def marsGHA(d):             # used in addPLANET and showLD
 
 def jupiterGHA(d):          # used in addPLANET and showLD
     # compute planet's GHA and DEC at 0h, 6h, 12h, 18h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0))
     position = earth.at(t).observe(jupiter)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 5
     dec = [None] * 5
@@ -703,11 +596,11 @@ def jupiterGHA(d):          # used in addPLANET and showLD
 
 def saturnGHA(d):           # used in addPLANET and showLD
     # compute planet's GHA and DEC at 0h, 6h, 12h, 18h, 24h
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day5, 0, 0))
     position = earth.at(t).observe(saturn)
     #ra   = position.apparent().radec(epoch='date')[0]
     #decR = position.apparent().radec(epoch='date')[1]
-    ra, decR, _ = position.apparent().radec(epoch='date')
+    ra, decR, _ = precision.apparent(position).radec(epoch='date')
 
     sha = [None] * 5
     dec = [None] * 5
@@ -726,10 +619,11 @@ def saturnGHA(d):           # used in addPLANET and showLD
 def getHipparcos(HIPnum, t00):          # used in ld_charts.getc and .getstar
 
     # get star data from Hipparcos (HIgh Precision PARallax COllecting Satellite)
-    star = Star.from_dataframe(pandasDF.loc[int(HIPnum)])
+    cat = starcat.lookup([HIPnum])
+    star = starcat.catalog_star(cat[0])
     astrometric = earth.at(t00).observe(star)
     ra, dec, distance = astrometric.radec(epoch='date')
-    mag = pandasDF.loc[int(HIPnum)]['magnitude']
+    mag = cat[0]['magnitude']
 
     return ra, dec, mag
 
@@ -778,9 +672,9 @@ def ld_planets(d):          # used in ld_tables.moontab, ld_charts.LDstrategy
     # 26 hours/day need to be calculated: 23h on 'day-1' is needed for hourly LD delta at 0h on 'day'
     #     23h on 'day-1' is needed for hourly LD delta at 0h on 'day'
     #     22h on 'day-1' is needed for rate of change of hourly LD delta at 0h on 'day'
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day26, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day26, 0, 0))
     e = earth.at(t)
-    pos_m = e.observe(moon).apparent()
+    pos_m = precision.apparent(e.observe(moon))
     ra_m = pos_m.radec(epoch='date')[0]
 
     for idx in range(5):
@@ -789,24 +683,24 @@ def ld_planets(d):          # used in ld_tables.moontab, ld_charts.LDstrategy
         if   idx == 0:
             name = "Sun"
             Vmag = -26.74
-            pos_p = e.observe(sun).apparent()
+            pos_p = precision.apparent(e.observe(sun))
             pos_H = pos_p   # Helios
         elif idx == 1:
             name = "Venus"
             Vmag = -4.14    # mean brightness (-2.98 to -4.6)
-            pos_p = e.observe(venus).apparent()
+            pos_p = precision.apparent(e.observe(venus))
         elif idx == 2:
             name = "Mars"
             Vmag = 0.71     # mean brightness
-            pos_p = e.observe(mars).apparent()
+            pos_p = precision.apparent(e.observe(mars))
         elif idx == 3:
             name = "Jupiter"
             Vmag = -2.20     # mean brightness
-            pos_p = e.observe(jupiter).apparent()
+            pos_p = precision.apparent(e.observe(jupiter))
         elif idx == 4:
             name = "Saturn"
             Vmag = 0.46     # mean brightness
-            pos_p = e.observe(saturn).apparent()
+            pos_p = precision.apparent(e.observe(saturn))
 
         sep_pm = pos_m.separation_from(pos_p)
         ra_p, dec, distance = pos_p.radec(epoch='date')
@@ -1019,13 +913,13 @@ def ld_stars(d, NewMoonHours, ra_sun):      # used in moontab, LDstrategy
     # 26 hours/day need to be calculated:
     #     23h on 'day-1' is needed for hourly LD delta at 0h on 'day'
     #     22h on 'day-1' is needed for rate of change of hourly LD delta at 0h on 'day'
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day26, 0, 0)
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)           # observe at midnight
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day26, 0, 0))
+    t00 = precision.fast(ts.ut1(d.year, d.month, d.day, 0, 0, 0))           # observe at midnight
     #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)          # observe at noon
     e = earth.at(t)
-    pos_m = e.observe(moon).apparent()
+    pos_m = precision.apparent(e.observe(moon))
     ra_m  = pos_m.radec(epoch='date')[0]
-    pos_H = e.observe(sun).apparent()
+    pos_H = precision.apparent(e.observe(sun))
 
     ns_idx = 0      # index to navstars (0 to 21)
     for line in ld_stardata.navstars.strip().split('\n'):
@@ -1041,8 +935,8 @@ def ld_stars(d, NewMoonHours, ra_sun):      # used in moontab, LDstrategy
         HIPnum = line[:x3]
         Hpmag = float(line[x3+1:])          # Hipparcos magnitude
 
-        star = Star.from_dataframe(pandasDF.loc[int(HIPnum)])
-        pos_s = earth.at(t00).observe(star).apparent()
+        star = starcat.catalog_star(starcat.lookup([HIPnum])[0])
+        pos_s = precision.apparent(earth.at(t00).observe(star))
         sep_sm = pos_m.separation_from(pos_s)
         ra, dec, distance = pos_s.radec(epoch='date')
         ra_h = ra.hours
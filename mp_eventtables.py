@@ -35,14 +35,20 @@ from math import degrees, atan
 #import sys			# sys.exit() does not work here
 
 ###### Third party imports ######
-from skyfield.api import load
+from skyfield.api import load_file
 from skyfield.api import Topos, Star, wgs84, N, S, E, W     # Topos is deprecated in Skyfield v1.35!
-from skyfield import VERSION, almanac
+from skyfield import almanac
 from skyfield.nutationlib import iau2000b
 #from skyfield.data import hipparcos
 
 ###### Local application imports ######
 import config
+import eventcache
+import multilat
+import observers
+import precision
+import tablefmt
+import transits
 
 #----------------------
 #   initialization
@@ -51,19 +57,109 @@ import config
 hour_of_day = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
 degree_sign= u'\N{DEGREE SIGN}'
 
+#----------------------------
+#   worker-resident context
+#----------------------------
+
+# The ephemeris is loaded ONCE per process (in the pool initializer) and the
+# timescale is received ONCE from the parent process. Every task takes them
+# from here, so a task only carries dates and latitudes.
+
+ctx = {}    # ts, ephemeris, bodies and the observer registry (see observers.py)
+
+def init_context(ts, ephndx, ephfile):   # used in eventtables.pages & eventtables.init_worker
+    config.ephndx = ephndx      # a spawned process starts with the default config
+    config.ephfile = ephfile    # the kernel or its excerpt loaded by init_sf (see ephexcerpt.py)
+    if ctx.get('ephfile') != ephfile:
+        eph = load_file(ephfile)    # read-only: the file was downloaded and validated by the parent process
+        ctx.clear()
+        ctx['ephfile'] = ephfile
+        ctx['earth']   = eph['earth']
+        ctx['sun']     = eph['sun']
+        ctx['moon']    = eph['moon']
+        ctx['venus']   = eph['venus']
+        ctx['jupiter'] = eph['jupiter barycenter']
+        ctx['saturn']  = eph['saturn barycenter']
+        if ephndx >= 3:
+            ctx['mars'] = eph['mars barycenter']
+        else:
+            ctx['mars'] = eph['mars']
+        ctx['observers'] = observers.build(ctx['earth'])
+        ctx['events'] = {}
+        ctx['horizons'] = {}
+    ctx['table'] = {}
+    ctx['ts'] = ts
+
+def lat_observer(lat):
+    # topos, observer and label at latitude 'lat' (longitude 0) from the observer registry
+    return observers.lookup(ctx['observers'], ctx['earth'], lat)
+
+# Sun and Moon events of all latitudes are calculated together (see multilat.py)
+# when the first latitude is requested; the other latitudes are looked up.
+
+def sweep_events(first_day, days, sec, astro=False):    # used in eventtables.pages
+    # calculate the events of all days from first_day-1 to first_day+days+1 at
+    # once (days begin 'sec' seconds before midnight as in the tables; 'astro'
+    # adds astronomical twilight, see multilat.twilight_horizons)
+    ctx['table'] = {}
+    ctx.pop('deferred', None)
+    if not config.sweepEV: return
+    if eventcache.active():     # ... when the first event is not found in the event cache
+        ctx['deferred'] = (first_day, days, sec, astro)
+        return
+    event_sweep(first_day, days, sec, astro)
+
+def sweep_pages(dates):      # used in eventtables.pages
+    # before the page workers are forked: run a deferred sweep unless every
+    # day (its first latitude) is in the event cache, as otherwise each
+    # worker process would repeat it
+    if 'deferred' not in ctx: return
+    kind = 'twilight18' if config.astroTW else 'twilight'
+    if all(eventcache.get(kind, config.lat[0], d, True) is not None and
+           eventcache.get('moon', config.lat[0], d, True) is not None for d in dates): return
+    event_sweep(*ctx.pop('deferred'))
+
+def event_sweep(first_day, days, sec, astro):
+    ts = ctx['ts']
+    t0 = []
+    t1 = []
+    horizons = []
+    for n in range(-1, days + 2):
+        dt = datetime(first_day.year, first_day.month, first_day.day, 0, 0, 0)
+        dt += timedelta(days=n, seconds=-sec)
+        t0.append(ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second))
+        t1.append(ts.ut1(dt.year, dt.month, dt.day+1, dt.hour, dt.minute, dt.second))
+        horizons.append(getHorizon(ts.ut1(dt.year, dt.month, dt.day, dt.hour+12, dt.minute, dt.second), ctx['earth'], ctx['moon']))
+    ctx['table'] = multilat.event_table(ts, ctx['earth'], ctx['sun'], ctx['moon'], config.lat, t0, t1, multilat.twilight_horizons(astro), horizons)
+
+def sun_day(t0, t1):
+    # sunrise/sunset, civil, nautical (and astronomical) twilight at all latitudes between t0 and t1
+    if 'deferred' in ctx: event_sweep(*ctx.pop('deferred'))
+    key = (t0.tt, t1.tt)
+    if key in ctx['table']: return ctx['table'][key]
+    key = ('sun', t0.tt, t1.tt)
+    events = ctx['events']
+    if key not in events:
+        if len(events) >= 12: events.clear()    # only a few consecutive dates are needed
+        events[key] = multilat.sun_events(ctx['ts'], ctx['earth'], ctx['sun'], config.lat, t0, t1, multilat.twilight_horizons(True))
+    return events[key]
+
+def moon_day(t0, t1, horizon):
+    # moonrise/moonset events at all latitudes between t0 and t1
+    if 'deferred' in ctx: event_sweep(*ctx.pop('deferred'))
+    key = (t0.tt, t1.tt, horizon)
+    if key in ctx['table']: return ctx['table'][key]
+    key = ('moon', t0.tt, t1.tt, horizon)
+    events = ctx['events']
+    if key not in events:
+        if len(events) >= 12: events.clear()    # only a few consecutive dates are needed
+        events[key] = multilat.moon_events(ctx['ts'], ctx['earth'], ctx['moon'], config.lat, t0, t1, horizon)
+    return events[key]
+
 #----------------------
 #   internal methods
 #----------------------
 
-def SkyfieldVersion(version2):      # compare Skyfield version to version2
-    versions2 = [int(v) for v in version2.split(".")]
-    for i in range(max(len(VERSION),len(versions2))):
-        v1 = VERSION[i]   if i < len(VERSION)   else 0
-        v2 = versions2[i] if i < len(versions2) else 0
-        if   v1 > v2: return 1
-        elif v1 < v2: return -1
-    return 0
-
 def fmtdeg(deg, fixedwidth=1):
     # formats the angle (deg) to that used in the nautical almanac (ddd°mm.m)
 	# the optional argument specifies the minimum width for the degrees
@@ -157,6 +253,8 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
     ndxR = 0 if len(rise) > 0 else 10
     ndxS = 0 if len(sett) > 0 else 10
     pickRISE = None         # no idea if RISE or SET comes first and is valid
+    Rall = tablefmt.times(rise, with_seconds)   # the text of all event times (see tablefmt.py)
+    Sall = tablefmt.times(sett, with_seconds)
     
     prev_dt = datetime.min.replace(tzinfo=timezone.utc)     # closest to datetime zero
     r = s = 0
@@ -181,7 +279,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = rise[ndxR]
                 valid = yR[ndxR]
                 if valid:
-                    Rtxt[r] = time2text(t, with_seconds)
+                    Rtxt[r] = Rall[ndxR]
                     r += 1; finalstate = True
                 ndxR += 1
             pickRISE = not pickRISE     # flip RISE to SET & vice-versa
@@ -190,7 +288,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = sett[ndxS]
                 valid = yS[ndxS]
                 if valid:
-                    Stxt[s] = time2text(t, with_seconds)
+                    Stxt[s] = Sall[ndxS]
                     s += 1; finalstate = False
                 ndxS += 1
             pickRISE = not pickRISE     # flip RISE to SET & vice-versa
@@ -205,18 +303,19 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
 def fmt_transits(t, lats, with_seconds = False):
     # analyse the return values from the 'find_transits' method...
     # get planet transit times (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     transit1 = '--:--'
     transit2 = '--:--'
     if len(t) == 1:         # this happens most often
         t0 = t[0]
         # get the UT1 time rounded to minutes OR seconds ...
-        transit1 = time2text(t0, with_seconds)
+        transit1 = tt[0]
     else:
         if len(t) == 2:		# this happens very rarely
             t0 = t[0]; t1 = t[1]
             # get the UT1 time rounded to minutes OR seconds ...
-            transit1 = time2text(t0, with_seconds)
-            transit2 = time2text(t1, with_seconds)
+            transit1 = tt[0]
+            transit2 = tt[1]
         elif len(t) > 2:
             # this should never get here!
             rise_set_error(0,lats,t[0])
@@ -226,6 +325,7 @@ def fmt_transits(t, lats, with_seconds = False):
 def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 simplification)
     # analyse the return values from the 'find_discrete' method...
     # get sun/moon rise/set values (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     rise = '--:--'
     sett = '--:--'
     ris2 = '--:--'
@@ -241,14 +341,14 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
         # t1 = ts.ut1(dt1.year, dt1.month, dt1.day, dt1.hour, dt1.minute, sec1)
         if y[0] and not(y[1]):
             # get the UT1 time rounded to minutes OR seconds ...
-            rise = time2text(t0, with_seconds)
-            sett = time2text(t1, with_seconds)
+            rise = tt[0]
+            sett = tt[1]
             finalstate = False
         else:
             if not(y[0]) and y[1]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
-                rise = time2text(t1, with_seconds)
+                sett = tt[0]
+                rise = tt[1]
                 finalstate = True
             else:
                 # this should never get here!
@@ -261,11 +361,11 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
             # t0 = ts.ut1(dt0.year, dt0.month, dt0.day, dt0.hour, dt0.minute, sec0)
             if y[0]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                rise = time2text(t0, with_seconds)
+                rise = tt[0]
                 finalstate = True
             else:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
+                sett = tt[0]
                 finalstate = False
         else:
             if len(t) == 3:		# this happens rarely (in high latitudes mid-year)
@@ -281,16 +381,16 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
                 # t2 = ts.ut1(dt2.year, dt2.month, dt2.day, dt2.hour, dt2.minute, sec2)
                 if y[0] and not(y[1]) and y[2]:
                     # get the UT1 time rounded to minutes OR seconds ...
-                    rise = time2text(t0, with_seconds)
-                    sett = time2text(t1, with_seconds)
-                    ris2 = time2text(t2, with_seconds)
+                    rise = tt[0]
+                    sett = tt[1]
+                    ris2 = tt[2]
                     finalstate = True
                 else:
                     if not(y[0]) and y[1] and not(y[2]):
                         # get the UT1 time rounded to minutes OR seconds ...
-                        sett = time2text(t0, with_seconds)
-                        rise = time2text(t1, with_seconds)
-                        set2 = time2text(t2, with_seconds)
+                        sett = tt[0]
+                        rise = tt[1]
+                        set2 = tt[2]
                         finalstate = False
                     else:
                         # this should never get here!
@@ -327,46 +427,38 @@ def rise_set_error(y, lats, t0):
 #---------------------------------------
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_planetstransit(d, ts, obj, with_seconds = False):  # used in eventtables.meridiantab
+def mp_planetstransit(d, obj, with_seconds = False):  # used in eventtables.meridiantab
     # returns SHA and Meridian Passage for the navigational planets
 
     out = [None, None, None]    # return [planet_sha, planet_transit] + processing time
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    if obj == 'venus':   planet = eph['venus']
-    if obj == 'jupiter': planet = eph['jupiter barycenter']
-    if obj == 'saturn':  planet = eph['saturn barycenter']
-    if obj == 'mars':
-        if config.ephndx >= 3:
-            planet = eph['mars barycenter']
-        else:
-            planet = eph['mars']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    planet  = ctx[obj]
     lattxt = u'{} 0{} E transit'.format(obj, degree_sign)
-    if SkyfieldVersion("1.35") >= 0:
-        lats = 0.0     # default latitude (any will do)
-        topos = wgs84.latlon(lats, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    lats = 0.0     # default latitude (any will do)
+    topos, observer, latNS = lat_observer(lats)
 
     # calculate planet SHA
-    tfr = ts.ut1(d.year, d.month, d.day, 0, 0, 0)       # search from
+    tfr = precision.fast(ts.ut1(d.year, d.month, d.day, 0, 0, 0))       # search from
     position = earth.at(tfr).observe(planet)
-    ra = position.apparent().radec(epoch='date')[0]     # RA
+    ra = precision.apparent(position).radec(epoch='date')[0]     # RA
     out[0] = fmtgha(0, ra.hours)    # planet_sha
     
     # calculate planet transit
     d1 = d + timedelta(days=1)
     tto = ts.ut1(d1.year, d1.month, d1.day, 0, 0, 0)    # search to
     start00 = Time.time()                   # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         transit_time, y = almanac.find_discrete(tfr, tto, planet_transit(earth, planet))
         time00 = Time.time()-start00        # 00000
         out[1] = rise_set(transit_time,y,lattxt,with_seconds)[0]  # planet_transit
     else:
-        transit_time = almanac.find_transits(observer, planet, tfr, tto)
+        out[1] = eventcache.get(obj + 'transit', 0.0, d, with_seconds)
+        if out[1] is None:
+            transit_time = transits.planet_transits(ts, earth, planet, [tfr.tt], [tto.tt])[0]   # as almanac.find_transits
+            out[1] = fmt_transits(transit_time,lattxt,with_seconds)[0]  # planet_transit
+            eventcache.put(obj + 'transit', 0.0, d, with_seconds, out[1])
         time00 = Time.time()-start00        # 00000
-        out[1] = fmt_transits(transit_time,lattxt,with_seconds)[0]  # planet_transit
 
     out[2] = time00     # append processing time to list
     return out
@@ -393,25 +485,24 @@ def planet_transit(earth, planet_name):
 #------------------------
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_twilight(d, lat, ts, with_seconds = False):  # used in eventtables.twilighttab
+def mp_twilight(d, lat, with_seconds = False):      # used in eventtables.twilighttab
     # Returns for given date and latitude(in full degrees):
     # naut. and civil twilight (before sunrise), sunrise, meridian passage, sunset, civil and nautical twilight (after sunset).
     # NOTE: 'twilight' is only called for every third day in the Nautical Almanac...
     #       ...therefore daily tracking of the sun state is not possible.
 
     time00 = 0                              # 00000
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    sun     = eph['sun']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    sun     = ctx['sun']
+
+    kind = 'twilight18' if config.astroTW else 'twilight'
+    cached = eventcache.get(kind, lat, d, with_seconds)
+    if cached is not None: return cached[0:6] + [time00] + cached[6:]
 
     out = [None,None,None,None,None,None,None]  # 6 data items + processing time
     hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
 
@@ -427,13 +518,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):  # used in eventtables.twilig
     # Sunrise/Sunset...
     horizon = 0.8333        # degrees below horizon
     start00 = Time.time()                   # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         actual, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += Time.time()-start00       # 00000
         out[2], out[3], r2, s2, fs = rise_set(actual,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         out[2], out[3], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -446,13 +536,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):  # used in eventtables.twilig
     # Civil Twilight...
     horizon = 6.0           # degrees below horizon
     start00 = Time.time()                   # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         civil, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += Time.time()-start00       # 00000
         out[1], out[4], r2, s2, fs = rise_set(civil,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         out[1], out[4], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -464,13 +553,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):  # used in eventtables.twilig
     # Nautical Twilight...
     horizon = 12.0          # degrees below horizon
     start00 = Time.time()                   # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         naut, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += Time.time()-start00       # 00000
         out[0], out[5], r2, s2, fs = rise_set(naut,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         out[0], out[5], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -479,6 +567,26 @@ def mp_twilight(d, lat, ts, with_seconds = False):  # used in eventtables.twilig
         out[0] = yn
         out[5] = yn
 
+    # Astronomical Twilight (optional)...
+    if config.astroTW:
+        out.extend([None,None])     # begin & end follow the processing time
+        horizon = 18.0          # degrees below horizon
+        start00 = Time.time()                   # 00000
+        if not observers.risingsok:
+            astro, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
+            time00 += Time.time()-start00       # 00000
+            out[7], out[8], r2, s2, fs = rise_set(astro,y,latNS,with_seconds)
+        else:
+            sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
+            time00 += Time.time()-start00       # 00000
+            out[7], out[8], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
+
+        if abhd and out[7] == '--:--' and out[8] == '--:--':	# if neither begin nor end...
+            yn = midnightsun(d, hemisph)
+            out[7] = yn
+            out[8] = yn
+
+    eventcache.put(kind, lat, d, with_seconds, out[0:6] + out[7:])
     out[6] = time00     # append processing time to list
     return out
 
@@ -525,26 +633,22 @@ def getmoonstate(dt, lat, horizon, ts, earth, moon):
 
     time00 = 0                              # 00000
     i = 1 + config.lat.index(lat)   # index 0 is reserved to enable an explicit setting
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = '{:3.1f} {}'.format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
     #horizon = 0.8333        # degrees below horizon
 
+    # look up the next moonrise or moonset in the event table (if available)
+    mstate = multilat.moon_state(ctx['table'], t0, config.lat.index(lat))
+
     # search for the next moonrise or moonset (returned in moonrise[0] and y[0])
-    mstate = None
     while mstate == None:
         t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         dt += timedelta(days=1)
         t9 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         start00 = Time.time()               # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t0, t9, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t0, t9, horizon)[config.lat.index(lat)]
             time00 += Time.time()-start00   # 00000
             if len(moonrise) > 0:
                 mstate = False if y[0] else True
@@ -556,6 +660,15 @@ def getmoonstate(dt, lat, horizon, ts, earth, moon):
 
     return mstate, time00
 
+def moonHorizon(tNoon):
+    # getHorizon at noontime (the daily average distance) ... calculated once per day
+    key = tNoon.tt
+    horizons = ctx['horizons']
+    if key not in horizons:
+        if len(horizons) >= 16: horizons.clear()    # only a few consecutive dates are needed
+        horizons[key] = getHorizon(tNoon, ctx['earth'], ctx['moon'])
+    return horizons[key]
+
 def getHorizon(t, earth, moon):
     # calculate the angle of the moon below the horizon at moonrise/set
 
@@ -587,19 +700,13 @@ def seek_moonset(prday, t9, t9noon, t0, nxday, t1, t1noon, t2, i, lat, ts, earth
     time00 = 0                              # 00000
     config.moonHorizonSeeks += 1
     m_set_t = 0     # normal case: assume moonsets yesterday & tomorrow
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
 #    rise, sett, ris2, set2, fs = fetchMoonData(nxday, t1, t1noon, t2, i, latNS, True, with_seconds)
-    horizon = getHorizon(t1noon, earth, moon)
+    horizon = moonHorizon(t1noon)
     start00 = Time.time()                   # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t1, t2, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t1, t2, horizon)[config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS,True)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -612,10 +719,10 @@ def seek_moonset(prday, t9, t9noon, t0, nxday, t1, t1noon, t2, i, lat, ts, earth
     else:
         config.moonHorizonSeeks += 1
 #        rise, sett, ris2, set2, fs = fetchMoonData(prday, t9, t9noon, t0, i, latNS, True, with_seconds)
-        horizon = getHorizon(t9noon, earth, moon)
+        horizon = moonHorizon(t9noon)
         start00 = Time.time()               # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t9, t0, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t9, t0, horizon)[config.lat.index(lat)]
             time00 += Time.time()-start00   # 00000
             rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS,True)
         else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -637,19 +744,13 @@ def seek_moonrise(prday, t9, t9noon, t0, nxday, t1, t1noon, t2, i, lat, ts, eart
     time00 = 0                              # 00000
     config.moonHorizonSeeks += 1
     m_rise_t = 0    # normal case: assume moonrise yesterday & tomorrow
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
 #    rise, sett, ris2, set2, fs = fetchMoonData(nxday, t1, t1noon, t2, i, latNS, True)
-    horizon = getHorizon(t1noon, earth, moon)
+    horizon = moonHorizon(t1noon)
     start00 = Time.time()                   # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t1, t2, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t1, t2, horizon)[config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS,True)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -662,10 +763,10 @@ def seek_moonrise(prday, t9, t9noon, t0, nxday, t1, t1noon, t2, i, lat, ts, eart
     else:
         config.moonHorizonSeeks += 1
 #        rise, sett, ris2, set2, fs = fetchMoonData(prday, t9, t9noon, t0, i, latNS, True)
-        horizon = getHorizon(t9noon, earth, moon)
+        horizon = moonHorizon(t9noon)
         start00 = Time.time()               # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t9, t0, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t9, t0, horizon)[config.lat.index(lat)]
             time00 += Time.time()-start00   # 00000
             rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS,True)
         else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -711,7 +812,7 @@ def moonrise_no_set(date, lat, prday, t9, t9noon, t0, nxday, t1, t1noon, t2, i,
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
 # > > > > > > > DO NOT WRITE TO config.py  (It's a copy!) < < < < < <
 
-def mp_moonrise_set(d, lat, ts):    # used in eventtables.twilighttab
+def mp_moonrise_set(d, lat):        # used in eventtables.twilighttab
     # - - - TIMES ARE ROUNDED TO SECONDS - - -
     with_seconds = True
     # returns moonrise and moonset for the given date and latitude:
@@ -719,22 +820,20 @@ def mp_moonrise_set(d, lat, ts):    # used in eventtables.twilighttab
 
     time00 = 0.0    # 00000 - time spent in find_discrete() when at least one time was returned
     timeAB = 0.0    # time spent seeking if moon is above/below horizon
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    moon    = eph['moon']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    moon    = ctx['moon']
 
     out = [None, None, None]  # return [first_event, second_event, processing time]
+    cached = eventcache.get('moon', lat, d, True)
+    if cached is not None:
+        return [cached[0], cached[1], (time00, timeAB)]
+
     ev1 = ['--:--','--:--']	# first event
     ev2 = ['--:--','--:--']	# second event on same day (rare)
     i = 1 + config.lat.index(lat)   # index 0 is reserved to enable an explicit setting
 
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
 
@@ -760,11 +859,11 @@ def mp_moonrise_set(d, lat, ts):    # used in eventtables.twilighttab
 #-----------------------------------------------------------
     # Moonrise/Moonset on the selected day ...
 
-    horizon = getHorizon(t0noon, earth, moon)   # 0.8307988 on 16-08-2024
+    horizon = moonHorizon(t0noon)   # 0.8307988 on 16-08-2024
     #print("horizon =",horizon)
     start00 = Time.time()                   # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t0, t1, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t0, t1, horizon)[config.lat.index(lat)]
         time00 += Time.time()-start00       # 00000
         ev1[0], ev1[1], ev2[0], ev2[1], mstate = rise_set(moonrise,y,latNS,True)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -793,6 +892,7 @@ def mp_moonrise_set(d, lat, ts):    # used in eventtables.twilighttab
     out[1] = ev2        # [rise, set] for event 2 (rare)
     # append to list ...
     out[2] = (time00, timeAB)     # time spent (returning >= 1 event time) + (seeking if moon above/below horizon)
+    eventcache.put('moon', lat, d, True, [ev1, ev2, eventcache.state(mstate)])
     return out
 
 def f_moon(earth, moon, topos, degBelowHorizon):
@@ -34,14 +34,21 @@ from math import degrees, atan, tan, pi, copysign
 #import sys			# sys.exit() does not work here
 
 ###### Third party imports ######
-from skyfield.api import load
+from skyfield.api import load_file
 from skyfield.api import Topos, Star, wgs84, N, S, E, W     # Topos is deprecated in Skyfield v1.35!
-from skyfield import VERSION, almanac
+from skyfield import almanac
 from skyfield.nutationlib import iau2000b
 #from skyfield.data import hipparcos
 
 ###### Local application imports ######
 import config
+import eventcache
+import multilat
+import observers
+import precision
+import tablefmt
+import transits
+import starcat
 
 #----------------------
 #   initialization
@@ -51,19 +58,107 @@ hour_of_day = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18,
 next_hour_of_day = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24]
 degree_sign= u'\N{DEGREE SIGN}'
 
+#----------------------------
+#   worker-resident context
+#----------------------------
+
+# The ephemeris is loaded ONCE per process (in the pool initializer) and the
+# timescale is received ONCE from the parent process. Every task takes them
+# from here, so a task only carries dates and latitudes.
+
+ctx = {}    # ts, ephemeris, bodies and the observer registry (see observers.py)
+
+def init_context(ts, ephndx, ephfile):   # used in nautical.pages & nautical.init_worker
+    config.ephndx = ephndx      # a spawned process starts with the default config
+    config.ephfile = ephfile    # the kernel or its excerpt loaded by init_sf (see ephexcerpt.py)
+    if ctx.get('ephfile') != ephfile:
+        eph = load_file(ephfile)    # read-only: the file was downloaded and validated by the parent process
+        ctx.clear()
+        ctx['ephfile'] = ephfile
+        ctx['earth']   = eph['earth']
+        ctx['sun']     = eph['sun']
+        ctx['moon']    = eph['moon']
+        ctx['venus']   = eph['venus']
+        ctx['jupiter'] = eph['jupiter barycenter']
+        ctx['saturn']  = eph['saturn barycenter']
+        if ephndx >= 3:
+            ctx['mars'] = eph['mars barycenter']
+        else:
+            ctx['mars'] = eph['mars']
+        ctx['observers'] = observers.build(ctx['earth'])
+        ctx['events'] = {}
+        ctx['horizons'] = {}
+    ctx['table'] = {}
+    ctx['ts'] = ts
+
+def lat_observer(lat):
+    # topos, observer and label at latitude 'lat' (longitude 0) from the observer registry
+    return observers.lookup(ctx['observers'], ctx['earth'], lat)
+
+# Sun and Moon events of all latitudes are calculated together (see multilat.py)
+# when the first latitude is requested; the other latitudes are looked up.
+
+def sweep_events(first_day, days, sec):    # used in nautical.pages
+    # calculate the events of all days from first_day-1 to first_day+days+1 at
+    # once (days begin 'sec' seconds before midnight as in the tables)
+    ctx['table'] = {}
+    ctx.pop('deferred', None)
+    if not config.sweepEV: return
+    if eventcache.active():     # ... when the first event is not found in the event cache
+        ctx['deferred'] = (first_day, days, sec)
+        return
+    event_sweep(first_day, days, sec)
+
+def sweep_pages(dates):      # used in nautical.pages
+    # before the page workers are forked: run a deferred sweep unless every
+    # page (its first latitude) is in the event cache, as otherwise each
+    # worker process would repeat it
+    if 'deferred' not in ctx: return
+    if all(eventcache.get('moon3days', config.lat[0], d, False) is not None and
+           eventcache.get('twilight', config.lat[0], d + timedelta(days=1), False) is not None for d in dates): return
+    event_sweep(*ctx.pop('deferred'))
+
+def event_sweep(first_day, days, sec):
+    ts = ctx['ts']
+    t0 = []
+    t1 = []
+    horizons = []
+    for n in range(-1, days + 2):
+        dt = datetime(first_day.year, first_day.month, first_day.day, 0, 0, 0)
+        dt += timedelta(days=n, seconds=-sec)
+        t0.append(ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second))
+        t1.append(ts.ut1(dt.year, dt.month, dt.day+1, dt.hour, dt.minute, dt.second))
+        horizons.append(getHorizon(ts.ut1(dt.year, dt.month, dt.day, dt.hour+12, dt.minute, dt.second), ctx['earth'], ctx['moon']))
+    ctx['table'] = multilat.event_table(ts, ctx['earth'], ctx['sun'], ctx['moon'], config.lat, t0, t1, multilat.twilight_horizons(), horizons)
+
+def sun_day(t0, t1):
+    # sunrise/sunset, civil and nautical twilight at all latitudes between t0 and t1
+    if 'deferred' in ctx: event_sweep(*ctx.pop('deferred'))
+    key = (t0.tt, t1.tt)
+    if key in ctx['table']: return ctx['table'][key]
+    key = ('sun', t0.tt, t1.tt)
+    events = ctx['events']
+    if key not in events:
+        if len(events) >= 12: events.clear()    # only a few consecutive dates are needed
+        events[key] = multilat.sun_events(ctx['ts'], ctx['earth'], ctx['sun'], config.lat, t0, t1, multilat.twilight_horizons())
+    return events[key]
+
+def moon_day(t0, t1, horizon):
+    # moonrise/moonset events at all latitudes between t0 and t1
+    if 'deferred' in ctx: event_sweep(*ctx.pop('deferred'))
+    key = (t0.tt, t1.tt, horizon)
+    if key in ctx['table']: return ctx['table'][key]
+    key = ('moon', t0.tt, t1.tt, horizon)
+    events = ctx['events']
+    if key not in events:
+        if len(events) >= 12: events.clear()    # only a few consecutive dates are needed
+        events[key] = multilat.moon_events(ctx['ts'], ctx['earth'], ctx['moon'], config.lat, t0, t1, horizon)
+    return events[key]
+
 #----------------------
 #   internal methods
 #----------------------
 
-def SkyfieldVersion(version2):      # compare Skyfield version to version2
-    versions2 = [int(v) for v in version2.split(".")]
-    for i in range(max(len(VERSION),len(versions2))):
-        v1 = VERSION[i]   if i < len(VERSION)   else 0
-        v2 = versions2[i] if i < len(versions2) else 0
-        if   v1 > v2: return 1
-        elif v1 < v2: return -1
-    return 0
-
 def GHAcolong(gha):
     # return the colongitude, e.g. 270° returns 90°
     coGHA = gha + 180
@@ -161,6 +256,8 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
     ndxR = 0 if len(rise) > 0 else 10
     ndxS = 0 if len(sett) > 0 else 10
     pickRISE = None         # no idea if RISE or SET comes first and is valid
+    Rall = tablefmt.times(rise, with_seconds)   # the text of all event times (see tablefmt.py)
+    Sall = tablefmt.times(sett, with_seconds)
     
     prev_dt = datetime.min.replace(tzinfo=timezone.utc)     # closest to datetime zero
     r = s = 0
@@ -185,7 +282,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = rise[ndxR]
                 valid = yR[ndxR]
                 if valid:
-                    Rtxt[r] = time2text(t, with_seconds)
+                    Rtxt[r] = Rall[ndxR]
                     r += 1; finalstate = True
                 ndxR += 1
             pickRISE = not pickRISE     # flip RISE to SET & vice-versa
@@ -194,7 +291,7 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
                 t = sett[ndxS]
                 valid = yS[ndxS]
                 if valid:
-                    Stxt[s] = time2text(t, with_seconds)
+                    Stxt[s] = Sall[ndxS]
                     s += 1; finalstate = False
                 ndxS += 1
             pickRISE = not pickRISE     # flip RISE to SET & vice-versa
@@ -209,18 +306,19 @@ def fmt_rise_set(rise, sett, yR, yS, txt, with_seconds=False):
 def fmt_transits(t, lats, with_seconds = False):
     # analyse the return values from the 'find_transits' method...
     # get planet transit times (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     transit1 = '--:--'
     transit2 = '--:--'
     if len(t) == 1:         # this happens most often
         t0 = t[0]
         # get the UT1 time rounded to minutes OR seconds ...
-        transit1 = time2text(t0, with_seconds)
+        transit1 = tt[0]
     else:
         if len(t) == 2:		# this happens very rarely
             t0 = t[0]; t1 = t[1]
             # get the UT1 time rounded to minutes OR seconds ...
-            transit1 = time2text(t0, with_seconds)
-            transit2 = time2text(t1, with_seconds)
+            transit1 = tt[0]
+            transit2 = tt[1]
         elif len(t) > 2:
             # this should never get here!
             rise_set_error(0,lats,t[0])
@@ -230,6 +328,7 @@ def fmt_transits(t, lats, with_seconds = False):
 def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 simplification)
     # analyse the return values from the 'find_discrete' method...
     # get sun/moon rise/set values (if any) rounded to nearest minute
+    tt = tablefmt.times(t, with_seconds)   # the text of all event times (see tablefmt.py)
     rise = '--:--'
     sett = '--:--'
     ris2 = '--:--'
@@ -246,14 +345,14 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
         # t1 = ts.ut1(dt1.year, dt1.month, dt1.day, dt1.hour, dt1.minute, sec1)
         if y[0] and not(y[1]):
             # get the UT1 time rounded to minutes OR seconds ...
-            rise = time2text(t0, with_seconds)
-            sett = time2text(t1, with_seconds)
+            rise = tt[0]
+            sett = tt[1]
             finalstate = False
         else:
             if not(y[0]) and y[1]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
-                rise = time2text(t1, with_seconds)
+                sett = tt[0]
+                rise = tt[1]
                 finalstate = True
             else:
                 # this should never get here!
@@ -266,11 +365,11 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
             # t0 = ts.ut1(dt0.year, dt0.month, dt0.day, dt0.hour, dt0.minute, sec0)
             if y[0]:
                 # get the UT1 time rounded to minutes OR seconds ...
-                rise = time2text(t0, with_seconds)
+                rise = tt[0]
                 finalstate = True
             else:
                 # get the UT1 time rounded to minutes OR seconds ...
-                sett = time2text(t0, with_seconds)
+                sett = tt[0]
                 finalstate = False
         else:
             if len(t) == 3:		# this happens rarely (in high latitudes mid-year)
@@ -286,16 +385,16 @@ def rise_set(t, y, lats, with_seconds = False):     # 'ts' removed (Aug 2024 sim
                 # t2 = ts.ut1(dt2.year, dt2.month, dt2.day, dt2.hour, dt2.minute, sec2)
                 if y[0] and not(y[1]) and y[2]:
                     # get the UT1 time rounded to minutes OR seconds ...
-                    rise = time2text(t0, with_seconds)
-                    sett = time2text(t1, with_seconds)
-                    ris2 = time2text(t2, with_seconds)
+                    rise = tt[0]
+                    sett = tt[1]
+                    ris2 = tt[2]
                     finalstate = True
                 else:
                     if not(y[0]) and y[1] and not(y[2]):
                         # get the UT1 time rounded to minutes OR seconds ...
-                        sett = time2text(t0, with_seconds)
-                        rise = time2text(t1, with_seconds)
-                        set2 = time2text(t2, with_seconds)
+                        sett = tt[0]
+                        rise = tt[1]
+                        set2 = tt[2]
                         finalstate = False
                     else:
                         # this should never get here!
@@ -332,79 +431,56 @@ def rise_set_error(y, lats, t0):
 #-------------------------------------------------------
 
 def mp_ariesGHA(d, ts):                         # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
 
-    ghas = ['' for x in range(24)]
-    for i in range(24):
-        ghas[i] = fmtgha(t[i].gast, 0)
-    return ghas
+    return tablefmt.gha(t.gast, 0)      # the column is formatted at once
 
 def mp_venusGHA(d, ts, earth, venus):           # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
     position = earth.at(t).observe(venus)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+    ra = precision.apparent(position).radec(epoch='date')[0]
+    dec = precision.apparent(position).radec(epoch='date')[1]
+
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(t.gast, ra.hours)
+    decs = tablefmt.degrees(dec.degrees, 2)
+    degs = list(dec.degrees)
     return ghas, decs, degs
 
 def mp_marsGHA(d, ts, earth, mars):             # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
     position = earth.at(t).observe(mars)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+    ra = precision.apparent(position).radec(epoch='date')[0]
+    dec = precision.apparent(position).radec(epoch='date')[1]
+
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(t.gast, ra.hours)
+    decs = tablefmt.degrees(dec.degrees, 2)
+    degs = list(dec.degrees)
     return ghas, decs, degs
 
 def mp_jupiterGHA(d, ts, earth, jupiter):       # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
     position = earth.at(t).observe(jupiter)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+    ra = precision.apparent(position).radec(epoch='date')[0]
+    dec = precision.apparent(position).radec(epoch='date')[1]
+
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(t.gast, ra.hours)
+    decs = tablefmt.degrees(dec.degrees, 2)
+    degs = list(dec.degrees)
     return ghas, decs, degs
 
 def mp_saturnGHA(d, ts, earth, saturn):         # used in nautical.planetstab(m)
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0))
     position = earth.at(t).observe(saturn)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
-    #for i in range(len(dec.degrees)):
-    #    print(i, ghas[i])
+    ra = precision.apparent(position).radec(epoch='date')[0]
+    dec = precision.apparent(position).radec(epoch='date')[1]
+
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(t.gast, ra.hours)
+    decs = tablefmt.degrees(dec.degrees, 2)
+    degs = list(dec.degrees)
     return ghas, decs, degs
 
 #---------------------------------------
@@ -412,19 +488,15 @@ def mp_saturnGHA(d, ts, earth, saturn):         # used in nautical.planetstab(m)
 #---------------------------------------
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_planetGHA(d, ts, obj):                   # used in nautical.planetstab
+def mp_planetGHA(d, obj):                       # used in nautical.planetstab
 
     out = [None, None, None]  # return [planet_sha, planet_transit] + processing time
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    if obj == 'venus':   venus   = eph['venus']
-    if obj == 'jupiter': jupiter = eph['jupiter barycenter']
-    if obj == 'saturn':  saturn  = eph['saturn barycenter']
-    if obj == 'mars':
-        if config.ephndx >= 3:
-            mars = eph['mars barycenter']
-        else:
-            mars = eph['mars']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    venus   = ctx['venus']
+    mars    = ctx['mars']
+    jupiter = ctx['jupiter']
+    saturn  = ctx['saturn']
 
     # calculate planet GHA
     DEC = None
@@ -442,46 +514,38 @@ def mp_planetGHA(d, ts, obj):                   # used in nautical.planetstab
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
 # used in nautical.starstab & eventtables.mp_planets_worker
-def mp_planetstransit(d, ts, obj, with_seconds = False):
+def mp_planetstransit(d, obj, with_seconds = False):
     # returns SHA and Meridian Passage for the navigational planets
 
     out = [None, None, None]  # return [planet_sha, planet_transit] + processing time
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    if obj == 'venus':   planet = eph['venus']
-    if obj == 'jupiter': planet = eph['jupiter barycenter']
-    if obj == 'saturn':  planet = eph['saturn barycenter']
-    if obj == 'mars':
-        if config.ephndx >= 3:
-            planet = eph['mars barycenter']
-        else:
-            planet = eph['mars']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    planet  = ctx[obj]
     lattxt = u'{} 0{} E transit'.format(obj, degree_sign)
-    if SkyfieldVersion("1.35") >= 0:
-        lats = 0.0     # default latitude (any will do)
-        topos = wgs84.latlon(lats, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    lats = 0.0     # default latitude (any will do)
+    topos, observer, latNS = lat_observer(lats)
 
     # calculate planet SHA
-    tfr = ts.ut1(d.year, d.month, d.day, 0, 0, 0)       # search from
+    tfr = precision.fast(ts.ut1(d.year, d.month, d.day, 0, 0, 0))       # search from
     position = earth.at(tfr).observe(planet)
-    ra = position.apparent().radec(epoch='date')[0]     # RA
+    ra = precision.apparent(position).radec(epoch='date')[0]     # RA
     out[0] = fmtgha(0, ra.hours)    # planet_sha
     
     # calculate planet transit
     d1 = d + timedelta(days=1)
     tto = ts.ut1(d1.year, d1.month, d1.day, 0, 0, 0)    # search to
     start00 = time()                        # 00000
-    if SkyfieldVersion("1.47") < 0:
+    if not observers.transitsok:
         transit_time, y = almanac.find_discrete(tfr, tto, planet_transit(earth, planet))
         time00 = time()-start00             # 00000
         out[1] = rise_set(transit_time,y,lattxt,with_seconds = False)[0]  # planet_transit
     else:
-        transit_time = almanac.find_transits(observer, planet, tfr, tto)
+        out[1] = eventcache.get(obj + 'transit', 0.0, d, with_seconds)
+        if out[1] is None:
+            transit_time = transits.planet_transits(ts, earth, planet, [tfr.tt], [tto.tt])[0]   # as almanac.find_transits
+            out[1] = fmt_transits(transit_time,lattxt,with_seconds)[0]  # planet_transit
+            eventcache.put(obj + 'transit', 0.0, d, with_seconds, out[1])
         time00 = time()-start00             # 00000
-        out[1] = fmt_transits(transit_time,lattxt,with_seconds)[0]  # planet_transit
 
     out[2] = time00     # append processing time to list
     return out
@@ -503,15 +567,12 @@ def planet_transit(earth, planet_name):
     is_planet_transit_at.rough_period = 0.1  # search increment hint
     return is_planet_transit_at
 
-def hor_parallax(d, ts):      # used in nautical.starstab
+def hor_parallax(d):          # used in nautical.starstab
 
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth = eph['earth']
-    venus = eph['venus']
-    if config.ephndx >= 3:
-        mars = eph['mars barycenter']
-    else:
-        mars = eph['mars']
+    ts    = ctx['ts']
+    earth = ctx['earth']
+    venus = ctx['venus']
+    mars  = ctx['mars']
 
 # Venus
     t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
@@ -530,69 +591,47 @@ def hor_parallax(d, ts):      # used in nautical.starstab
 #   Sun and Moon calculations
 #-------------------------------
 
-def mp_sunGHA(d, ts, earth, sun):              # used in nautical.sunmoontab(m)
+def mp_sunGHA(gast, ra, dec):      # used in nautical.sunmoontab(m)
     # compute sun's GHA and DEC per hour of day
 
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(sun)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    ghas = ['' for x in range(24)]
-    decs = ['' for x in range(24)]
-    degs = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        ghas[i] = fmtgha(t[i].gast, ra.hours[i])
-        decs[i] = fmtdeg(dec.degrees[i],2)
-        degs[i] = dec.degrees[i]
+    # each column is formatted at once (see tablefmt.py)
+    ghas = tablefmt.gha(gast[0:24], ra[0:24])
+    decs = tablefmt.degrees(dec[0:24], 2)
+    degs = list(dec[0:24])
 
     # degs has been added for the suntab function
     return ghas,decs,degs
 
-# used in nautical.sunmoontab(m) & eventtables.equationtab
-def mp_moonGHA(d, ts, earth, moon, with_seconds = False):
+def mp_moonGHA(d, ts, gast, ra, dec, dist_km, earth, moon, with_seconds = False):  # used in nautical.sunmoontab(m)
     # compute moon's GHA, DEC and HP per hour of day
-    t = ts.ut1(d.year, d.month, d.day, hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-    distance = position.apparent().radec(epoch='date')[2]
-
     if with_seconds:
         # also compute moon's GHA at End of Day (23:59:59.5) and Start of Day (24 hours earlier)
-        tSoD = ts.ut1(d.year, d.month, d.day-1, 23, 59, 59.5)
-        tEoD = ts.ut1(d.year, d.month, d.day, 23, 59, 59.5)
+        tSoD_EoD = precision.fast(ts.ut1(d.year, d.month, [d.day-1, d.day], 23, 59, 59.5))
     else:   # round to minutes of time
         # also compute moon's GHA at End of Day (23:59:30) and Start of Day (24 hours earlier)
-        tSoD = ts.ut1(d.year, d.month, d.day-1, 23, 59, 30)
-        tEoD = ts.ut1(d.year, d.month, d.day, 23, 59, 30)
+        tSoD_EoD = precision.fast(ts.ut1(d.year, d.month, [d.day-1, d.day], 23, 59, 30))
 
-    posSoD = earth.at(tSoD).observe(moon)
-    raSoD = posSoD.apparent().radec(epoch='date')[0]
-    ghaSoD = gha2deg(tSoD.gast, raSoD.hours)   # GHA as float
-    posEoD = earth.at(tEoD).observe(moon)
-    raEoD = posEoD.apparent().radec(epoch='date')[0]
-    ghaEoD = gha2deg(tEoD.gast, raEoD.hours)   # GHA as float
+    # both epochs are observed at once
+    pos = earth.at(tSoD_EoD).observe(moon)
+    raSoD_EoD = precision.apparent(pos).radec(epoch='date')[0]
+    ghaSoD = gha2deg(tSoD_EoD.gast[0], raSoD_EoD.hours[0])   # GHA as float
+    ghaEoD = gha2deg(tSoD_EoD.gast[1], raSoD_EoD.hours[1])   # GHA as float
 
     GHAupper = [-1.0 for x in range(24)]
     GHAlower = [-1.0 for x in range(24)]
-    gham = ['' for x in range(24)]
-    decm = ['' for x in range(24)]
-    degm = ['' for x in range(24)]
-    HPm  = ['' for x in range(24)]
-
-    for i in range(len(dec.degrees)):
-##        raIDL = ra.hours[i] + 12	# at International Date Line
-##        if raIDL > 24: raIDL = raIDL - 24
-        GHAupper[i] = gha2deg(t[i].gast, ra.hours[i])   # GHA as float
+    HP = [0.0 for x in range(24)]
+
+    for i in range(24):
+        GHAupper[i] = gha2deg(gast[i], ra[i])   # GHA as float
         GHAlower[i] = GHAcolong(GHAupper[i])
-        gham[i] = fmtgha(t[i].gast, ra.hours[i])
-        decm[i] = fmtdeg(dec.degrees[i],2)
-        degm[i] = dec.degrees[i]
-        dist_km = distance.km[i]
-# OLD:  HP = degrees(atan(6378.0/dist_km))	# radius of earth = 6378.0 km
-        HP = degrees(atan(6371.0/dist_km))	# volumetric mean radius of earth = 6371.0 km
-        HPm[i] = "{:0.1f}'".format(HP * 60)     # convert to minutes of arc
+# OLD:  HP = degrees(atan(6378.0/dist_km[i]))	# radius of earth = 6378.0 km
+        HP[i] = degrees(atan(6371.0/dist_km[i])) * 60   # volumetric mean radius of earth = 6371.0 km (in minutes of arc)
+
+    # each column is formatted at once (see tablefmt.py)
+    gham = tablefmt.gha(gast[0:24], ra[0:24])
+    decm = tablefmt.degrees(dec[0:24], 2)
+    degm = list(dec[0:24])
+    HPm  = tablefmt.minutes(HP)
 
     # degm has been added for the sunmoontab function
     # GHAupper is an array of GHA per hour as float
@@ -600,63 +639,64 @@ def mp_moonGHA(d, ts, earth, moon, with_seconds = False):
 
     return gham, decm, degm, HPm, GHAupper, GHAlower, ghaSoD, ghaEoD
 
-def mp_moonVD(d00, d, d_valNA, ts, earth, moon):           # used in nautical.sunmoontab(m)
+def mp_moonVD(gast, ra, dec, d_valNA):     # used in nautical.sunmoontab(m)
 # OLD:  # first value required is from 23:30 on the previous day...
 # OLD:  t0 = ts.ut1(d00.year, d00.month, d00.day, 23, 30, 0)
     # first value required is from 00:00 on the current day...
-    t0 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)
-    pos0 = earth.at(t0).observe(moon)
-    ra0 = pos0.apparent().radec(epoch='date')[0]
-    dec0 = pos0.apparent().radec(epoch='date')[1]
-    V0 = gha2deg(t0.gast, ra0.hours)
-    D0 = dec0.degrees * 60.0    # convert to minutes of arc
+    # ...then 24 values at hourly intervals from 01:00 onwards
+    # (taken from the hourly values already computed for mp_moonGHA)
+    V0 = gha2deg(gast[0], ra[0])
+    D0 = dec[0] * 60.0    # convert to minutes of arc
     if d_valNA:
         D0 = round(D0, 1)
 
-# OLD:  # ...then 24 values at hourly intervals from 23:30 onwards
-# OLD:  t = ts.ut1(d.year, d.month, d.day, hour_of_day, 30, 0)
-    # ...then 24 values at hourly intervals from 00:00 onwards
-    t = ts.ut1(d.year, d.month, d.day, next_hour_of_day, 0, 0)
-    position = earth.at(t).observe(moon)
-    ra = position.apparent().radec(epoch='date')[0]
-    dec = position.apparent().radec(epoch='date')[1]
-
-    moonVm = ['' for x in range(24)]
-    moonDm = ['' for x in range(24)]
-    for i in range(len(dec.degrees)):
-        V1 = gha2deg(t[i].gast, ra.hours[i])
+    Vdm = [0.0 for x in range(24)]
+    Dvalue = [0.0 for x in range(24)]
+    for i in range(24):
+        V1 = gha2deg(gast[i+1], ra[i+1])
         Vdelta = V1 - V0
         if Vdelta < 0:
             Vdelta += 360
-        Vdm = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
-        moonVm[i] = "{:0.1f}'".format(Vdm)
-        D1 = dec.degrees[i] * 60.0  # convert to minutes of arc
+        Vdm[i] = (Vdelta-(14.0+(19.0/60.0))) * 60	# subtract 14:19:00
+        D1 = dec[i+1] * 60.0  # convert to minutes of arc
         if d_valNA:
             D1 = round(D1, 1)
-            Dvalue = abs(D1 - D0)
+            Dvalue[i] = abs(D1 - D0)
         elif copysign(1.0,D1) == copysign(1.0,D0):
-            Dvalue = abs(D1) - abs(D0)
+            Dvalue[i] = abs(D1) - abs(D0)
         else:
-            Dvalue = -abs(D1 - D0)
-        moonDm[i] = "{:0.1f}'".format(Dvalue)
+            Dvalue[i] = -abs(D1 - D0)
         V0 = V1		# store current value as next previous value
         D0 = D1		# store current value as next previous value
+    moonVm = tablefmt.minutes(Vdm)      # each column is formatted at once
+    moonDm = tablefmt.minutes(Dvalue)
     return moonVm, moonDm
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_sunmoon(date, d_valNA, ts, n):
+def mp_sunmoon(date, d_valNA, n):
     # !! WE *MUST* PASS config.d_valNA AS ITS VALUE CAN BE CHANGED PROGRAMMATICALLY !!
 
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    sun     = eph['sun']
-    moon    = eph['moon']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    sun     = ctx['sun']
+    moon    = ctx['moon']
 
     d = date + timedelta(days=n)
-    d0 = d - timedelta(days=1)
-    ghas, decs, degs = mp_sunGHA(d, ts, earth, sun)
-    gham, decm, degm, HPm, GHAupper, GHAlower, ghaSoD, ghaEoD = mp_moonGHA(d, ts, earth, moon)
-    vmin, dmin = mp_moonVD(d0,d,d_valNA,ts,earth,moon)
+    # the hourly epochs 00:00 to 24:00 (the last for the v/d values) are...
+    # ...converted once and shared by the sun and moon calculations
+    # (or with config.precision = 'preview' interpolated from fewer epochs)
+    hours = precision.sample_hours(hour_of_day + [24])
+    t = precision.fast(ts.ut1(d.year, d.month, d.day, hours, 0, 0))
+    observer = earth.at(t)
+    sra, sdec, _ = precision.apparent(observer.observe(sun)).radec(epoch='date')
+    mra, mdec, mdist = precision.apparent(observer.observe(moon)).radec(epoch='date')
+    gast = precision.hourly(t.gast, hours, 25, 24)
+    sra, sdec = precision.hourly(sra.hours, hours, 25, 24), precision.hourly(sdec.degrees, hours, 25)
+    mra, mdec, mdist = precision.hourly(mra.hours, hours, 25, 24), precision.hourly(mdec.degrees, hours, 25), precision.hourly(mdist.km, hours, 25)
+
+    ghas, decs, degs = mp_sunGHA(gast, sra, sdec)
+    gham, decm, degm, HPm, GHAupper, GHAlower, ghaSoD, ghaEoD = mp_moonGHA(d, ts, gast, mra, mdec, mdist, earth, moon)
+    vmin, dmin = mp_moonVD(gast, mra, mdec, d_valNA)
 
     #buildUPlists(n, ghaSoD, GHAupper, ghaEoD)
     #buildLOWlists(n, ghaSoD, GHAupper, ghaEoD)
@@ -669,18 +709,15 @@ def mp_sunmoon(date, d_valNA, ts, n):
 #-----------------------
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_stellar_info(d, ts, df, n):        # used in nautical.starstab
+def mp_stellar_info(d, navstars, n):      # used in nautical.starstab
     # returns a list of lists with name, SHA and Dec all navigational stars for epoch of date.
+    # navstars = compact catalog of the navigational stars (see starcat.py); the
+    # 118,218 row Hipparcos dataframe is never sent to a worker process.
 
-    # load the Hipparcos catalog as a 118,218 row Pandas dataframe.
-    #with load.open(hipparcos.URL) as f:
-        #hipparcos_epoch = ts.tt(1991.25)
-    #    df = hipparcos.load_dataframe(f)
-
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
 
-    t00 = ts.ut1(d.year, d.month, d.day, 0, 0, 0)   #calculate at midnight
+    t00 = precision.fast(ts.ut1(d.year, d.month, d.day, 0, 0, 0))   #calculate at midnight
     #t12 = ts.ut1(d.year, d.month, d.day, 12, 0, 0)  #calculate at noon
     out = []
 
@@ -691,18 +728,13 @@ def mp_stellar_info(d, ts, df, n):        # used in nautical.starstab
     elif n == 4: db = db5
     else: db = db6
 
-    for line in db.strip().split('\n'):
-        x1 = line.index(',')
-        name = line[0:x1]
-        HIPnum = line[x1+1:]
-
-        star = Star.from_dataframe(df.loc[int(HIPnum)])
-        astrometric = earth.at(t00).observe(star).apparent()
-        ra, dec, distance = astrometric.radec(epoch='date')
-
-        sha  = fmtgha(0, ra.hours)
-        decl = fmtdeg(dec.degrees)
+    names = [line.rsplit(',', 1)[0] for line in db.strip().split('\n')]
+    hips  = [int(line.rsplit(',', 1)[1]) for line in db.strip().split('\n')]
+    cat = navstars[[list(navstars['hip']).index(hip) for hip in hips]]
 
+    # all stars of this group are observed at once
+    ra, dec = starcat.apparent_radec(cat, earth.at(t00))
+    for name, sha, decl in zip(names, tablefmt.gha(0, ra), tablefmt.degrees(dec)):
         out.append([name,sha,decl])
     return out
 
@@ -784,25 +816,23 @@ Markab,113963
 #------------------------
 
 # > > > > > > > > > > MULTIPROCESSING ENTRY POINT < < < < < < < < < <
-def mp_twilight(d, lat, ts, with_seconds = False):     # used in nautical.twilighttab (section 1)
+def mp_twilight(d, lat, with_seconds = False):     # used in nautical.twilighttab (section 1)
     # Returns for given date and latitude(in full degrees):
     # naut. and civil twilight (before sunrise), sunrise, meridian passage, sunset, civil and nautical twilight (after sunset).
     # NOTE: 'twilight' is only called for every third day in the Nautical Almanac...
     #       ...therefore daily tracking of the sun state is not possible.
 
     time00 = 0.0                            # 00000
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    sun     = eph['sun']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    sun     = ctx['sun']
+
+    cached = eventcache.get('twilight', lat, d, with_seconds)
+    if cached is not None: return cached + [time00]
 
     out = [None,None,None,None,None,None,None]  # 6 data items + processing time
     hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
 
@@ -818,13 +848,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):     # used in nautical.twilig
     # Sunrise/Sunset...
     start00 = time()                        # 00000
     horizon = 0.8333        # degrees below horizon
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         actual, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += time()-start00            # 00000
         out[2], out[3], r2, s2, fs = rise_set(actual,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += time()-start00            # 00000
         out[2], out[3], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -837,13 +866,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):     # used in nautical.twilig
     # Civil Twilight...
     horizon = 6.0           # degrees below horizon
     start00 = time()                        # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         civil, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += time()-start00            # 00000
         out[1], out[4], r2, s2, fs = rise_set(civil,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += time()-start00            # 00000
         out[1], out[4], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -855,13 +883,12 @@ def mp_twilight(d, lat, ts, with_seconds = False):     # used in nautical.twilig
     # Nautical Twilight...
     horizon = 12.0          # degrees below horizon
     start00 = time()                        # 00000
-    if SkyfieldVersion("1.48") < 0:
+    if not observers.risingsok:
         naut, y = almanac.find_discrete(t0, t1, f_sun(earth, sun, topos, horizon))
         time00 += time()-start00            # 00000
         out[0], out[5], r2, s2, fs = rise_set(naut,y,latNS,with_seconds)
     else:
-        sunrise, yR = almanac.find_risings(observer, sun, t0, t1, -horizon)
-        sunset,  yS = almanac.find_settings(observer, sun, t0, t1, -horizon)
+        sunrise, yR, sunset, yS = sun_day(t0, t1)[horizon][config.lat.index(lat)]
         time00 += time()-start00            # 00000
         out[0], out[5], r2, s2, fs = fmt_rise_set(sunrise,sunset,yR,yS,latNS,with_seconds)
 
@@ -870,6 +897,7 @@ def mp_twilight(d, lat, ts, with_seconds = False):     # used in nautical.twilig
         out[0] = yn
         out[5] = yn
 
+    eventcache.put('twilight', lat, d, with_seconds, out[0:6])
     out[6] = time00     # append processing time to list
     return out
 
@@ -916,27 +944,23 @@ def getmoonstate(dt, lat, horizon, ts, earth, moon):
 
     time00 = 0.0                            # 00000
     Hseeks = 0
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = '{:3.1f} {}'.format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
     #horizon = 0.8333
 
+    # look up the next moonrise or moonset in the event table (if available)
+    mstate = multilat.moon_state(ctx['table'], t0, config.lat.index(lat))
+
     # search for the next moonrise or moonset (returned in moonrise[0] and y[0])
-    mstate = None
     while mstate == None:
         Hseeks += 1
         t0 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         dt += timedelta(days=1)
         t9 = ts.ut1(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
         start00 = time()                    # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t0, t9, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t0, t9, horizon)[config.lat.index(lat)]
             time00 += time()-start00        # 00000
             if len(moonrise) > 0:
                 mstate = False if y[0] else True
@@ -948,6 +972,15 @@ def getmoonstate(dt, lat, horizon, ts, earth, moon):
 
     return mstate, time00, Hseeks
 
+def moonHorizon(tNoon):
+    # getHorizon at noontime (the daily average distance) ... calculated once per day
+    key = tNoon.tt
+    horizons = ctx['horizons']
+    if key not in horizons:
+        if len(horizons) >= 16: horizons.clear()    # only a few consecutive dates are needed
+        horizons[key] = getHorizon(tNoon, ctx['earth'], ctx['moon'])
+    return horizons[key]
+
 def getHorizon(t, earth, moon):
     # calculate the angle of the moon below the horizon at moonrise/set
 
@@ -979,18 +1012,12 @@ def seek_moonset(t9, t9noon, t0, t1, t1noon, t2, lat, ts, earth, moon):
     time00 = 0.0                            # 00000
     Hseeks = 1
     m_set_t = 0     # normal case: assume moonsets yesterday & tomorrow
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
-    horizon = getHorizon(t1noon, earth, moon)
+    horizon = moonHorizon(t1noon)
     start00 = time()                        # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t1, t2, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t1, t2, horizon)[config.lat.index(lat)]
         time00 += time()-start00            # 00000
         rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1002,10 +1029,10 @@ def seek_moonset(t9, t9noon, t0, t1, t1noon, t2, lat, ts, earth, moon):
         m_set_t = +1    # if no moonset detected - it is after tomorrow
     else:
         Hseeks += 1
-        horizon = getHorizon(t9noon, earth, moon)
+        horizon = moonHorizon(t9noon)
         start00 = time()                    # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t9, t0, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t9, t0, horizon)[config.lat.index(lat)]
             time00 += time()-start00        # 00000
             rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS)
         else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1028,18 +1055,12 @@ def seek_moonrise(t9, t9noon, t0, t1, t1noon, t2, lat, ts, earth, moon):
     time00 = 0.0                        # 00000
     Hseeks = 1
     m_rise_t = 0    # normal case: assume moonrise yesterday & tomorrow
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
-    horizon = getHorizon(t1noon, earth, moon)
+    horizon = moonHorizon(t1noon)
     start00 = time()                        # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t1, t2, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t1, t2, horizon)[config.lat.index(lat)]
         time00 += time()-start00            # 00000
         rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1051,10 +1072,10 @@ def seek_moonrise(t9, t9noon, t0, t1, t1noon, t2, lat, ts, earth, moon):
         m_rise_t = +1    # if no moonrise detected - it is after tomorrow
     else:
         Hseeks += 1
-        horizon = getHorizon(t9noon, earth, moon)
+        horizon = moonHorizon(t9noon)
         start00 = time()                    # 00000
-        if True or SkyfieldVersion("1.48") < 0:
-            moonrise, y = almanac.find_discrete(t9, t0, f_moon(earth, moon, topos, horizon))
+        if True or not observers.risingsok:
+            moonrise, y = moon_day(t9, t0, horizon)[config.lat.index(lat)]
             time00 += time()-start00        # 00000
             rise, sett, ris2, set2, fs = rise_set(moonrise,y,latNS)
         else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1101,7 +1122,7 @@ def moonrise_no_set(date, lat, t9, t9noon, t0, t1, t1noon, t2, ts, earth, moon):
 # > > > > > > > DO NOT WRITE TO config.py  (It's a copy!) < < < < < <
 # > > > DO NOT READ FROM config.py IF IT's BEEN MODIFIED PROGRAMMATICALLY < < <
 
-def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (section 2)
+def mp_moonrise_set(d, lat, mstate0):       # used in nautical.twilighttab (section 2)
     # - - - TIMES ARE ROUNDED TO MINUTES - - -
     # returns moonrise and moonset for the given dates and latitude:
     # rise day 1, rise day 2, rise day 3, set day 1, set day 2, set day 3
@@ -1110,22 +1131,21 @@ def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (sect
     timeAB = 0.0    # time spent seeking if moon is above/below horizon
     Hseeks = 0      # count horizon seeks
     Mseeks = 0      # count of moonrise and/or moonset seeks (a time is returned)
-    eph = load(config.ephemeris[config.ephndx][0])	# load chosen ephemeris
-    earth   = eph['earth']
-    moon    = eph['moon']
+    ts      = ctx['ts']
+    earth   = ctx['earth']
+    moon    = ctx['moon']
 
     # return [first_event, second_event] per day + processing time + Hseeks
     out = [None, None, None, None]
+    cached = eventcache.get('moon3days', lat, d, False)
+    if cached is not None:
+        ev1, ev2, mstate3 = cached
+        return [ev1, ev2, (time00, timeAB), (Mseeks, Hseeks, mstate3)]
+
     ev1 = ['--:--','--:--','--:--','--:--','--:--','--:--']	# first event
     ev2 = ['--:--','--:--','--:--','--:--','--:--','--:--']	# second event on same day (rare)
 
-    hemisph = 'N' if lat >= 0 else 'S'
-    latNS = "{:3.1f} {}".format(abs(lat), hemisph)
-    if SkyfieldVersion("1.35") >= 0:
-        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
-        observer = earth + topos
-    else:
-        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    topos, observer, latNS = lat_observer(lat)
 
     dt = datetime(d.year, d.month, d.day, 0, 0, 0)
     dt -= timedelta(seconds=30)     # search from 30 seconds before midnight
@@ -1159,10 +1179,10 @@ def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (sect
 
     iH = 0
     Mseeks += 1
-    horizon = getHorizon(t0noon, earth, moon)   # 0.8307988 on 16-08-2024
+    horizon = moonHorizon(t0noon)   # 0.8307988 on 16-08-2024
     start00 = time()                        # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t0, t1, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t0, t1, horizon)[config.lat.index(lat)]
         time00 += time()-start00            # 00000
         ev1[0], ev1[3], ev2[0], ev2[3], mstate1 = rise_set(moonrise,y,latNS)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1195,10 +1215,10 @@ def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (sect
 
     iH = 0
     Mseeks += 1
-    horizon = getHorizon(t1noon, earth, moon)
+    horizon = moonHorizon(t1noon)
     start00 = time()                        # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t1, t2, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t1, t2, horizon)[config.lat.index(lat)]
         time00 += time()-start00            # 00000
         ev1[1], ev1[4], ev2[1], ev2[4], mstate2 = rise_set(moonrise,y,latNS)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1231,10 +1251,10 @@ def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (sect
 
     iH = 0
     Mseeks += 1
-    horizon = getHorizon(t2noon, earth, moon)
+    horizon = moonHorizon(t2noon)
     start00 = time()                        # 00000
-    if True or SkyfieldVersion("1.48") < 0:
-        moonrise, y = almanac.find_discrete(t2, t3, f_moon(earth, moon, topos, horizon))
+    if True or not observers.risingsok:
+        moonrise, y = moon_day(t2, t3, horizon)[config.lat.index(lat)]
         time00 += time()-start00            # 00000
         ev1[2], ev1[5], ev2[2], ev2[5], mstate3 = rise_set(moonrise,y,latNS)
     else:   # !!! DO NOT USE WITH Skyfield 1.48 !!! (see Skyfield Issue #998)
@@ -1269,6 +1289,7 @@ def mp_moonrise_set(d, lat, mstate0, ts):   # used in nautical.twilighttab (sect
     # append to list ...
     out[2] = (time00, timeAB)     # time spent (returning >= 1 event time) + (seeking if moon above/below horizon)
     out[3] = (Mseeks, Hseeks, mstate3)     # count of (moonrise/set seeks) + (horizon seeks) + moon state
+    eventcache.put('moon3days', lat, d, False, [ev1, ev2, eventcache.state(mstate3)])
     return out
 
 def f_moon(earth, moon, topos, degBelowHorizon):
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Multi-latitude rise/set/twilight solver.
+#
+# Instead of one almanac search per latitude, the Sun or Moon is observed from
+# ALL latitudes at once: every element of a Time array is paired with its own
+# latitude (the observer is a wgs84 position with an array of latitudes), so
+# one observe() call evaluates the altitude for all latitudes, all sign changes
+# are bracketed together and all roots are refined together.
+#
+# Each element takes exactly the same steps as the per-latitude search it
+# replaces, hence the event times are identical:
+#   sun_events  ... almanac.find_risings & almanac.find_settings (Skyfield >= 1.48)
+#   moon_events ... almanac.find_discrete with the once-per-minute 'f_moon'
+# The Moon's altitude is not evaluated exactly at every sample though: the
+# geocentric hour angle, declination and distance of the Moon are fitted per
+# day with Chebyshev polynomials and the topocentric altitude of any latitude
+# is taken from this cheap model. Only samples where the model is closer to
+# the horizon than the error bound 'config.fitERR' are evaluated exactly, so
+# every sample yields the same above/below state as 'f_moon' (with
+# config.precision = 'preview' the model alone is used, see precision.py).
+# Nor is every minute sample searched: the search starts from the events of
+# the previous search (usually the previous day) shifted by the Moon's daily
+# delay, or from an hourly scan when there is no such prediction. Intervals are
+# halved until each sign change lies between adjacent minute samples (the
+# minute that find_discrete would have refined) and no interval can hide a
+# grazing Moon's rise and set, so a missed prediction costs a local scan only.
+
+###### Third party imports ######
+import numpy as np
+from numpy.polynomial.chebyshev import chebfit, chebval
+from skyfield import almanac
+from skyfield.api import wgs84
+from skyfield.constants import tau, pi
+from skyfield.nutationlib import iau2000b
+from skyfield.searchlib import EPSILON
+
+###### Local application imports ######
+import config
+import precision
+
+#----------------------
+#   global variables
+#----------------------
+
+moonstep = 0.000694444      # = 1.0 / 24.0 / 60.0 ('step_days' of f_moon)
+moonscan = 60               # minute samples per scan interval (one hour)
+moonacc  = 5.0              # degrees/hour^2: bound of the Moon's altitude acceleration
+fitdeg   = 10               # degree of the Chebyshev polynomials (one fit per day)
+moontol  = 1e-9             # degrees: rounding tolerance of the Moon's altitude
+moonday  = 1.0351           # days: mean interval between successive moonrises
+moonwin  = 25               # minute samples either side of a predicted moonrise/moonset
+moonwarm = 2.0              # days: predict from the previous search if it started within this interval
+sweepdays = 16              # days searched together in a sweep (limits the memory of the minute samples)
+polarmargin = 0.1          # degrees: safety margin of the circumpolar pre-check
+
+warm = {}       # horizon -> start (TT), latitudes and event times (TT) per latitude of the previous search
+
+def observer(earth, lats):
+    # one observer per element of 'lats' (latitudes in degrees at longitude 0)
+    return earth + wgs84.latlon(np.asarray(lats, dtype=float), 0.0, elevation_m=0.0)
+
+def split(t, y, ev, n, order=None):
+    # event times & values per latitude (0 to n-1), sorted by 'order' if given
+    out = []
+    for k in range(n):
+        j = np.flatnonzero(ev == k)
+        if order is not None:
+            j = j[np.argsort(order[j], kind='stable')]
+        out.append((t[j], y[j]))
+    return out
+
+def circumpolar(lats, decmin, decmax, h):
+    # True where a body with a declination between decmin and decmax is
+    # continuously above (first array) or below (second array) the altitude h
+    # at latitude lats ... all day: no rise/set search is required (degrees)
+    lowest = np.abs(lats + np.clip(-lats, decmin, decmax)) - 90.0   # lower culmination
+    highest = 90.0 - np.abs(lats - np.clip(lats, decmin, decmax))   # upper culmination
+    return lowest > h + polarmargin, highest < h - polarmargin
+
+#-------------------------------
+#   Sun rise/set & twilight
+#-------------------------------
+
+def twilight_horizons(astro=False):     # used in alma_skyfield, mp_nautical & mp_eventtables
+    # degrees below horizon: sunrise/sunset, civil, nautical and astronomical twilight
+    # (only if 'astro', i.e. for the Event Time tables, and enabled in config.astroTW)
+    if astro and config.astroTW:
+        return [0.8333, 6.0, 12.0, 18.0]
+    return [0.8333, 6.0, 12.0]
+
+def sun_events(ts, earth, sun, lats, t0, t1, horizons):   # used in alma_skyfield.twilight, mp_nautical & mp_eventtables
+    # sunrises & sunsets between t0 and t1 for all latitudes at the given horizons
+    # (degrees below horizon) ... as almanac.find_risings & almanac.find_settings.
+    # Returns per horizon a list per latitude of (sunrise, yR, sunset, yS).
+    return sun_sweep(ts, earth, sun, lats, [t0.tt], [t1.tt], horizons)[0]
+
+def sun_sweep(ts, earth, sun, lats, tt0, tt1, horizons):
+    # as sun_events for the days from tt0[k] to tt1[k] (TT) ... a list per day
+    tt0 = np.asarray(tt0, dtype=float)
+    tt1 = np.asarray(tt1, dtype=float)
+    counts = np.ceil((tt1 - tt0) / 0.8).astype(int) + 1
+    out = [None] * len(tt0)
+    for sample_count in np.unique(counts):
+        days = np.flatnonzero(counts == sample_count)
+        for k, events in zip(days, sun_days(ts, earth, sun, lats, tt0[days], tt1[days], horizons, sample_count)):
+            out[k] = events
+    return out
+
+def sun_days(ts, earth, sun, lats, tt0, tt1, horizons, sample_count):
+    # as sun_events for days with the same number of samples: one row per day & latitude
+    nlat = len(lats)
+    nday = len(tt0)
+    nrow = nday * nlat
+    samples = ts.tt_jd(np.repeat(np.linspace(tt0, tt1, sample_count, axis=1), nlat, axis=0).flatten())
+    lat = np.tile(np.repeat(np.asarray(lats, dtype=float), sample_count), nday)
+    obs = observer(earth, lat)
+    almanac._fastify(samples)
+    apparent = obs.at(samples).observe(sun).apparent(())
+    ha, dec, distance = apparent.hadec()
+    latitude = obs.vector_functions[-1].latitude
+    rowdec = dec.degrees.reshape(nrow, sample_count)
+    rowlat = lat[::sample_count]
+
+    # bracket the risings (sgn = -1) and settings (sgn = +1) of every horizon ...
+    # except where the Sun is continuously above or below the horizon: those
+    # searches only yield events that are not valid (y = False)
+    ev = []     # per search: (sample index before the event, a, b, horizon, sgn, search)
+    for horizon in horizons:
+        h = -horizon / 360.0 * tau
+        above, below = circumpolar(rowlat, rowdec.min(axis=1), rowdec.max(axis=1), -horizon)
+        hopeless = above | below
+        config.circumpolarSkips += 2 * np.count_nonzero(hopeless)
+        for sgn in [-1.0, 1.0]:
+            desired = sgn * almanac._setting_hour_angle(latitude, dec, h)
+            difference = (desired - ha.radians) % tau
+            il, js = np.nonzero(np.diff(difference.reshape(nrow, sample_count)) > 0.0)
+            js = js[~hopeless[il]]
+            il = il[~hopeless[il]]
+            i = il * sample_count + js
+            ev.append((i, difference[i], tau - difference[i+1], h, sgn, len(ev)))
+    i   = np.concatenate([e[0] for e in ev])
+    a   = np.concatenate([e[1] for e in ev])
+    b   = np.concatenate([e[2] for e in ev])
+    h   = np.concatenate([np.full(len(e[0]), e[3]) for e in ev])
+    sgn = np.concatenate([np.full(len(e[0]), e[4]) for e in ev])
+    search = np.concatenate([np.full(len(e[0]), e[5]) for e in ev])
+    evrow = i // sample_count
+    if len(i) == 0:
+        empty = (samples[i], np.zeros(0, dtype=bool))
+        return [{horizon: [empty + empty] * nlat for horizon in horizons}] * nday
+
+    # interpolate between the samples that bracket each event
+    old_ha_radians = ha.radians[i]
+    old_t = samples[i]
+    tt = samples.tt
+    t = ts.tt_jd((b * tt[i] + a * tt[i+1]) / (a + b))
+
+    # refine all events together
+    obs = observer(earth, lat[i])
+    latitude = obs.vector_functions[-1].latitude
+    normalize = lambda radians: radians % tau
+    for n in 0, 1, 2:
+        almanac._fastify(t)
+        apparent = obs.at(t).observe(sun).apparent(())
+        ha, dec, distance = apparent.hadec()
+        desired_ha = sgn * almanac._setting_hour_angle(latitude, dec, h)
+        ha_adjustment = desired_ha - ha.radians
+        ha_adjustment = (ha_adjustment + pi) % tau - pi
+        if n < 2:
+            ha_diff = normalize(ha.radians - old_ha_radians)
+            t_diff = t - old_t
+            ha_per_day = ha_diff / t_diff
+        old_ha_radians = ha.radians
+        old_t = t
+        timebump = ha_adjustment / ha_per_day
+        timebump[timebump == 0.0] = almanac._MICROSECOND
+        previous_t = t
+        t = ts.tt_jd(t.whole, t.tt_fraction + timebump)
+        normalize = lambda radians: (radians + pi) % tau - pi
+
+    # interpolate between the last two iterations (when barely scraping the horizon)
+    v = obs.vector_functions[-1]
+    altitude0, _, distance0, rate0, _, _ = apparent.frame_latlon_and_rates(v)
+    t.M = previous_t.M
+    t._nutation_angles_radians = previous_t._nutation_angles_radians
+    apparent = obs.at(t).observe(sun).apparent(())
+    altitude1, _, distance1, rate1, _, _ = apparent.frame_latlon_and_rates(v)
+    tdiff = t - previous_t
+    t_scaled_offset = almanac._intersection(
+        altitude0.radians - h,
+        altitude1.radians - h,
+        rate0.radians.per_day * tdiff,
+        rate1.radians.per_day * tdiff,
+    )
+    t_scaled_offset = np.clip(t_scaled_offset, almanac._clip_lower, almanac._clip_upper)
+    t = previous_t + t_scaled_offset * tdiff
+    is_above_horizon = (
+        (desired_ha % pi != 0.0)
+        | ((t_scaled_offset > almanac._clip_lower) & (t_scaled_offset < almanac._clip_upper))
+    )
+
+    out = [{} for d in range(nday)]
+    for k, horizon in enumerate(horizons):
+        j = np.flatnonzero(search == 2*k)
+        rise = split(t[j], is_above_horizon[j], evrow[j], nrow)
+        j = np.flatnonzero(search == 2*k+1)
+        sett = split(t[j], is_above_horizon[j], evrow[j], nrow)
+        for d in range(nday):
+            out[d][horizon] = [rise[n] + sett[n] for n in range(d*nlat, (d+1)*nlat)]
+    return out
+
+#-------------------------
+#   Moonrise/Moonset
+#-------------------------
+
+def moon_up(ts, earth, moon, lats, jd, horizon):
+    # moon above horizon per element ... as 'f_moon' (lats and jd are arrays of equal size)
+    t = ts.tt_jd(jd)
+    t._nutation_angles = iau2000b(t.tt)
+    alt = precision.apparent(observer(earth, lats).at(t).observe(moon)).altaz()[0].degrees
+    return alt > -horizon, alt + horizon
+
+def fit_moon(ts, earth, moon, jd0, jd1):
+    # Chebyshev coefficients (one column per day) of the Moon's geocentric hour angle
+    # (at longitude 0), declination (both in radians) and distance (km) from jd0 to jd1
+    n = fitdeg + 1
+    x = np.cos(pi * (np.arange(n) + 0.5) / n)       # Chebyshev nodes
+    t = precision.fast(ts.tt_jd((jd0 + np.multiply.outer((x + 1.0) * 0.5, jd1 - jd0)).flatten()))
+    ra, dec, distance = precision.apparent(earth.at(t).observe(moon)).radec(epoch='date')
+    ha = np.unwrap((t.gast * (pi / 12.0) - ra.radians).reshape(n, -1), axis=0)
+    return [chebfit(x, y.reshape(n, -1), fitdeg) for y in (ha, dec.radians, distance.km)]
+
+def model_altitude(fit, jd0, jd1, day, lats, jd):
+    # topocentric altitude (degrees) from the fitted model (day, lats and jd are arrays of equal size)
+    x = 2.0 * (jd - jd0[day]) / (jd1[day] - jd0[day]) - 1.0
+    H, D, R = [chebval(x, c[:, day], tensor=False) for c in fit]
+    phi = np.radians(lats)
+    sinphi = np.sin(phi)
+    cosphi = np.cos(phi)
+    N = wgs84.radius.km / np.sqrt(1.0 - wgs84._e2 * sinphi * sinphi)
+    # the Moon as seen from the observer (x towards the meridian, z to the pole)
+    vx = R * np.cos(D) * np.cos(H) - N * cosphi
+    vy = R * np.cos(D) * np.sin(H)
+    vz = R * np.sin(D) - N * (1.0 - wgs84._e2) * sinphi
+    return np.degrees(np.arcsin((vx * cosphi + vz * sinphi) / np.sqrt(vx*vx + vy*vy + vz*vz)))
+
+def model_up(fit, jd0, jd1, day, lats, jd, horizon):
+    # moon above horizon per element and the altitude above the horizon (degrees)
+    # from the model alone (config.precision = 'preview')
+    g = model_altitude(fit, jd0, jd1, day, lats, jd) + horizon
+    return g > 0.0, g
+
+def moon_altitude(ts, earth, moon, fit, jd0, jd1, day, lats, jd, horizon):
+    # moon above horizon per element and the altitude above the horizon (degrees)
+    # that is certain: from the model (if 'fit' is given) less its error bound or
+    # exact where the model is within the error bound of the horizon
+    if fit is None:
+        return moon_up(ts, earth, moon, lats, jd, horizon)
+    if precision.modelonly():
+        return model_up(fit, jd0, jd1, day, lats, jd, horizon)
+    err = config.fitERR / 3600.0
+    g = model_altitude(fit, jd0, jd1, day, lats, jd) + horizon
+    up = g > 0.0
+    g = g - np.copysign(err, g)
+    k = np.flatnonzero(np.abs(g) <= err)
+    if len(k):
+        up[k], g[k] = moon_up(ts, earth, moon, lats[k], jd[k], horizon[k])
+    return up, g
+
+def full_scan(nrow, nmax):
+    # initial minute samples: the hourly scan
+    known = np.zeros((nrow, nmax + 1), dtype=bool)
+    known[:, :nmax:moonscan] = True
+    known[:, nmax] = True
+    return known
+
+def warm_start(lats, jd, horizon):
+    # initial minute samples per latitude: around the moonrises/moonsets predicted
+    # from the previous search or, without a prediction, the hourly scan
+    nlat = len(lats)
+    nmax = len(jd) - 1
+    known = full_scan(nlat, nmax)
+    prev = warm.get(horizon)
+    if prev is None or abs(jd[0] - prev[0]) > moonwarm or not np.array_equal(prev[1], lats):
+        return known
+    for k in range(nlat):
+        if len(prev[2][k]) > 0:
+            pred = prev[2][k] + (jd[0] - prev[0]) * moonday
+            m = np.rint((pred - jd[0]) / (jd[1] - jd[0])).astype(int)
+            m = np.concatenate((m - moonwin, m + moonwin))
+            known[k, 1:nmax] = False
+            known[k, m[(m > 0) & (m < nmax)]] = True
+    return known
+
+def search_moon(altitude, jd, known):
+    # the minute samples (and rows) preceding the moonrises/moonsets.
+    # Starting from the samples 'known' (per row) every interval is halved
+    # until each sign change lies between adjacent minute samples and no interval
+    # without sign change can hide two events (the curve deviates from the chord
+    # by up to moonacc/2 * s * (1-s) hours^2). A missed prediction thus ends in a
+    # scan of the unpredicted interval.
+    up = np.zeros(known.shape, dtype=bool)
+    g = np.zeros(known.shape)
+    ll, ii = np.nonzero(known)
+    while len(ll):
+        up[ll, ii], g[ll, ii] = altitude(ll, jd[ll, ii])
+        known[ll, ii] = True
+        ll, ii = np.nonzero(known)
+        same = ll[1:] == ll[:-1]
+        l = ll[:-1][same]
+        a = ii[:-1][same]
+        b = ii[1:][same]
+        change = up[l, a] != up[l, b]
+        w = (jd[l, b] - jd[l, a]) * 24.0
+        acc = moonacc * 0.5 * w * w
+        g0 = np.abs(g[l, a])
+        g1 = np.abs(g[l, b])
+        s = np.clip((acc - (g1 - g0)) / (2.0 * acc), 0.0, 1.0)
+        grazing = g0 + (g1 - g0) * s - acc * s * (1.0 - s) <= 0.0
+        k = np.flatnonzero((b - a > 1) & (change | grazing))
+        ll = l[k]
+        ii = (a[k] + b[k]) // 2
+    k = change & (b - a == 1)
+    return a[k], l[k]
+
+def moon_days(ts, earth, moon, lats, jd0, jd1, horizons, start):
+    # moonrises & moonsets of the days from jd0[k] to jd1[k] (TT) with the moon
+    # horizons[k] ... one row per day & latitude. All days must have the same
+    # number of minute samples; 'start(jd)' returns the initial minute samples.
+    # Returns a list per day of lists per latitude of (times, y) and a list per
+    # day of the state per latitude (True/False = continuously above/below the
+    # horizon, else None).
+    nlat = len(lats)
+    nday = len(jd0)
+    nrow = nday * nlat
+    day = np.repeat(np.arange(nday), nlat)
+    lat = np.tile(lats, nday)
+    horizon = np.repeat(horizons, nlat)
+    jd = np.repeat(np.linspace(jd0, jd1, int((jd1[0] - jd0[0]) / moonstep) + 2, axis=1), nlat, axis=0)
+
+    fit = fit_moon(ts, earth, moon, jd0, jd1)
+
+    # no search where the Moon is continuously above or below the horizon
+    # (its topocentric altitude is lower than the geocentric one by up to the
+    # horizontal parallax)
+    x = np.linspace(-1.0, 1.0, 49)
+    dec = np.degrees(chebval(x, fit[1]))
+    hp = np.degrees(np.arcsin(wgs84.radius.km / chebval(x, fit[2]).min(axis=1)))
+    decmin = np.repeat(dec.min(axis=1), nlat)
+    decmax = np.repeat(dec.max(axis=1), nlat)
+    above = circumpolar(lat, decmin, decmax, np.repeat(hp, nlat) - horizon)[0]
+    below = circumpolar(lat, decmin, decmax, -horizon)[1]
+    known = start(jd)
+    known[above | below] = False
+    config.circumpolarSkips += np.count_nonzero(above | below)
+    states = np.full(nrow, None, dtype=object)
+    states[above] = True
+    states[below] = False
+
+    if config.fitERR <= 0 and not precision.modelonly(): fit = None
+    altitude = lambda r, jd: moon_altitude(ts, earth, moon, fit, jd0, jd1, day[r], lat[r], jd, horizon[r])
+    lo, ev = search_moon(altitude, jd, known)
+
+    # refine within the minute as find_discrete (12 samples per step). Only
+    # samples near the root are evaluated: elsewhere the sign follows from the
+    # chord between the (exact) altitudes at both ends of the bracket.
+    end_mask = np.linspace(0.0, 1.0, 12)
+    start_mask = end_mask[::-1]
+    bow = 0.5 * moonacc * end_mask * start_mask
+    exact = lambda r, jd: moon_up(ts, earth, moon, lat[r], jd, horizon[r])
+    if precision.modelonly():
+        exact = lambda r, jd: model_up(fit, jd0, jd1, day[r], lat[r], jd, horizon[r])
+    starts = jd[ev, lo]
+    ends = jd[ev, lo+1]
+    g = exact(np.tile(ev, 2), np.concatenate((starts, ends)))[1]
+    gs = g[:len(lo)]
+    ge = g[len(lo):]
+    y = np.zeros(len(lo), dtype=bool)
+    r = np.arange(len(lo))
+    while len(lo) and (ends - starts).max() > EPSILON:
+        jdm = np.multiply.outer(starts, start_mask) + np.multiply.outer(ends, end_mask)
+        w = (ends - starts) * 24.0
+        gm = np.multiply.outer(gs, start_mask) + np.multiply.outer(ge, end_mask)
+        done = np.abs(gm) > np.multiply.outer(w * w, bow) + moontol
+        # ... and the samples either side of the chord's root (the next bracket)
+        n = np.argmax((gm[:, 1:] > 0.0) != (gm[:, :-1] > 0.0), axis=1)
+        done[r, n] = False
+        done[r, n+1] = False
+        il, k = np.nonzero(~done)
+        ym = gm > 0.0
+        ym[il, k], gm[il, k] = exact(ev[il], jdm[il, k])
+        n = np.argmax(ym[:, 1:] != ym[:, :-1], axis=1)
+        il = np.concatenate((r, r))
+        k = np.concatenate((n, n+1))
+        i = np.flatnonzero(done[il, k])
+        if len(i):      # the root is not where the chord predicts
+            gm[il[i], k[i]] = exact(ev[il[i]], jdm[il[i], k[i]])[1]
+        gs = gm[r, n]
+        ge = gm[r, n+1]
+        starts = jdm[r, n]
+        ends = jdm[r, n+1]
+        y = ym[r, n+1]
+    events = split(ts.tt_jd(ends), y, ev, nrow, lo)
+    return [events[d*nlat:(d+1)*nlat] for d in range(nday)], [states[d*nlat:(d+1)*nlat] for d in range(nday)]
+
+def moon_events(ts, earth, moon, lats, t0, t1, horizon):  # used in alma_skyfield.fetchMoonData, mp_nautical & mp_eventtables
+    # moonrises & moonsets between t0 and t1 for all latitudes ... as
+    # almanac.find_discrete(t0, t1, f_moon(topos, horizon)) per latitude.
+    # Returns a list per latitude of (times, y) where y is True at moonrise.
+    lats = np.asarray(lats, dtype=float)
+    start = lambda jd: warm_start(lats, jd[0], horizon)
+    events = moon_days(ts, earth, moon, lats, np.array([t0.tt]), np.array([t1.tt]), np.array([horizon]), start)[0][0]
+    warm[horizon] = (t0.tt, lats, [tm.tt for tm, y in events])
+    return events
+
+def moon_sweep(ts, earth, moon, lats, jd0, jd1, horizons):
+    # as moon_events for the days from jd0[k] to jd1[k] (TT) with the moon
+    # horizons[k] ... a list per day (in chunks of 'sweepdays' days) and the
+    # states per day (see moon_days)
+    lats = np.asarray(lats, dtype=float)
+    jd0 = np.asarray(jd0, dtype=float)
+    jd1 = np.asarray(jd1, dtype=float)
+    horizons = np.asarray(horizons, dtype=float)
+    counts = ((jd1 - jd0) / moonstep).astype(int)
+    start = lambda jd: full_scan(jd.shape[0], jd.shape[1] - 1)
+    out = [None] * len(jd0)
+    states = [None] * len(jd0)
+    for count in np.unique(counts):
+        days = np.flatnonzero(counts == count)
+        for c in range(0, len(days), sweepdays):
+            k = days[c:c+sweepdays]
+            for d, events, state in zip(k, *moon_days(ts, earth, moon, lats, jd0[k], jd1[k], horizons[k], start)):
+                out[d] = events
+                states[d] = state
+    return out, states
+
+#-------------------------------
+#   Event table of a period
+#-------------------------------
+
+def event_table(ts, earth, sun, moon, lats, t0, t1, sunhorizons, moonhorizons):   # used in alma_skyfield.sweep_events, mp_nautical & mp_eventtables
+    # the events of consecutive days from t0[k] to t1[k] (lists of Time) for
+    # all latitudes: sun_events of the horizons 'sunhorizons' and moon_events
+    # of the horizons moonhorizons[k] ... looked up with the same keys as
+    # the day caches (t0.tt, t1.tt) and (t0.tt, t1.tt, horizon)
+    jd0 = [t.tt for t in t0]
+    jd1 = [t.tt for t in t1]
+    moondays, moonstates = moon_sweep(ts, earth, moon, lats, jd0, jd1, moonhorizons)
+    table = {'days': {}, 'moondays': moondays, 'moonstates': moonstates}
+    for k, events in enumerate(sun_sweep(ts, earth, sun, lats, jd0, jd1, sunhorizons)):
+        table[(jd0[k], jd1[k])] = events
+        table[(jd0[k], jd1[k], moonhorizons[k])] = moondays[k]
+        table['days'][jd0[k]] = k
+    return table
+
+def moon_state(table, t0, k):   # used in alma_skyfield.getmoonstate, mp_nautical & mp_eventtables
+    # the moon state at latitude index k from t0 (beginning of a day in the
+    # table) ... from the first day continuously above/below the horizon or the
+    # first moonrise/moonset in the table: True = above horizon, False = below
+    # horizon or None if there is none in the table
+    d = table['days'].get(t0.tt) if table else None
+    if d is not None:
+        for events, states in zip(table['moondays'][d:], table['moonstates'][d:]):
+            if states[k] is not None:
+                return states[k]
+            tm, y = events[k]
+            if len(tm) > 0:
+                return False if y[0] else True
+    return None
@@ -51,17 +51,18 @@ from math import cos, copysign, pi
 ###### Local application imports ######
 #from alma_ephem import magnitudes
 import config
+import eventcache
 if config.MULTIpr:  # in multi-processing mode ...
     # ! DO NOT PLACE imports IN CONDITIONAL 'if'-STATEMENTS WHEN MULTI-PROCESSING !
     import multiprocessing as mp
     from functools import partial
     # ... following is still required for SINGLE-PROCESSING (in multi-processing mode):
-    from alma_skyfield import ariesGHA, venusGHA, marsGHA, jupiterGHA, saturnGHA, sunGHA, moonGHA, moonVD, sunSD, moonSD, vdm_Venus, vdm_Mars, vdm_Jupiter, vdm_Saturn, ariestransit, stellar_info, planetstransit, moonage, moonphase, equation_of_time, getDUT1, find_new_moon
+    from alma_skyfield import ariesGHA, venusGHA, marsGHA, jupiterGHA, saturnGHA, sunGHA, moonGHA, moonVD, sunSD, moonSD, vdm_Venus, vdm_Mars, vdm_Jupiter, vdm_Saturn, ariestransit, stellar_info, planetstransit, moonage, moonphase, equation_of_time, getDUT1, find_new_moon, build_lunations, build_grid, sweep_transits, ingrid
     # ... following is required for MULTI-PROCESSING:
-    from mp_nautical import mp_twilight, mp_moonrise_set, mp_planetstransit, hor_parallax, mp_planetGHA, mp_sunmoon
+    from mp_nautical import mp_twilight, mp_moonrise_set, mp_planetstransit, hor_parallax, mp_planetGHA, mp_sunmoon, init_context, sweep_events, sweep_pages
 else:
     # ... following is required for SINGLE-PROCESSING:
-    from alma_skyfield import ariesGHA, venusGHA, marsGHA, jupiterGHA, saturnGHA, sunGHA, moonGHA, moonVD, sunSD, moonSD, vdm_Venus, vdm_Mars, vdm_Jupiter, vdm_Saturn, ariestransit, stellar_info, planetstransit, twilight, moonrise_set, moonage, moonphase, equation_of_time, getDUT1, find_new_moon
+    from alma_skyfield import ariesGHA, venusGHA, marsGHA, jupiterGHA, saturnGHA, sunGHA, moonGHA, moonVD, sunSD, moonSD, vdm_Venus, vdm_Mars, vdm_Jupiter, vdm_Saturn, ariestransit, stellar_info, planetstransit, twilight, moonrise_set, moonage, moonphase, equation_of_time, getDUT1, find_new_moon, build_lunations, build_grid, sweep_transits, ingrid, sweep_events
 
 
 UpperLists = [[], [], []]    # moon GHA per hour for 3 days
@@ -269,9 +270,9 @@ def twilight_symbol(oldtwi):
     return twi
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-def mp_planetGHA_worker(Date, ts, obj):
+def mp_planetGHA_worker(Date, obj):
     #print(" mp_planetGHA_worker Start  {}".format(obj))
-    gha = mp_planetGHA(Date, ts, obj)    # ===>>> mp_nautical.py
+    gha = mp_planetGHA(Date, obj)    # ===>>> mp_nautical.py
     #print(" mp_planetGHA_worker Finish {}".format(obj))
     return gha      # return list for four planets and Aries
 
@@ -291,11 +292,11 @@ def planetstab(Date, ts):
 \hline\rule{{0pt}}{{2.6ex}}\noindent
 '''.format(Date.strftime("%a"))
 
-        if config.MULTIpr and config.WINpf:
+        if config.MULTIpr and config.WINpf and not ingrid(Date):
             global pool
             # multiprocess 'SHA + transit times' simultaneously
             objlist = ['aries', 'venus', 'mars', 'jupiter', 'saturn']
-            partial_func2 = partial(mp_planetGHA_worker, Date, ts)
+            partial_func2 = partial(mp_planetGHA_worker, Date)
 
             try:
                 # RECOMMENDED: chunksize = 1
@@ -422,10 +423,10 @@ def planetstabm(Date, ts):
 \multicolumn{{1}}{{c}}{{\textbf{{{}}}}} & \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} && 
 \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}} &&  \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}} &&  \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}} &&  \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}}\\
 '''.format(Date.strftime("%a"))
-        if config.MULTIpr and config.WINpf:
+        if config.MULTIpr and config.WINpf and not ingrid(Date):
             # multiprocess 'SHA + transit times' simultaneously
             objlist = ['aries', 'venus', 'mars', 'jupiter', 'saturn']
-            partial_func2 = partial(mp_planetGHA_worker, Date, ts)
+            partial_func2 = partial(mp_planetGHA_worker, Date)
 
             try:
                 # RECOMMENDED: chunksize = 1
@@ -542,9 +543,9 @@ def planetstabm(Date, ts):
     return tab
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-def mp_planets_worker(Date, ts, obj):
+def mp_planets_worker(Date, obj):
     #print(" mp_planets_worker Start  {}".format(obj))
-    sha = mp_planetstransit(Date, ts, obj)    # ===>>> mp_nautical.py
+    sha = mp_planetstransit(Date, obj)    # ===>>> mp_nautical.py
     #print(" mp_planets_worker Finish {}".format(obj))
     return sha      # return list for four planets
 
@@ -600,7 +601,7 @@ def starstab(Date, ts):
         if config.MULTIpr and config.WINpf:
             # multiprocess 'SHA + transit times' simultaneously
             objlist = ['venus', 'mars', 'jupiter', 'saturn']
-            partial_func2 = partial(mp_planets_worker, datex, ts)
+            partial_func2 = partial(mp_planets_worker, datex)
 
             try:
                 # RECOMMENDED: chunksize = 1
@@ -613,7 +614,7 @@ def starstab(Date, ts):
                 config.stopwatch += listofsha[k][2]     # accumulate multiprocess processing time
                 del listofsha[k][-1]
             p = [item for sublist in listofsha for item in sublist]
-            p.extend(hor_parallax(datex, ts))
+            p.extend(hor_parallax(datex))
         else:
             p = planetstransit(datex)
 
@@ -647,9 +648,9 @@ def starstab(Date, ts):
     return out
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-def mp_sunmoon_worker(Date, d_valNA, ts, n):
+def mp_sunmoon_worker(Date, d_valNA, n):
     # split the work by date into 3 separate days
-    sunmoondata = mp_sunmoon(Date, d_valNA, ts, n)      # ===>>> mp_nautical.py
+    sunmoondata = mp_sunmoon(Date, d_valNA, n)      # ===>>> mp_nautical.py
     return sunmoondata
 
 def sunmoontab(Date, ts):
@@ -661,9 +662,11 @@ def sunmoontab(Date, ts):
     # note: table may have different widths due to the 'v' column (e.g. 6.9' versus 15.3')
     # note: table may have different widths due to the 'd' column (e.g. 8.2' versus -13.9')
 
-    if config.MULTIpr and config.WINpf:
+    # hourly positions are sliced from the ephemeris grid if available
+    MPsunmoon = config.MULTIpr and config.WINpf and not ingrid(Date, 3)
+    if MPsunmoon:
         # multiprocess sunmoontab values per "Date" simultaneously
-        partial_func = partial(mp_sunmoon_worker, Date, config.d_valNA, ts)
+        partial_func = partial(mp_sunmoon_worker, Date, config.d_valNA)
 
         try:
             sunmoonlist = pool.map(partial_func, [nn for nn in range(3)], 1)
@@ -684,7 +687,7 @@ def sunmoontab(Date, ts):
 '''.format(Date.strftime("%a"))
         # note: inline math mode is used to typeset the greek character 'nu'
 
-        if config.MULTIpr and config.WINpf:
+        if MPsunmoon:
             ghas = sunmoonlist[n][0]
             decs = sunmoonlist[n][1]
             degs = sunmoonlist[n][2]
@@ -772,9 +775,11 @@ def sunmoontab(Date, ts):
 def sunmoontabm(Date, ts):
     # generates LaTeX table for sun and moon (modern style)
 
-    if config.MULTIpr and config.WINpf:
+    # hourly positions are sliced from the ephemeris grid if available
+    MPsunmoon = config.MULTIpr and config.WINpf and not ingrid(Date, 3)
+    if MPsunmoon:
         # multiprocess sunmoontab values per "Date" simultaneously
-        partial_func = partial(mp_sunmoon_worker, Date, config.d_valNA, ts)
+        partial_func = partial(mp_sunmoon_worker, Date, config.d_valNA)
 
         try:
             sunmoonlist = pool.map(partial_func, [nn for nn in range(3)], 1)
@@ -798,7 +803,7 @@ def sunmoontabm(Date, ts):
 \multicolumn{{1}}{{c}}{{\textbf{{{}}}}} & \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}} & & \multicolumn{{1}}{{c}}{{\textbf{{GHA}}}} & \multicolumn{{1}}{{c}}{{\(\nu\)}} & \multicolumn{{1}}{{c}}{{\textbf{{Dec}}}} & \multicolumn{{1}}{{c}}{{\textit{{d}}}} & \multicolumn{{1}}{{c}}{{\textbf{{HP}}}}\\
 '''.format(Date.strftime("%a"))
 
-        if config.MULTIpr and config.WINpf:
+        if MPsunmoon:
             ghas = sunmoonlist[n][0]
             decs = sunmoonlist[n][1]
             degs = sunmoonlist[n][2]
@@ -892,25 +897,23 @@ def sunmoontabm(Date, ts):
     return tab
 
 # >>>>>>>>>>>>>>>>>>>>>>>>
-# create a list of 'moon above/below horizon' states per Latitude...
+# 'moon above/below horizon' states per Latitude...
 #    None = unknown; True = above horizon (visible); False = below horizon (not visible)
-# The moon above/below status is stored at 3-day intervals, i.e. when multiprocessing "1st day",
-#    the previous day's status is stored here (except on the first day to be processed).
-#    Multiprocessing does not confuse the states as every three days it waits for all data.
-# Note: the size of moonvisible MUST equal the size of config.lat
-moonvisible = [None] * 31       # moonvisible[0] up to moonvisible[30]
+# No moon state is carried from one doublepage to the next: the state at the beginning
+#    of a doublepage is looked up in the event table of all days (see sweep_events and
+#    getmoonstate in mp_nautical.py), so every doublepage can be calculated independently.
 
-def mp_twilight_worker(Date, ts, lat):
+def mp_twilight_worker(Date, lat):
     #print(" mp_twilight_worker Start {}".format(lat))
     hemisph = 'N' if lat >= 0 else 'S'
-    twi = mp_twilight(Date, lat, ts)                # ===>>> mp_nautical.py
+    twi = mp_twilight(Date, lat)                # ===>>> mp_nautical.py
     #print(" mp_twilight_worker Finish {}".format(lat))
     return twi      # return list for all latitudes
 
-def mp_moonlight_worker(Date, ts, lat, mstate):
+def mp_moonlight_worker(Date, lat, mstate):
     #print(" mp_moonlight_worker Start  {}".format(lat))
     hemisph = 'N' if lat >= 0 else 'S'
-    ml = mp_moonrise_set(Date, lat, mstate, ts)     # ===>>> mp_nautical.py
+    ml = mp_moonrise_set(Date, lat, mstate)     # ===>>> mp_nautical.py
     #print(" mp_moonlight_worker Finish {}".format(lat))
     return ml       # return list for all latitudes
 
@@ -918,38 +921,23 @@ def twilighttab(Date, ts):
     # returns the sun twilight and moonrise/moonset tables, finally EoT data
 
     if config.MULTIpr:
-        # multiprocess twilight values for "Date+1" per latitude simultaneously
+        # twilight values for "Date+1" - all latitudes are solved together (see multilat.py),
+        #   so this runs in this process instead of one worker task per latitude.
         # Date+1 to calculate for the second day (three days are printed on one page)
-        partial_func = partial(mp_twilight_worker, Date+timedelta(days=1), ts)
-
-        try:
-            # RECOMMENDED: chunksize = 1
-            listoftwi = pool.map(partial_func, config.lat, 1)
-        except KeyboardInterrupt:
-            print(msg0)
-            sys.exit(0)
+        listoftwi = [mp_twilight_worker(Date+timedelta(days=1), lat) for lat in config.lat]
 
         for k in range(len(listoftwi)):
             config.stopwatch += listoftwi[k][6]     # accumulate multiprocess processing time
             del listoftwi[k][-1]
 
-        # multiprocess moonlight values for "Date, Date+1, Date+2" per latitude simultaneously
-        data = [(config.lat[ii], moonvisible[ii]) for ii in range(len(config.lat))]
-        partial_func2 = partial(mp_moonlight_worker, Date, ts)  # list of tuples
-
-        try:
-            # RECOMMENDED: chunksize = 1
-            listmoon = pool.starmap(partial_func2, data, 1)
-        except KeyboardInterrupt:
-            print(msg0)
-            sys.exit(0)
+        # moonlight values for "Date, Date+1, Date+2" (all latitudes are solved together)
+        listmoon = [mp_moonlight_worker(Date, lat, None) for lat in config.lat]
 
         #print("listmoon = {}".format(listmoon))
         for k in range(len(listmoon)):
             tuple_seeks = listmoon[k][-1]
             config.moonDataSeeks    += tuple_seeks[0]   # count of moonrise or set seeks
             config.moonHorizonSeeks += tuple_seeks[1]   # count of horizon seeks
-            moonvisible[k] = tuple_seeks[2]             # updated moon state
             del listmoon[k][-1]
             tuple_times = listmoon[k][-1]
             config.stopwatch  += tuple_times[0]         # accumulate multiprocess processing time
@@ -1342,80 +1330,115 @@ def doublepage(Date, page1, ts):
 #   This simple but effective function eliminates endless keyboard interrupts
 #   each time Ctrl-C is issued, while none actually kill the parent process
 #   ... and this causes the Command Prompt window (in Windows, MPmode=0) to hang.
-def init_worker():
+def init_worker(ts, ephndx, ephfile):
     # Prevent child process from ever receiving a KeyboardInterrupt.
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # load the ephemeris once per worker process (not per task)
+    init_context(ts, ephndx, ephfile)
+
+# The doublepages of a month or year are calculated in parallel (one task per
+# doublepage) by worker processes that are forked when the hourly positions,
+# events and transits of all days are ready, so they inherit them. With
+# "spawn" (Windows & macOS) the doublepages are calculated in this process;
+# Windows multiprocesses the planets of each day (see planetstab & starstab).
+
+pagets = None       # the timescale in a page worker process
+counters = ['stopwatch', 'stopwatch2', 'moonDaysCount', 'moonDataSeeks', 'moonDataFound', 'moonHorizonSeeks', 'moonHorizonFound', 'circumpolarSkips']
+
+def init_pageworker(ts):
+    # Prevent child process from ever receiving a KeyboardInterrupt.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    global pagets
+    pagets = ts
+    eventcache.collecting = True    # new event times are returned to the parent process
+
+def mp_doublepage_worker(task):
+    # returns a doublepage, the changes of the statistics counters and the new event times
+    Date, page01 = task
+    before = [getattr(config, c) for c in counters]
+    page = doublepage(Date, page01, pagets)
+    return page, [getattr(config, c) - b for c, b in zip(counters, before)], eventcache.collect()
 
 def pages(first_day, dtp, ts):
     # dtp = 0 if for entire year; = -1 if for entire month; else days to print
 
+    # calculate the hourly positions for all doublepages in one pass
+    # (the last doublepage may extend 2 days beyond the requested days)
+    if dtp == 0:
+        days = (date(first_day.year+1, 1, 1) - first_day).days + 2
+    elif dtp == -1:
+        days = 31 + 2
+    else:
+        days = dtp + 2
+    build_grid(first_day, days)
+    build_lunations(first_day, days)    # moon phases of all pages
+
+    bypage = config.MULTIpr and not config.WINpf and mp.get_start_method() == "fork"
     if config.MULTIpr:
         # Windows & macOS defaults to "spawn"; Unix to "fork"
         #mp.set_start_method("spawn")
         n = config.CPUcores
         if n > 12: n = 12   # use 12 cores maximum
         if (config.WINpf or config.MACOSpf) and n > 8: n = 8   # 8 maximum if Windows or Mac OS
+        init_context(ts, config.ephndx, config.ephfile)     # hor_parallax runs in this process
         global pool
-        pool = mp.Pool(n, init_worker)   # start 8 max. worker processes
+        if config.WINpf:        # ... for the planets in planetstab, starstab & sunmoontab
+            pool = mp.Pool(n, init_worker, (ts, config.ephndx, config.ephfile))   # start 8 max. worker processes
 
-    out = ''
-    page01 = True
+    # calculate the rise/set/twilight events of all days in one pass
+    sweep_events(first_day, days, 30)
+    # and the Moon and planet transits
+    sweep_transits(first_day, days, False)
+
+    # the doublepages (3 days per page) with the progress indicator
+    tasks = []
+    progress = []
     pmth = ''
-    dpp = 3         # 3 days per page
     day1 = first_day
+    i = dtp   # don't decrement dtp
+    while (dtp == 0 and day1.year == first_day.year) or (dtp == -1 and day1.month == first_day.month) or (dtp > 0 and i > 0):
+        tasks.append((day1, len(tasks) == 0))
+        cmth = day1.strftime("%b ")
+        if dtp > 0:
+            progress.append('')
+        elif cmth != pmth:
+            progress.append("\n" + cmth)     # next month
+            pmth = cmth
+        else:
+            progress.append('.')
+        i -= 3
+        day1 += timedelta(days=3)
 
-    if dtp == 0:        # if entire year
-        year = first_day.year
-        yr = year
-        while year == yr:
-            cmth = day1.strftime("%b ")
-            day3 = day1 + timedelta(days=2)
-            if cmth != pmth:
-                print() # progress indicator - next month
-                #print(cmth, end='')
-                sys.stdout.write(cmth)	# next month
-                sys.stdout.flush()
-                pmth = cmth
-            else:
-                sys.stdout.write('.')	# progress indicator
-                sys.stdout.flush()
-            out += doublepage(day1,page01,ts)
-            page01 = False
-            day1 += timedelta(days=3)
-            year = day1.year
-    elif dtp == -1:     # if entire month
-        mth = first_day.month
-        m = mth
-        while mth == m:
-            cmth = day1.strftime("%b ")
-            day3 = day1 + timedelta(days=2)
-            if cmth != pmth:
-                print() # progress indicator - next month
-                #print(cmth, end='')
-                sys.stdout.write(cmth)	# next month
-                sys.stdout.flush()
-                pmth = cmth
-            else:
-                sys.stdout.write('.')	# progress indicator
+    out = ''
+    if bypage:
+        sweep_pages([d for d, p in tasks])      # ... before the worker processes are forked
+        eventcache.flush()
+        pool = mp.Pool(min(n, len(tasks)), init_pageworker, (ts,))
+        try:
+            # RECOMMENDED: chunksize = 1
+            for k, (page, changes, rows) in enumerate(pool.imap(mp_doublepage_worker, tasks, 1)):
+                sys.stdout.write(progress[k])   # progress indicator
                 sys.stdout.flush()
+                out += page
+                for c, v in zip(counters, changes):
+                    setattr(config, c, getattr(config, c) + v)
+                eventcache.merge(rows)
+        except KeyboardInterrupt:
+            print(msg0)
+            sys.exit(0)
+    else:
+        for k, (day1, page01) in enumerate(tasks):
+            sys.stdout.write(progress[k])   # progress indicator
+            sys.stdout.flush()
             out += doublepage(day1,page01,ts)
-            page01 = False
-            day1 += timedelta(days=3)
-            mth = day1.month
-    else:           # print 'dtp' days beginning with first_day
-        i = dtp   # don't decrement dtp
-        while i > 0:
-            out += doublepage(day1,page01,ts)
-            page01 = False
-            i -= 3
-            day1 += timedelta(days=3)
 
     if dtp <= 0:        # if Full Almanac for a whole month/year...
         print("\n")		# 2 x newline to terminate progress indicator
 
-    if config.MULTIpr:
+    if bypage or (config.MULTIpr and config.WINpf):
         pool.close()    # close all worker processes
         pool.join()
+    eventcache.flush()  # store the new event times (see eventcache.py)
 
     return out
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Observer registry: the topos, the observer (earth + topos) and the label
+# ('latNS', e.g. "52.0 N") of every latitude in config.lat are built ONCE when
+# the ephemeris is loaded (alma_skyfield.init_sf and the init_context of the
+# worker processes); the hot functions (twilight, moonrise/moonset, moon state
+# and planet transits) only look them up. Any other position is added to the
+# registry on first use.
+#
+# The Skyfield version checks are resolved once (on import) as feature flags.
+
+###### Third party imports ######
+from skyfield import VERSION
+from skyfield.api import Topos, wgs84, E
+
+###### Local application imports ######
+import config
+
+#----------------------
+#   feature flags
+#----------------------
+
+loaderok   = VERSION >= (1, 31)     # Loader.days_old() (and download of finals2000A.all)
+wgs84ok    = VERSION >= (1, 35)     # wgs84.latlon() ... Topos is deprecated in Skyfield v1.35!
+transitsok = VERSION >= (1, 47)     # almanac.find_transits()
+risingsok  = VERSION >= (1, 48)     # almanac.find_risings() & almanac.find_settings()
+
+#----------------------
+#   registry
+#----------------------
+
+def label(lat):
+    # the latitude as printed in messages, e.g. "52.0 N"
+    hemisph = 'N' if lat >= 0 else 'S'
+    return "{:3.1f} {}".format(abs(lat), hemisph)
+
+def observer(earth, lat):
+    # topos, observer and label at latitude 'lat' (longitude 0, elevation zero)
+    latNS = label(lat)
+    if wgs84ok:
+        topos = wgs84.latlon(lat, 0.0 * E, elevation_m=0.0)
+    else:
+        topos = Topos(latNS, "0.0 E")   # Topos is deprecated in Skyfield v1.35!
+    return topos, earth + topos, latNS
+
+def build(earth):       # used in alma_skyfield.init_sf, mp_nautical.init_context & mp_eventtables.init_context
+    # the registry of all latitudes in config.lat for the Earth of an ephemeris
+    return {lat: observer(earth, lat) for lat in config.lat}
+
+def lookup(registry, earth, lat):   # used in alma_skyfield, mp_nautical & mp_eventtables
+    # (topos, observer, latNS) at latitude 'lat' ... added to the registry if not yet built
+    entry = registry.get(lat)
+    if entry is None:
+        entry = registry[lat] = observer(earth, lat)
+    return entry
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Precision tiers (see config.precision) of the positions of the Sun, Moon,
+# planets and stars:
+#   'exact'       Skyfield's full reduction: IAU 2000A nutation and the apparent
+#                 place including the light deflection by the Sun, Jupiter and
+#                 Saturn (as all previous versions)
+#   'reduced'     IAU 2000B nutation (as the rise/set searches always used) and
+#                 the apparent place without the light deflection by the Sun,
+#                 Jupiter and Saturn (aberration is applied as before). Both
+#                 shortcuts change a position by less than 1 arcsecond, so they
+#                 are NOT rounding-safe: a value within that distance of a
+#                 rounding boundary (0.05') may be printed 0.1' differently
+#                 (see the measured deviations below).
+#   'preview'     as 'reduced' but the hourly positions of the Sun, Moon and
+#                 planets are interpolated (6-point Lagrange) from positions
+#                 every 'step' hours, and the moonrise/moonset times are taken
+#                 from the fitted Moon altitude model alone (see multilat.py),
+#                 i.e. without exact evaluation near the horizon.
+#
+# The tier is part of the key of the grid cache and the event cache, so cached
+# values of different tiers are never mixed.
+#
+# Measured deviation from 'exact' in the printed tables of 2024 (366 days,
+# single process, without grid cache or event cache) and the speedup:
+#   Nautical Almanac      angles (0.1')   v, d, HP, SD (0.1')   times (hh:mm)      speedup
+#     reduced             86 of 93875     38 of 74078           none of 45394      1.2x
+#     preview             86 of 93875     39 of 74078           10 of 45394        1.6x
+#   Event Time tables     angles (0.1')                         times (hh:mm:ss)   speedup
+#     reduced             none of 1464                          none of 87761      1.4x
+#     preview             none of 1464                          714 of 87761       1.5x
+#   Lunar Distance tables (24 days): 3 of 5474 angles in both tiers
+# Every deviating angle or hh:mm time differs by one unit of the last digit
+# (0.1' or 1 minute): the exact value lies very close to a rounding boundary.
+# The hh:mm:ss moonrise/moonset times of 'preview' differ by up to 4 seconds
+# (a Moon grazing the horizon in high latitudes).
+
+###### Third party imports ######
+import numpy as np
+from skyfield.nutationlib import iau2000b_radians
+
+###### Local application imports ######
+import config
+
+#----------------------
+#   global variables
+#----------------------
+
+tiers = ['exact', 'reduced', 'preview']
+step = 6            # hours between the positions that are interpolated (preview)
+points = 6          # points of the interpolation polynomial (preview)
+
+def tier():
+    # the precision tier (an unknown setting is treated as 'exact')
+    return config.precision if config.precision in tiers else 'exact'
+
+def tag():          # used in gridcache.init_cache & eventcache.init_cache
+    # suffix of the cache keys ... none for 'exact' (as before)
+    return "" if tier() == 'exact' else "_" + tier()
+
+def fast(t):        # used in alma_skyfield, mp_nautical, mp_eventtables, ld_skyfield, gridcache, multilat & transits
+    # the Time t with IAU 2000B nutation (reduced & preview) ... before its first use
+    if tier() != 'exact':
+        t._nutation_angles_radians = iau2000b_radians(t)
+    return t
+
+def apparent(position):     # used in alma_skyfield, mp_nautical, mp_eventtables, ld_skyfield, gridcache, multilat, starcat & transits
+    # the apparent place of an astrometric position (see the tiers above)
+    if tier() == 'exact':
+        return position.apparent()
+    return position.apparent(())
+
+def modelonly():    # used in multilat.moon_days
+    # True if the moonrise/moonset times are taken from the fitted altitude model
+    return tier() == 'preview'
+
+#-------------------------------
+#   Interpolated positions
+#-------------------------------
+
+def sample_hours(hours):    # used in gridcache.compute & mp_nautical.mp_sunmoon
+    # the hours (from 00:00 on the first date) at which positions are calculated
+    # for the values at the consecutive hours 0 to len(hours)-1: the same hours
+    # or (preview) every 'step' hours including a margin for the interpolation
+    if tier() != 'preview':
+        return hours
+    return list(range(-step * (points//2 - 1), len(hours) + step * (points//2), step))
+
+def hourly(values, hours, n, period=None):  # used in gridcache.compute & mp_nautical.mp_sunmoon
+    # the n values at the hours 0 to n-1 from the 'values' at the 'hours' of
+    # sample_hours ('period' of an angle, e.g. 24 for hours of RA or GAST)
+    if tier() != 'preview':
+        return values
+    y = np.asarray(values, dtype=float)
+    if period is not None:
+        y = np.unwrap(y, period=period)
+    x = (np.arange(n) - hours[0]) / step        # in steps from the first sample
+    k = np.clip(np.floor(x).astype(int) - (points//2 - 1), 0, len(y) - points)
+    out = np.zeros(n)
+    for j in range(points):
+        w = np.ones(n)
+        for i in range(points):
+            if i != j:
+                w *= (x - k - i) / (j - i)
+        out += w * y[k + j]
+    if period is not None:
+        out %= period
+    return out
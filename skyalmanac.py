@@ -37,14 +37,11 @@ config.CPUcores = cpu_count()
 #       and stored in config.py to be re-calculated for every spawned process!
 # NOTE: multiprocessing is supported in modules: nautical, eventtables
 #       Hence these can only be imported *after* we know if '-sp' is specified
-from alma_skyfield import init_sf
-from ld_skyfield import ld_init_sf
 #from nautical import almanac            # multiprocessing supported
-from suntables import sunalmanac
 #from eventtables import makeEVtables    # multiprocessing supported
-from ld_tables import makeLDtables
-from ld_charts import makeLDcharts
-from increments import makelatex
+# NOTE: the product modules (and with them Skyfield, NumPy and pandas) are
+#       imported only when the product has been chosen (see below)
+import toolchain
 
 #   Some modules in Skyalmanac have been ported from the original source code ...
 #   this may explain why sections of code are not consolidated. Furthermore two
@@ -173,6 +170,7 @@ def timer_start():
     config.moonDataFound = 0
     config.moonHorizonSeeks = 0
     config.moonHorizonFound = 0
+    config.circumpolarSkips = 0
     return time.time()
 
 def timer_end(start, x = 0):
@@ -216,6 +214,8 @@ def search_stats():
         print(msg4)
         msg5 = "Moon continuously above/below horizon state found in transient store = {} of {}".format(config.moonHorizonFound, config.moonHorizonSeeks)
         print(msg5)
+    msg6 = "Sun/Moon event searches skipped (continuously above/below horizon) = {}".format(config.circumpolarSkips)
+    print(msg6)
     return
 
 def checkCoreCount():       # only called when config.MULTIpr == True
@@ -234,19 +234,10 @@ def checkCoreCount():       # only called when config.MULTIpr == True
         print("\nNOTE: only {} logical processors are available for parallel processessing".format(config.CPUcores))
 
 
-###### Main Program ######
-
-if __name__ == '__main__':      # required for Windows multiprocessing compatibility
-                                # i.e. don't execute if imported as a child process
-    if sys.version_info[0] < 3:
-        print("This runs only with Python 3")
-        sys.exit(0)
-
+def probe(py_ver):
+    # the checks at startup ... returns the output of "tex --version"
     # check if pandas version is compatible with numpy
     # (this is required to prevent a crash in "df = hipparcos.load_dataframe(f)")
-    n = sys.version.find(" ")
-    py_ver = sys.version[:n]        # python version
-    
     if compareVersion(py_ver,"3.8") >= 0:
         from importlib.metadata import version          # for Python >= 3.8
         pandas_ver = version('pandas')
@@ -266,13 +257,34 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
             print("       upgrade pandas to >= 2.2.2 or downgrade numpy to <= 1.26.4")
             sys.exit(0)
 
-    # check if TeX Live is compatible with the 'fancyhdr' package...
+    # check if TeX Live is installed (its version is checked below)...
     process = os.popen("tex --version")
     returned_value = process.read()
     process.close()
     if returned_value == "":
         print("- - - Neither TeX Live nor MiKTeX is installed - - -")
         sys.exit(0)
+    return returned_value
+
+###### Main Program ######
+
+if __name__ == '__main__':      # required for Windows multiprocessing compatibility
+                                # i.e. don't execute if imported as a child process
+    if sys.version_info[0] < 3:
+        print("This runs only with Python 3")
+        sys.exit(0)
+
+    n = sys.version.find(" ")
+    py_ver = sys.version[:n]        # python version
+
+    # the TeX and version checks are skipped if they passed before with the
+    # same PATH, Python and numpy/pandas versions (see toolchain.py)
+    returned_value = toolchain.cached()
+    if returned_value is None:
+        returned_value = probe(py_ver)
+        toolchain.save(returned_value)
+
+    # check if TeX Live is compatible with the 'fancyhdr' package...
     pos1 = returned_value.find("(") 
     pos2 = returned_value.find(")")
     if pos1 != -1 and pos2 != -1:
@@ -331,11 +343,6 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
     if "-sp" in set(sys.argv[1:]):
         config.MULTIpr = False
 
-    # NOTE: multiprocessing is supported in modules: nautical, eventtables
-    #       Hence these can only be imported *after* we know if '-sp' is specified
-    from nautical import almanac            # multiprocessing supported
-    from eventtables import makeEVtables    # multiprocessing supported
-
     if not("-a4" in set(sys.argv[1:]) and "-let" in set(sys.argv[1:])):
         if "-a4" in set(sys.argv[1:]): config.pgsz = "A4"
         if "-let" in set(sys.argv[1:]): config.pgsz = "Letter"
@@ -369,6 +376,9 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
         else:
             config.ephndx = int(config.ephndx)
         config.useIERS = os.getenv('USEIERS', str(config.useIERS))
+        config.autoEPH = os.getenv('AUTOEPH', str(config.autoEPH))
+        config.offlineEOP = os.getenv('OFFLINEEOP', str(config.offlineEOP))
+        config.mirrorEOP = os.getenv('MIRROREOP', config.mirrorEOP)
         config.ageIERS = os.getenv('AGEIERS', str(config.ageIERS))
         if not str(config.ageIERS).isnumeric():
             ageERR = True
@@ -380,16 +390,22 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
         err2 = "for MOONIMG in the Docker .env file"
         err3 = "for USEIERS in the Docker .env file"
         err4 = "for AGEIERS in the Docker .env file"
+        err5 = "for AUTOEPH in the Docker .env file"
+        err6 = "for OFFLINEEOP in the Docker .env file"
     else:
         spad = spdf = "./"   # path when executing the GitHub files in a folder
         if config.ephndx not in set([0, 1, 2, 3, 4]):
             ephERR = True
         config.moonimg = str(config.moonimg)
         config.useIERS = str(config.useIERS)
+        config.autoEPH = str(config.autoEPH)
+        config.offlineEOP = str(config.offlineEOP)
         err1 = "config.py"
         err2 = "for 'moonimg' in config.py"
         err3 = "for 'useIERS' in config.py"
         err4 = "for 'ageIERS' in config.py"
+        err5 = "for 'autoEPH' in config.py"
+        err6 = "for 'offlineEOP' in config.py"
 
     if ephERR:
         print("Error - Please choose a valid ephemeris in {}".format(err1))
@@ -407,6 +423,14 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
         print("Please choose a boolean value {}".format(err3))
         sys.exit(0)
 
+    if config.autoEPH.lower() not in set(['true', 'false']):
+        print("Please choose a boolean value {}".format(err5))
+        sys.exit(0)
+
+    if config.offlineEOP.lower() not in set(['true', 'false']):
+        print("Please choose a boolean value {}".format(err6))
+        sys.exit(0)
+
     if ageERR:
         print("Please choose a positive non-zero numeric value {}".format(err4))
         sys.exit(0)
@@ -416,6 +440,8 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
     yrmax = config.ephemeris[config.ephndx][2]
     config.moonimg = (config.moonimg.lower() == 'true') # to boolean
     config.useIERS = (config.useIERS.lower() == 'true') # to boolean
+    config.autoEPH = (config.autoEPH.lower() == 'true') # to boolean
+    config.offlineEOP = (config.offlineEOP.lower() == 'true') # to boolean
     f_prefix = config.docker_prefix
     f_postfix = config.docker_postfix
 
@@ -641,10 +667,28 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
 
 # ------------ create the desired tables/charts ------------
 
+        if int(s) <= 5:     # the dates to be covered by the ephemeris (see ephexcerpt.py)
+            if entireYr:
+                ephfrom = date(int(yearfr), 1, 1)
+                ephto   = date(int(yearto), 12, 31)
+            else:
+                ephfrom = first_day
+                ephto   = first_day + timedelta(days=max(daystoprocess, 1)-1)
+        # NOTE: multiprocessing is supported in modules: nautical, eventtables
+        #       Hence these can only be imported *after* we know if '-sp' is specified
+        #       (or that only 1 logical processor is available)
+        if config.MULTIpr and config.CPUcores == 1: checkCoreCount()
         if int(s) <= 3:
-            ts = init_sf(spad)      # in alma_skyfield (almanac-based)
+            from alma_skyfield import init_sf
+            ts = init_sf(spad, ephfrom, ephto)      # in alma_skyfield (almanac-based)
         elif int(s) in set([4, 5]):
-            ts = ld_init_sf(spad)   # in ld_skyfield ('Lunar Distance'-based)
+            from ld_skyfield import ld_init_sf
+            ts = ld_init_sf(spad, ephfrom, ephto)   # in ld_skyfield ('Lunar Distance'-based)
+        if s == '1': from nautical import almanac            # multiprocessing supported
+        if s == '2': from suntables import sunalmanac
+        if s == '3': from eventtables import makeEVtables    # multiprocessing supported
+        if s == '4': from ld_tables import makeLDtables
+        if s == '5': from ld_charts import makeLDcharts
         papersize = config.pgsz
 
         if s == '1' and entireYr:        # Nautical Almanac (for a year/years)
@@ -949,6 +993,7 @@ if __name__ == '__main__':      # required for Windows multiprocessing compatibi
             tidy_up(fn)
 
         elif s == '6':  # Increments and Corrections tables
+            from increments import makelatex
             msg = "\nCreating the Increments and Corrections tables"
             print(msg)
             fn = toUnix("Inc({})").format(papersize)
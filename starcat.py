@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Compact star catalogs: the Hipparcos data of the stars that are actually
+# used as a NumPy structured array (instead of the 118,218 row Pandas
+# DataFrame) and ONE Star object for all of them, so that all stars are
+# observed with a single observe() call.
+#
+# The stars referenced by the almanac and the Lunar Distance tables/charts
+# are extracted ONCE from hip_main.dat into 'hipparcos.npy' (a few hundred
+# records) which is memory-mapped at startup. Pandas is only imported when
+# that file has to be (re)built, e.g. when hip_main.dat is newer or a star
+# is requested that is not in the file.
+
+###### Standard library imports ######
+import os
+
+###### Third party imports ######
+import numpy as np
+from skyfield.api import Star
+from skyfield.data import hipparcos
+
+###### Local application imports ######
+import ld_stardata
+import precision
+
+#----------------------
+#   global variables
+#----------------------
+
+# the Hipparcos fields required by 'Star.from_dataframe' (plus magnitude)
+star_dtype = np.dtype([
+    ('hip',              'i4'),
+    ('ra_hours',         'f8'),
+    ('dec_degrees',      'f8'),
+    ('ra_mas_per_year',  'f8'),
+    ('dec_mas_per_year', 'f8'),
+    ('parallax_mas',     'f8'),
+    ('radial_km_per_s',  'f8'),     # not in the Hipparcos catalog (zero)
+    ('epoch_year',       'f8'),
+    ('magnitude',        'f8'),
+    ])
+
+catfile = "hipparcos.npy"   # compact catalog in the Skyfield data folder
+hipfile = "hip_main.dat"    # Hipparcos catalog (118,218 stars)
+loader = None       # Skyfield Loader of the data folder
+stars = None        # compact catalog (sorted by Hipparcos number)
+
+def catalog(df, hips):
+    # structured array of the stars 'hips' (Hipparcos numbers) from the Hipparcos DataFrame
+    rows = df.loc[hips]
+    cat = np.zeros(len(hips), dtype=star_dtype)
+    cat['hip'] = hips
+    for field in star_dtype.names[1:]:
+        if field in rows:
+            cat[field] = rows[field].to_numpy()
+    return cat
+
+def catalog_star(cat):
+    # one Star object for all stars in the catalog 'cat' (as 'Star.from_dataframe')
+    return Star(
+        ra_hours = cat['ra_hours'],
+        dec_degrees = cat['dec_degrees'],
+        ra_mas_per_year = cat['ra_mas_per_year'],
+        dec_mas_per_year = cat['dec_mas_per_year'],
+        parallax_mas = cat['parallax_mas'],
+        radial_km_per_s = cat['radial_km_per_s'],
+        epoch = 1721045.0 + cat['epoch_year'] * 365.25,
+        )
+
+def apparent_radec(cat, observer):     # used in alma_skyfield.stellar_info & mp_nautical.mp_stellar_info
+    # apparent RA (hours) and Dec (degrees) of all stars in 'cat' as seen by
+    # 'observer', e.g. earth.at(t) for a single time t
+    ra, dec, _ = precision.apparent(observer.observe(catalog_star(cat))).radec(epoch='date')
+    return ra.hours, dec.degrees
+
+#-------------------------------
+#   Compact catalog file
+#-------------------------------
+
+def referenced_hips():
+    # Hipparcos numbers in ld_stardata (popular stars, LD stars and constellation figures)
+    hips = set()
+    for line in ld_stardata.popstars.split('\n'):
+        if line.strip() != '':
+            hips.add(int(line[:6]))
+    for line in ld_stardata.navstars.strip().split('\n'):
+        hips.add(int(line.split(',')[2]))
+    for line in ld_stardata.constellations.strip().split('\n'):
+        if line[3:4] == ' ':
+            hips.add(int(line[4:]))
+    return hips
+
+def init_catalog(load, hips=()):    # used in alma_skyfield.init_sf & ld_skyfield.ld_init_sf
+    # open the compact catalog; (re)build it if it is missing, older than
+    # hip_main.dat or lacks any of the stars 'hips' or of ld_stardata
+    global loader, stars
+    loader = load
+    stars = None
+    fn = load.path_to(catfile)
+    fnhip = load.path_to(hipfile)
+    if os.path.isfile(fn):
+        if not os.path.isfile(fnhip) or os.path.getmtime(fn) >= os.path.getmtime(fnhip):
+            try:
+                stars = np.load(fn, mmap_mode='r')
+            except (OSError, ValueError):
+                stars = None
+    if stars is None or stars.dtype != star_dtype:
+        build(referenced_hips() | set(hips))
+    else:
+        lookup(hips)    # adds missing stars (if any) to the catalog
+
+def build(hips):
+    # extract the stars 'hips' from the full Hipparcos catalog (this requires pandas)
+    global stars
+    # load the Hipparcos catalog as a 118,218 row Pandas dataframe.
+    with loader.open(hipparcos.URL) as f:
+        #hipparcos_epoch = ts.tt(1991.25)
+        df = hipparcos.load_dataframe(f)
+    stars = catalog(df, sorted(hips))
+    try:
+        fn = loader.path_to(catfile)
+        with open(fn + ".tmp", "wb") as f:
+            np.save(f, stars)
+        os.replace(fn + ".tmp", fn)     # never leave an incomplete file
+    except OSError:
+        pass    # e.g. read-only folder: the catalog is used from memory only
+
+def lookup(hips):       # used in alma_skyfield.init_sf & ld_skyfield
+    # the catalog records of the stars 'hips' (in this order); stars that are
+    # not yet in the compact catalog are added from the full Hipparcos catalog
+    hips = [int(hip) for hip in hips]
+    missing = set(hips) - set(stars['hip'].tolist())
+    if missing:
+        build(set(stars['hip'].tolist()) | missing)
+    return stars[np.searchsorted(stars['hip'], hips)]
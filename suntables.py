@@ -334,6 +334,15 @@ def page(Date, dpp=15):
 def pages(first_day, dtp):
     # dtp = 0 if for entire year; = -1 if for entire month; else days to print
 
+    # calculate the hourly positions for all pages in one pass
+    if dtp == 0:
+        days = (date(first_day.year+1, 1, 1) - first_day).days
+    elif dtp == -1:
+        days = 31
+    else:
+        days = dtp
+    alma_skyfield.build_grid(first_day, days)
+
     out = ''
 
     if dtp == 0:       # if entire year
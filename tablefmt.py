@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Column formatting: a whole column of a table (e.g. 24 hourly GHA values) is
+# converted to text at once. The strings are exactly those of the scalar
+# functions 'fmtgha', 'fmtdeg' and "{:0.1f}'".format(...) in alma_skyfield,
+# mp_nautical, mp_eventtables and ld_skyfield.
+#
+# Rounding to 0.1 (minutes of arc) is done on the NumPy array; only values
+# that lie within 'tietol' of a rounding boundary (where the product x*10 may
+# be inexact) are rounded by Python's round() as in the scalar functions.
+#
+# Event times (a Skyfield Time array) are converted to 'hh:mm' or 'hh:mm:ss'
+# in UT1 exactly as 'time2text', i.e. Time.ut1_strftime(): the time is rounded
+# to the nearest minute (second) by adding 30 (0.5) seconds before the
+# calendar date and time of day are calculated, so 23:59:30 is carried into
+# 00:00 of the next day. (Missing events remain '--:--' in the table builders.)
+
+###### Third party imports ######
+import numpy as np
+
+#----------------------
+#   global variables
+#----------------------
+
+tietol = 1e-6       # a tenth closer than this to a boundary is rounded by round()
+
+def tenths(x):
+    # round(x, 1) * 10 as integers for an array of non-negative values
+    x = np.asarray(x, dtype=float)
+    y = x * 10
+    n = np.rint(y).astype(np.int64)
+    for k in np.flatnonzero(np.abs(y - np.floor(y) - 0.5) < tietol):
+        n.flat[k] = int(round(round(float(x.flat[k]), 1) * 10))
+    return n
+
+def degrees(deg, fixedwidth=1):     # used in alma_skyfield, mp_nautical & ld_skyfield
+    # the angles 'deg' as fmtdeg (ddd°mm.m) ... a list of strings
+    deg = np.asarray(deg, dtype=float)
+    minus = deg < 0
+    df = np.abs(deg)
+    di = df.astype(np.int64)                # degrees (integer)
+    n = tenths((df - di) * 60)              # minutes in tenths
+    carry = n == 600
+    n[carry] = 0
+    di[carry] += 1
+    di[carry & (di == 360)] = 0
+    if fixedwidth == 2:
+        fmt = r"{}{:02d}$^\circ${:02d}.{}"
+    elif fixedwidth == 3:
+        fmt = r"{}{:03d}$^\circ${:02d}.{}"
+    else:
+        fmt = r"{}{}$^\circ${:02d}.{}"
+    return [fmt.format('-' if m else '', d, q, r) for m, d, q, r in zip(minus.tolist(), di.tolist(), (n // 10).tolist(), (n % 10).tolist())]
+
+def gha(gst, ra):       # used in alma_skyfield, mp_nautical & ld_skyfield
+    # the GHA (or SHA) from GAST and RA (hours) as fmtgha (ddd°mm.m) ... a list of strings
+    sha = (np.asarray(gst, dtype=float) - np.asarray(ra, dtype=float)) * 15
+    sha = np.where(sha < 0, sha + 360, sha)
+    return degrees(sha)
+
+def minutes(x):         # used in alma_skyfield, mp_nautical & ld_skyfield
+    # the values 'x' (minutes of arc) as "{:0.1f}'".format(x) ... a list of strings
+    x = np.asarray(x, dtype=float)
+    minus = np.signbit(x)                   # -0.0 is printed as '-0.0'
+    n = tenths(np.abs(x))
+    return ["{}{}.{}'".format('-' if m else '', q, r) for m, q, r in zip(minus.tolist(), (n // 10).tolist(), (n % 10).tolist())]
+
+def times(t, with_seconds=False):   # used in alma_skyfield, mp_nautical & mp_eventtables
+    # the event times 't' (a Time array or []) as time2text ... a list of strings
+    if len(t) == 0: return []
+    offset = 0.5 if with_seconds else 30.0  # as Time.ut1_strftime(): round to the second (minute)
+    fraction = t.ut1_fraction + offset / 86400.0
+    whole1, fraction1 = np.divmod(np.asarray(t.whole, dtype=float), 1.0)
+    whole2, fraction = np.divmod(fraction1 + fraction + 0.5, 1.0)
+    minute, second = np.divmod(fraction * 86400.0, 60.0)
+    hour, minute = np.divmod(minute.astype(int), 60)
+    if with_seconds:
+        return ["{:02d}:{:02d}:{:02d}".format(h, m, s) for h, m, s in zip(hour.tolist(), minute.tolist(), second.astype(int).tolist())]
+    return ["{:02d}:{:02d}".format(h, m) for h, m in zip(hour.tolist(), minute.tolist())]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# The column formatters in tablefmt.py must give exactly the strings of the
+# scalar functions they replace: fmtdeg, fmtgha, "{:0.1f}'".format and
+# time2text (Time.ut1_strftime). Each is compared on more than a million
+# random values plus values within 1e-6 of every 0.05' rounding boundary,
+# +/-0 and +/-359.95 degrees.
+#   python -m pytest -q test_tablefmt.py
+
+###### Third party imports ######
+import numpy as np
+from skyfield.api import load
+
+###### Local application imports ######
+import tablefmt
+from alma_skyfield import fmtdeg, fmtgha
+
+#----------------------
+#   global variables
+#----------------------
+
+count = 1000000     # random values per test
+rng = np.random.default_rng(20240318)
+offsets = np.array([-1e-6, -5e-7, -1e-7, 0.0, 1e-7, 5e-7, 1e-6])    # around a rounding boundary
+
+def mismatches(got, expected, values):
+    # the first few differences (value, got, expected)
+    assert len(got) == len(expected)
+    bad = [(v, g, e) for v, g, e in zip(values, got, expected) if g != e]
+    return bad[:5], len(bad)
+
+def boundaries(degmax):
+    # angles within 1e-6 (minutes of arc) of every 0.05' boundary from 0 to degmax degrees
+    mins = np.arange(600) * 0.1 + 0.05
+    x = np.add.outer(np.arange(degmax), (np.add.outer(mins, offsets) / 60).ravel()).ravel()
+    return x[x >= 0]
+
+def special():
+    return np.array([0.0, -0.0, 359.95, -359.95, 359.95 - 1e-9, 359.95 + 1e-9, 359.9999999, -359.9999999,
+                     1e-9, -1e-9, 0.05 / 60, -0.05 / 60, 89.99999, -89.99999])
+
+def test_degrees():
+    x = np.concatenate([rng.uniform(-360, 360, count), boundaries(360), -boundaries(90), special()])
+    for fixedwidth in [1, 2, 3]:
+        got = tablefmt.degrees(x, fixedwidth)
+        expected = [fmtdeg(v, fixedwidth) for v in x.tolist()]
+        assert mismatches(got, expected, x.tolist())[1] == 0, mismatches(got, expected, x.tolist())
+
+def test_gha():
+    # GAST and RA in hours: random, and with RA = 0 at every rounding boundary
+    b = np.concatenate([boundaries(360), special()[special() >= 0]])
+    gst = np.concatenate([rng.uniform(0, 24, count), b / 15])
+    ra = np.concatenate([rng.uniform(0, 24, count), np.zeros(len(b))])
+    got = tablefmt.gha(gst, ra)
+    expected = [fmtgha(g, r) for g, r in zip(gst.tolist(), ra.tolist())]
+    values = list(zip(gst.tolist(), ra.tolist()))
+    assert mismatches(got, expected, values)[1] == 0, mismatches(got, expected, values)
+
+def test_minutes():
+    tenths = np.arange(-1000, 1000) * 0.1 + 0.05
+    b = np.add.outer(tenths, offsets).ravel()
+    x = np.concatenate([rng.uniform(-100, 100, count), b, special()])
+    got = tablefmt.minutes(x)
+    expected = ["{:0.1f}'".format(v) for v in x.tolist()]
+    assert mismatches(got, expected, x.tolist())[1] == 0, mismatches(got, expected, x.tolist())
+
+def test_times():
+    # UT1 Julian dates: random, and within 1e-6 seconds of a rounding boundary (incl. midnight)
+    ts = load.timescale(builtin=True)
+    jd = 2451544.5 + rng.uniform(0, 36525, count)
+    for with_seconds, step in [(False, 60.0), (True, 1.0)]:
+        k = np.floor(rng.uniform(0, 36525 * 86400 / step, count // 10))
+        b = 2451544.5 + np.add.outer(k * step + step / 2, offsets).ravel() / 86400.0
+        midnight = 2451544.5 + np.add.outer(np.arange(2000) + 1.0 - step / 2 / 86400, offsets / 86400).ravel()
+        t = ts.ut1_jd(np.concatenate([jd, b, midnight]))
+        got = tablefmt.times(t, with_seconds)
+        expected = t.ut1_strftime('%H:%M:%S' if with_seconds else '%H:%M')
+        assert mismatches(got, expected, t.ut1.tolist())[1] == 0, mismatches(got, expected, t.ut1.tolist())
+    assert tablefmt.times([]) == []
+
+if __name__ == '__main__':
+    for test in [test_degrees, test_gha, test_minutes, test_times]:
+        test()
+        print("{} passed".format(test.__name__))
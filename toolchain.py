@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Startup probe state: the output of "tex --version" (for the TeX Live/MiKTeX
+# and 'fancyhdr' checks) is stored in a small state file after the pandas/numpy
+# compatibility check has passed. The next start reuses it if PATH, the Python
+# interpreter and the installed numpy/pandas versions are unchanged, so
+# neither the TeX process nor importlib.metadata is needed.
+
+###### Standard library imports ######
+import json
+import os
+import sys
+
+#----------------------
+#   global variables
+#----------------------
+
+statefile = "toolchain.json"    # in the program folder
+packages = ("numpy-", "pandas-")
+
+def installed():
+    # the numpy/pandas distributions on sys.path (their folder names contain the versions)
+    found = []
+    for p in sys.path:
+        if not os.path.isdir(p): continue
+        try:
+            names = os.listdir(p)
+        except OSError:
+            continue
+        found += [os.path.join(p, n) for n in names if n.startswith(packages) and n.endswith((".dist-info", ".egg-info"))]
+    return sorted(found)
+
+def key():
+    return {'PATH': os.environ.get('PATH', ''), 'python': sys.executable + " " + sys.version, 'packages': installed()}
+
+def cached():           # used in skyalmanac
+    # the "tex --version" output of an earlier start with the same key (else None)
+    try:
+        with open(statefile, encoding="utf8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('key') != key(): return None
+    return state.get('tex')
+
+def save(texversion):   # used in skyalmanac
+    # store the state (a read-only folder is ignored: the probe is repeated next time)
+    try:
+        with open(statefile, mode="w", encoding="utf8") as f:
+            json.dump({'key': key(), 'tex': texversion}, f)
+    except OSError:
+        pass
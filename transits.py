@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#   Copyright (C) 2024  Andrew Bauer
+
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Transit engine: the meridian transits (at longitude 0) of all days of a date
+# range are found together, i.e. with one observe() call per step for all days
+# instead of one search per day.
+#
+#   planet_transits ... almanac.find_transits (identical times) for a planet
+#   moon_transits   ... the Moon's upper and lower transits rounded to the
+#                       minute or second as find_transit & find_transit2
+#
+# The Moon's transit is not located by stepping minute by minute (and second by
+# second) through the hour in which the hourly GHA grid wraps through 360°:
+# the time is interpolated from the two grid values that bracket it and then
+# polished with the exact GHA (Newton iterations). The rounding conventions of
+# the tables are kept exactly: a day begins at 23:59:30 (or 23:59:59.5) on the
+# previous day, the last event of a day shows as 23:59 (or 23:59:59) and an
+# event too close to the midpoint between minutes (or seconds) is decided by
+# the exact GHA at the midpoint ... evaluated at the very same time as before.
+#
+# The Sun's Mer. Pass (from the GHA at 12:00) and the transit of Aries (from
+# GAST at 00:00) are closed-form conventions of the tables and need no search.
+
+###### Third party imports ######
+import numpy as np
+from skyfield import almanac
+from skyfield.api import wgs84
+from skyfield.constants import tau, pi
+
+###### Local application imports ######
+import precision
+
+#----------------------
+#   global variables
+#----------------------
+
+polishtol = 1e-4    # seconds: the Newton polish ends when all corrections are smaller
+polishmax = 4       # maximum number of Newton iterations (exact GHA evaluations)
+midtol    = 0.01    # seconds: closer to a midpoint the exact midpoint GHA decides
+
+#-------------------------------
+#   Planet transits
+#-------------------------------
+
+def planet_transits(ts, earth, planet, tt0, tt1):     # used in alma_skyfield, mp_nautical & mp_eventtables
+    # transits of 'planet' from tt0[k] to tt1[k] (TT) for every day k ... as
+    # almanac.find_transits at latitude 0°N, longitude 0°E. Returns a list per
+    # day of the transit times (Time array).
+    tt0 = np.asarray(tt0, dtype=float)
+    tt1 = np.asarray(tt1, dtype=float)
+    counts = np.ceil((tt1 - tt0) / 0.8).astype(int) + 1
+    out = [None] * len(tt0)
+    for sample_count in np.unique(counts):
+        days = np.flatnonzero(counts == sample_count)
+        for k, t in zip(days, planet_days(ts, earth, planet, tt0[days], tt1[days], sample_count)):
+            out[k] = t
+    return out
+
+def planet_days(ts, earth, planet, tt0, tt1, sample_count):
+    # as planet_transits for days with the same number of samples (one row per day)
+    nday = len(tt0)
+    observer = earth + wgs84.latlon(0.0, 0.0, elevation_m=0.0)
+    samples = ts.tt_jd(np.linspace(tt0, tt1, sample_count, axis=1).flatten())
+    almanac._fastify(samples)
+    apparent = observer.at(samples).observe(planet).apparent(())
+    ha, dec, distance = apparent.hadec()
+
+    # bracket the transits (the desired hour angle is zero)
+    difference = (0.0 - ha.radians) % tau
+    rows, js = np.nonzero(np.diff(difference.reshape(nday, sample_count)) > 0.0)
+    i = rows * sample_count + js
+    if len(i) == 0:
+        return [samples[i]] * nday
+
+    # interpolate between the samples that bracket each transit
+    old_ha_radians = ha.radians[i]
+    old_t = samples[i]
+    a = difference[i]
+    b = tau - difference[i + 1]
+    tt = samples.tt
+    t = ts.tt_jd((b * tt[i] + a * tt[i+1]) / (a + b))
+
+    # refine all transits together
+    normalize = lambda radians: radians % tau
+    for n in 0, 1, 2:
+        almanac._fastify(t)
+        apparent = observer.at(t).observe(planet).apparent(())
+        ha, dec, distance = apparent.hadec()
+        ha_adjustment = 0.0 - ha.radians
+        ha_adjustment = (ha_adjustment + pi) % tau - pi
+        if n < 2:
+            ha_diff = normalize(ha.radians - old_ha_radians)
+            t_diff = t - old_t
+            ha_per_day = ha_diff / t_diff
+        old_ha_radians = ha.radians
+        old_t = t
+        timebump = ha_adjustment / ha_per_day
+        timebump[timebump == 0.0] = almanac._MICROSECOND
+        t = ts.tt_jd(t.whole, t.tt_fraction + timebump)
+        normalize = lambda radians: (radians + pi) % tau - pi
+
+    return [t[np.flatnonzero(rows == k)] for k in range(nday)]
+
+#-------------------------------
+#   Moon transits
+#-------------------------------
+
+def colong(gha):
+    # the colongitude (as GHAcolong) of an array of GHA values
+    co = gha + 180
+    co[co > 360] -= 360
+    return co
+
+def moon_gha(ts, earth, moon, dates, hh, mm, ss, lower):
+    # the Moon's GHA (degrees) or its colongitude (lower) on dates[k] at hh:mm:ss
+    t = precision.fast(ts.ut1([d.year for d in dates], [d.month for d in dates], [d.day for d in dates], hh, mm, ss))
+    ra = precision.apparent(earth.at(t).observe(moon)).radec(epoch='date')[0]
+    gha = (t.gast - ra.hours) * 15
+    gha[gha < 0] += 360     # as gha2deg
+    return np.where(lower, colong(gha), gha)
+
+def moon_transits(ts, earth, moon, dates, ghalists, lower, with_seconds):    # used in alma_skyfield & ld_skyfield
+    # the Moon's upper transit (lower[k] = False) or lower transit on dates[k]
+    # rounded to the nearest minute (or second) ... as find_transit (or find_transit2).
+    # ghalists[k] holds the GHA (or colongitude) at 23:59:30 (or 23:59:59.5) on
+    # the previous day, 01:00, 02:00 ... 23:00 and 23:59:30 (or 23:59:59.5).
+    # Returns a list of 'hh:mm' (or 'hh:mm:ss') strings or '--:--' if no transit.
+    unit = 1.0 if with_seconds else 60.0    # seconds per rounding unit
+    last = int(86400 / unit) - 1            # 23:59 (or 23:59:59)
+    out = ['--:--'] * len(dates)
+    g = np.array(ghalists, dtype=float).reshape(len(dates), 25)
+    wraps = g[:, 1:] < g[:, :-1]
+    k = np.flatnonzero(wraps.any(axis=1))   # dates with a transit
+    if len(k) == 0:
+        return out
+    hr = np.argmax(wraps[k], axis=1)        # the transit is between hr:00 and {hr+1}:00
+    dates = [dates[n] for n in k]
+    lower = np.asarray(lower, dtype=bool)[k]
+
+    # interpolate between the grid values that bracket the transit (seconds from 00:00)
+    s0 = np.where(hr == 0, -unit / 2, hr * 3600.0)
+    s1 = np.where(hr == 23, 86400.0 - unit / 2, (hr + 1) * 3600.0)
+    g0 = g[k, hr]
+    g1 = g[k, hr + 1] + 360
+    rate = (g1 - g0) / (s1 - s0)            # degrees per second
+    s = s0 + (360 - g0) / rate
+
+    # polish with the exact GHA
+    for n in range(polishmax):
+        gha = moon_gha(ts, earth, moon, dates, 0, 0, s, lower)
+        step = ((gha + 180) % 360 - 180) / rate
+        s -= step
+        if np.max(np.abs(step)) < polishtol: break
+
+    # round to the nearest unit ... the exact midpoint GHA decides when too close
+    m = np.floor(s / unit).astype(int)      # the unit before the transit
+    mid = (m + 0.5) * unit
+    up = s > mid
+    j = np.flatnonzero((np.abs(s - mid) < midtol) & (m >= 0) & (m < last))
+    if len(j) > 0:
+        if with_seconds:
+            hh, mm, ss = m[j] // 3600, m[j] // 60 % 60, m[j] % 60 + 0.5
+        else:
+            hh, mm, ss = m[j] // 60, m[j] % 60, 30
+        up[j] = moon_gha(ts, earth, moon, [dates[n] for n in j], hh, mm, ss, lower[j]) > 180
+    units = np.clip(m + up, 0, last)
+
+    for n, u in zip(k, units):
+        if with_seconds:
+            out[n] = "{:02d}:{:02d}:{:02d}".format(u // 3600, u // 60 % 60, u % 60)
+        else:
+            out[n] = "{:02d}:{:02d}".format(u // 60, u % 60)
+    return out